@@ -1,10 +1,14 @@
 import sqlite3
-from typing import Any, List, Dict, Optional
+from contextlib import contextmanager
+from typing import Any, Callable, List, Dict, Iterator, Optional
 import threading
 from pathlib import Path
 
 
 class DatabaseManager:
+    # 每个连接缓存的已编译语句数（sqlite3 按 SQL 文本复用预编译语句，插件内固定 SQL 远多于默认的 128 条）
+    STATEMENT_CACHE_SIZE = 512
+
     def __init__(self, db_path: str):
         """
         初始化数据库管理器
@@ -24,11 +28,88 @@ class DatabaseManager:
     def connection(self) -> sqlite3.Connection:
         """获取当前线程的数据库连接"""
         if not hasattr(self._local, 'connection'):
-            self._local.connection = sqlite3.connect(self.db_path)
+            self._local.connection = sqlite3.connect(self.db_path, cached_statements=self.STATEMENT_CACHE_SIZE)
             # 设置行工厂为字典类型
             self._local.connection.row_factory = sqlite3.Row
+            # WAL 模式：读写互不阻塞，提交时无需重写整个回滚日志
+            self._local.connection.execute("PRAGMA journal_mode=WAL")
+            # WAL 下 NORMAL 同步已足够安全；临时表走内存，页缓存约 64MB，并映射读取数据库文件
+            self._local.connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection.execute("PRAGMA temp_store=MEMORY")
+            self._local.connection.execute("PRAGMA cache_size=-65536")
+            self._local.connection.execute("PRAGMA mmap_size=268435456")
+            # 其他线程持有写锁时最多等待 5 秒，而非直接报 database is locked
+            self._local.connection.execute("PRAGMA busy_timeout=5000")
         return self._local.connection
 
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        将块内的多次写入合并为一个事务（BEGIN IMMEDIATE ... COMMIT），只提交一次
+        块内 execute 等方法不再单独提交；可嵌套，仅最外层提交，块内抛出异常时整体回滚
+        无法开启事务（如等待写锁超时）时直接抛出异常，不会退化为逐条提交
+        """
+        depth = getattr(self._local, 'transaction_depth', 0)
+        conn = self.connection
+        if depth == 0 and not conn.in_transaction:
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+            except Exception as e:
+                print(f"Begin transaction error: {str(e)}")
+                raise
+        if depth == 0:
+            self._local.rollback_callbacks = []
+        self._local.transaction_depth = depth + 1
+        try:
+            yield
+        except Exception:
+            self._local.transaction_depth = depth
+            if depth == 0:
+                conn.rollback()
+                self._run_rollback_callbacks()
+            raise
+        self._local.transaction_depth = depth
+        if depth == 0:
+            try:
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                self._run_rollback_callbacks()
+                raise
+            self._local.rollback_callbacks = []
+
+    def in_transaction(self) -> bool:
+        """当前线程是否处于 transaction() 事务块内"""
+        return bool(getattr(self._local, 'transaction_depth', 0))
+
+    def on_rollback(self, callback: Callable[[], None]) -> None:
+        """
+        登记最外层事务回滚后要执行的回调（如丢弃块内写入的缓存）；事务提交后丢弃
+        不在事务块内时写入已立即提交，无需回调，直接忽略
+        """
+        if self.in_transaction():
+            self._local.rollback_callbacks.append(callback)
+
+    def _run_rollback_callbacks(self):
+        """执行并清空当前线程登记的回滚回调"""
+        callbacks = getattr(self._local, 'rollback_callbacks', None) or []
+        self._local.rollback_callbacks = []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Rollback callback error: {str(e)}")
+
+    def _commit(self):
+        """事务块外立即提交；事务块内交由 transaction() 统一提交"""
+        if not getattr(self._local, 'transaction_depth', 0):
+            self.connection.commit()
+
+    def _rollback(self):
+        """事务块外立即回滚；事务块内保留已执行的写入，由 transaction() 决定提交或回滚"""
+        if not getattr(self._local, 'transaction_depth', 0):
+            self.connection.rollback()
+
     def close(self):
         """关闭当前线程的数据库连接"""
         if hasattr(self._local, 'connection'):
@@ -45,13 +126,30 @@ class DatabaseManager:
         try:
             cursor = self.connection.cursor()
             cursor.execute(sql, params)
-            self.connection.commit()
+            self._commit()
             return True
         except Exception as e:
             print(f"Execute SQL error: {str(e)}")
-            self.connection.rollback()
+            self._rollback()
             return False
 
+    def execute_rowcount(self, sql: str, params: tuple = ()) -> int:
+        """
+        执行写入类SQL语句并返回受影响的行数
+        :param sql: SQL语句
+        :param params: SQL参数
+        :return: 受影响的行数，执行失败返回 -1
+        """
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute(sql, params)
+            self._commit()
+            return cursor.rowcount
+        except Exception as e:
+            print(f"Execute SQL error: {str(e)}")
+            self._rollback()
+            return -1
+
     def query_one(self, sql: str, params: tuple = ()) -> Optional[Dict[str, Any]]:
         """
         查询单条记录
@@ -83,6 +181,21 @@ class DatabaseManager:
             print(f"Query all error: {str(e)}")
             return []
 
+    def try_query_all(self, sql: str, params: tuple = ()) -> Optional[List[Dict[str, Any]]]:
+        """
+        查询多条记录，与 query_all 的区别是出错时返回 None，调用方可区分"查询失败"与"无记录"
+        :param sql: SQL语句
+        :param params: SQL参数
+        :return: 查询结果列表，执行失败返回 None
+        """
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute(sql, params)
+            return [dict(row) for row in cursor.fetchall()]
+        except Exception as e:
+            print(f"Query all error: {str(e)}")
+            return None
+
     def insert(self, table: str, data: Dict[str, Any]) -> bool:
         """
         插入数据
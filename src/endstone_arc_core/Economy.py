@@ -1,16 +1,33 @@
 # -*- coding: utf-8 -*-
 """经济系统逻辑：金钱存储、增减、排行等（基于 XUID，精确到分）"""
-from typing import Any, Callable, Dict, List, Optional
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
+# 玩家输入的金额：可选符号、整数部分、可选小数部分（如 "12"、"12.5"、".5"、"-3"）
+_MONEY_INPUT_RE = re.compile(r"\s*([+-]?)(\d*)(?:\.(\d*))?\s*")
 
 class Economy:
     """经济系统：负责 player_economy 表及金钱相关数据逻辑，不包含 UI 与通知。"""
 
+    # 高频写入语句：固定文本，连接的预编译语句缓存按 SQL 文本命中，参数一律绑定
+    _SQL_ADD_MONEY = "UPDATE player_economy SET money = ROUND(money + ?, 2) WHERE xuid = ?"
+    _SQL_SET_MONEY = "UPDATE player_economy SET money = ? WHERE xuid = ?"
+    _SQL_GET_MONEY = "SELECT money FROM player_economy WHERE xuid = ?"
+    _SQL_CHARGE_MONEY = (
+        "UPDATE player_economy SET money = ROUND(money - ?, 2) WHERE xuid = ? AND money >= ?"
+    )
+
     def __init__(self, database_manager, setting_manager, logger=None):
         self.db = database_manager
         self.setting_manager = setting_manager
         self.logger = logger
         self._persistent_error_cb: Optional[Callable[[str, str, Optional[BaseException]], None]] = None
+        self._money_changed_cb: Optional[Callable[[], None]] = None
+        # 余额缓存：{xuid: 金钱}，读取时填充，所有经由本模块的写入同步更新（write-through）
+        self._money_cache: Dict[str, float] = {}
+        # 保证“写库 + 读回新余额 + 更新缓存”整体有序，缓存不会被较早的结果覆盖
+        self._money_lock = threading.Lock()
 
     def set_persistent_error_callback(
         self, callback: Optional[Callable[[str, str, Optional[BaseException]], None]]
@@ -27,6 +44,19 @@ class Economy:
             except Exception:
                 pass
 
+    def set_money_changed_callback(self, callback: Optional[Callable[[], None]]) -> None:
+        """由插件注册：任一余额写入成功（或其所在事务回滚）后调用，用于让财富榜等派生数据失效"""
+        self._money_changed_cb = callback
+
+    def _notify_money_changed(self) -> None:
+        if self._money_changed_cb:
+            try:
+                self._money_changed_cb()
+            except Exception:
+                pass
+            # 外层事务回滚后余额恢复原值，同样需要通知
+            self.db.on_rollback(self._money_changed_cb)
+
     def set_logger(self, logger):
         """设置日志记录器（插件 on_enable 后调用）"""
         self.logger = logger
@@ -47,9 +77,32 @@ class Economy:
         """将金额四舍五入到分（两位小数）"""
         return round(float(value), 2)
 
+    @staticmethod
+    def parse_money_input(text: Any) -> Optional[float]:
+        """
+        解析玩家输入的金额并按分四舍五入，直接按十进制数字换算为分，不经 float() 解析
+        :return: 金额；不是普通十进制数（含 inf/nan/科学计数法等）时返回 None
+        """
+        if not isinstance(text, str):
+            try:
+                return Economy.round_money(text)
+            except (ValueError, TypeError):
+                return None
+        match = _MONEY_INPUT_RE.fullmatch(text)
+        if match is None:
+            return None
+        sign, whole, frac = match.groups()
+        frac = frac or ""
+        if not whole and not frac:
+            return None
+        fen = int(whole or "0") * 100 + int(frac[:2].ljust(2, "0"))
+        if frac[2:3] >= "5":
+            fen += 1
+        return (-fen if sign == "-" else fen) / 100
+
     def format_money_display(self, value: float) -> str:
-        """格式化金额用于界面显示（始终两位小数）"""
-        return "%.2f" % self.round_money(value)
+        """格式化金额用于界面显示（始终两位小数，格式化本身即按两位小数舍入）"""
+        return f"{float(value):.2f}"
 
     def init_economy_table(self) -> bool:
         """初始化经济系统表格（money 使用 REAL，支持小数到分）"""
@@ -57,7 +110,15 @@ class Economy:
             "xuid": "TEXT PRIMARY KEY",
             "money": "REAL NOT NULL DEFAULT 0",
         }
-        return self.db.create_table("player_economy", fields)
+        if not self.db.create_table("player_economy", fields):
+            return False
+        return self._create_money_index()
+
+    def _create_money_index(self) -> bool:
+        """按金钱建立索引：排行榜 ORDER BY money 与名次统计均可走索引"""
+        return self.db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_player_economy_money ON player_economy(money)"
+        )
 
     def upgrade_player_economy_table_to_float(self) -> bool:
         """若 player_economy 表中 money 列为 INTEGER，则迁移为 REAL（仅执行一次）"""
@@ -80,6 +141,8 @@ class Economy:
             )
             self.db.execute("DROP TABLE player_economy")
             self.db.execute("ALTER TABLE player_economy_new RENAME TO player_economy")
+            self.invalidate_money_cache()
+            self._create_money_index()
             print("[ARC Core]Upgraded player_economy money column to REAL (float).")
             return True
         except Exception as e:
@@ -97,20 +160,38 @@ class Economy:
         except (ValueError, TypeError):
             return 0.0
 
+    def invalidate_money_cache(self, xuid: Optional[str] = None) -> None:
+        """丢弃余额缓存（指定 xuid 时仅丢弃该玩家），下次读取时重新查询数据库"""
+        if xuid is None:
+            self._money_cache.clear()
+        else:
+            self._money_cache.pop(xuid, None)
+
+    def _cache_money(self, xuid: str, money: float) -> float:
+        """写入余额缓存；处于外层事务内时登记回滚回调，事务回滚后丢弃这笔未提交的余额"""
+        self._money_cache[xuid] = money
+        self.db.on_rollback(lambda x=xuid: self.invalidate_money_cache(x))
+        return money
+
     def get_player_money_by_xuid(self, xuid: str) -> float:
         """
         按 XUID 获取玩家金钱；若记录不存在则创建并返回初始金钱。
         :return: 金钱数量（精确到分）
         """
+        cached = self._money_cache.get(xuid)
+        if cached is not None:
+            return cached
         try:
             result = self.db.query_one(
-                "SELECT money FROM player_economy WHERE xuid = ?", (xuid,)
+                self._SQL_GET_MONEY, (xuid,)
             )
             if result is None:
                 init_money = self._get_init_money()
-                self.db.insert("player_economy", {"xuid": xuid, "money": init_money})
+                if self.db.insert("player_economy", {"xuid": xuid, "money": init_money}):
+                    self._cache_money(xuid, init_money)
+                    self._notify_money_changed()
                 return init_money
-            return self.round_money(result["money"])
+            return self._cache_money(xuid, self.round_money(result["money"]))
         except Exception as e:
             self._log("error", f"[ARC Core]Get player money error: {str(e)}")
             self._emit_persistent_error(
@@ -122,12 +203,14 @@ class Economy:
         """按 XUID 设置玩家金钱（仅数据，不通知）"""
         try:
             amount = self.round_money(amount)
-            ok = self.db.update(
-                table="player_economy",
-                data={"money": amount},
-                where="xuid = ?",
-                params=(xuid,),
-            )
+            with self._money_lock:
+                rows = self.db.execute_rowcount(self._SQL_SET_MONEY, (amount, xuid))
+                ok = rows >= 0
+                if rows > 0:
+                    self._cache_money(xuid, amount)
+                    self._notify_money_changed()
+                else:
+                    self._money_cache.pop(xuid, None)
             if not ok:
                 self._log(
                     "error",
@@ -146,23 +229,160 @@ class Economy:
             )
             return False
 
+    def add_player_money_by_xuid(self, xuid: str, delta: float) -> Optional[float]:
+        """
+        按 XUID 增减玩家金钱（仅数据，不通知）
+        在 SQL 内完成 money = money + delta，并发调用不会因先读后写而丢失更新
+        :return: 变更后的余额，失败返回 None（调用方无需再查一次余额）
+        """
+        delta = self.round_money(delta)
+        sql = self._SQL_ADD_MONEY
+        try:
+            with self._money_lock:
+                rows = self.db.execute_rowcount(sql, (delta, xuid))
+                if rows == 0:
+                    # 记录不存在：按初始金钱建档后再变更
+                    self._money_cache.pop(xuid, None)
+                    self.get_player_money_by_xuid(xuid)
+                    rows = self.db.execute_rowcount(sql, (delta, xuid))
+                if rows <= 0:
+                    self._money_cache.pop(xuid, None)
+                    self._log(
+                        "error",
+                        f"[ARC Core]Change player money failed (db affected {rows} rows) xuid={xuid}",
+                    )
+                    self._emit_persistent_error(
+                        "BANK02",
+                        f"add_player_money_by_xuid xuid={xuid!r} delta={delta} db update affected {rows} rows",
+                        None,
+                    )
+                    return None
+                self._notify_money_changed()
+                result = self.db.query_one(
+                    self._SQL_GET_MONEY, (xuid,)
+                )
+                if result is None:
+                    self._money_cache.pop(xuid, None)
+                    return None
+                # UPDATE 中已由 SQL ROUND() 舍入到分
+                return self._cache_money(xuid, float(result["money"]))
+        except Exception as e:
+            self._money_cache.pop(xuid, None)
+            self._log("error", f"[ARC Core]Change player money error: {str(e)}")
+            self._emit_persistent_error(
+                "BANK02", f"add_player_money_by_xuid xuid={xuid!r}: {e}", e
+            )
+            return None
+
+    def try_charge_player_money_by_xuid(
+        self, xuid: str, amount: float
+    ) -> Tuple[bool, Optional[float]]:
+        """
+        按 XUID 扣费（仅数据，不通知）：余额判断与扣减合并为一条条件 UPDATE
+        :param amount: 扣费金额（正数，已精确到分）
+        :return: (是否扣费成功, 当前余额)；余额不足时返回 (False, 余额)，出错时余额为 None
+        """
+        try:
+            with self._money_lock:
+                params = (amount, xuid, amount)
+                rows = self.db.execute_rowcount(self._SQL_CHARGE_MONEY, params)
+                if rows == 0:
+                    # 余额不足或记录不存在：取（必要时建档）余额，足够时再扣一次
+                    balance = self.get_player_money_by_xuid(xuid)
+                    if balance < amount:
+                        return False, balance
+                    rows = self.db.execute_rowcount(self._SQL_CHARGE_MONEY, params)
+                if rows <= 0:
+                    self._money_cache.pop(xuid, None)
+                    if rows == 0:
+                        return False, self.get_player_money_by_xuid(xuid)
+                    self._emit_persistent_error(
+                        "BANK02",
+                        f"try_charge_player_money_by_xuid xuid={xuid!r} amount={amount} db update failed",
+                        None,
+                    )
+                    return False, None
+                self._notify_money_changed()
+                result = self.db.query_one(self._SQL_GET_MONEY, (xuid,))
+                if result is None:
+                    self._money_cache.pop(xuid, None)
+                    return True, None
+                return True, self._cache_money(xuid, float(result["money"]))
+        except Exception as e:
+            self._money_cache.pop(xuid, None)
+            self._log("error", f"[ARC Core]Charge player money error: {str(e)}")
+            self._emit_persistent_error(
+                "BANK02", f"try_charge_player_money_by_xuid xuid={xuid!r}: {e}", e
+            )
+            return False, None
+
     def increase_player_money_by_xuid(self, xuid: str, amount: float) -> bool:
         """按 XUID 增加玩家金钱（仅数据，不通知）"""
         amount = abs(self.round_money(amount))
         if amount <= 0:
             return True
-        current = self.get_player_money_by_xuid(xuid)
-        new_money = self.round_money(current + amount)
-        return self.set_player_money_by_xuid(xuid, new_money)
+        return self.add_player_money_by_xuid(xuid, amount) is not None
 
     def decrease_player_money_by_xuid(self, xuid: str, amount: float) -> bool:
         """按 XUID 减少玩家金钱（仅数据，不通知）"""
         amount = abs(self.round_money(amount))
         if amount <= 0:
             return True
-        current = self.get_player_money_by_xuid(xuid)
-        new_money = self.round_money(current - amount)
-        return self.set_player_money_by_xuid(xuid, new_money)
+        return self.add_player_money_by_xuid(xuid, -amount) is not None
+
+    def transfer_money_by_xuid(
+        self, from_xuid: str, to_xuid: str, amount: float
+    ) -> Optional[Tuple[float, float]]:
+        """
+        按 XUID 在两名玩家之间转账（仅数据，不通知）
+        扣款（含余额判断）与入账在同一事务内完成，任一步失败整体回滚；
+        在外层事务内调用时失败会重新抛出异常，由外层事务回滚
+        :return: (转出方新余额, 转入方新余额)；余额不足或写入失败返回 None
+        """
+        amount = abs(self.round_money(amount))
+        if amount <= 0 or from_xuid == to_xuid:
+            return None
+        debited = False
+        # 处于外层事务内时，块内失败不会在此回滚，须把异常交给外层事务整体回滚
+        nested = self.db.in_transaction()
+        with self._money_lock:
+            try:
+                # 转入方尚无经济记录时先按初始金钱建档
+                self.get_player_money_by_xuid(to_xuid)
+                with self.db.transaction():
+                    rows = self.db.execute_rowcount(
+                        self._SQL_CHARGE_MONEY, (amount, from_xuid, amount)
+                    )
+                    if rows < 0:
+                        raise RuntimeError("debit failed")
+                    debited = rows == 1
+                    if debited:
+                        rows = self.db.execute_rowcount(
+                            self._SQL_ADD_MONEY, (amount, to_xuid)
+                        )
+                        if rows != 1:
+                            raise RuntimeError(f"credit affected {rows} rows")
+            except Exception as e:
+                debited = False
+                self._log("error", f"[ARC Core]Transfer money error: {str(e)}")
+                self._emit_persistent_error(
+                    "BANK17",
+                    f"transfer_money_by_xuid from={from_xuid!r} to={to_xuid!r} amount={amount}: {e}",
+                    e,
+                )
+                if nested:
+                    raise
+            finally:
+                # 提交或回滚后再以数据库为准重新读取
+                self.invalidate_money_cache(from_xuid)
+                self.invalidate_money_cache(to_xuid)
+            if not debited:
+                return None
+            self._notify_money_changed()
+            return (
+                self.get_player_money_by_xuid(from_xuid),
+                self.get_player_money_by_xuid(to_xuid),
+            )
 
     def change_player_money_by_xuid(
         self, xuid: str, money_to_change: float
@@ -183,6 +403,10 @@ class Economy:
             self.round_money(amount)
         )
 
+    def has_enough_money_by_xuid(self, xuid: str, amount: float) -> bool:
+        """按 XUID 判断余额是否足够（快速路径：调用方保证 amount 已为正数且已精确到分）"""
+        return self.get_player_money_by_xuid(xuid) >= amount
+
     def get_top_richest_xuids(self, top_count: int) -> List[Dict[str, Any]]:
         """获取金钱最多的玩家列表，每项为 {'xuid': str, 'money': float}"""
         try:
@@ -196,17 +420,12 @@ class Economy:
             return []
 
     def get_player_money_rank_by_xuid(self, xuid: str) -> Optional[int]:
-        """按 XUID 获取玩家金钱排名（从 1 开始）"""
+        """按 XUID 获取玩家金钱排名（从 1 开始，金钱相同者名次相同）"""
         try:
+            # 名次 = 金钱多于该玩家的人数 + 1，借助 money 索引做范围计数，无需对全表排序
             result = self.db.query_one(
-                """
-                WITH RankedPlayers AS (
-                    SELECT xuid, money,
-                    ROW_NUMBER() OVER (ORDER BY money DESC) as rank
-                    FROM player_economy
-                )
-                SELECT rank FROM RankedPlayers WHERE xuid = ?
-                """,
+                "SELECT (SELECT COUNT(*) FROM player_economy WHERE money > me.money) + 1 AS rank "
+                "FROM player_economy me WHERE me.xuid = ?",
                 (xuid,),
             )
             return result["rank"] if result else None
@@ -1,13 +1,106 @@
 # -*- coding: utf-8 -*-
 """领地系统：建表、区块索引、CRUD、子领地、权限设置的全部数据/逻辑层"""
 import json
-from typing import Callable, Dict, Optional, Set
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, Optional, Set, Tuple
+
+
+# Morton（Z 序）编码：8 位 → 16 位的位展开查找表
+_MORTON_SPREAD = tuple(
+    sum(((i >> bit) & 1) << (2 * bit) for bit in range(8)) for i in range(256)
+)
+# 网格坐标偏移为非负后参与编码，覆盖 ±2^23 个网格单元
+_GRID_COORD_OFFSET = 1 << 23
+
+
+def _morton2(gx: int, gz: int) -> int:
+    """将两个网格坐标按位交错编码为单个整数，相邻网格的键也相近"""
+    t = _MORTON_SPREAD
+    gx += _GRID_COORD_OFFSET
+    gz += _GRID_COORD_OFFSET
+    return (
+        t[gx & 0xFF] | t[(gx >> 8) & 0xFF] << 16 | t[(gx >> 16) & 0xFF] << 32
+        | (t[gz & 0xFF] | t[(gz >> 8) & 0xFF] << 16 | t[(gz >> 16) & 0xFF] << 32) << 1
+    )
+
+
+# lands 表结构：(列名, 列定义)，建表与升级共用
+_LAND_FIELDS = (
+    ("land_id", "INTEGER PRIMARY KEY AUTOINCREMENT"),
+    ("owner_xuid", "TEXT NOT NULL"),
+    ("land_name", "TEXT NOT NULL"),
+    ("dimension", "TEXT NOT NULL"),
+    ("min_x", "INTEGER NOT NULL"),
+    ("max_x", "INTEGER NOT NULL"),
+    ("min_y", "INTEGER NOT NULL DEFAULT 0"),
+    ("max_y", "INTEGER NOT NULL DEFAULT 255"),
+    ("min_z", "INTEGER NOT NULL"),
+    ("max_z", "INTEGER NOT NULL"),
+    ("tp_x", "REAL NOT NULL"),
+    ("tp_y", "REAL NOT NULL"),
+    ("tp_z", "REAL NOT NULL"),
+    ("shared_users", "TEXT"),
+    ("allow_explosion", "INTEGER DEFAULT 0"),
+    ("allow_public_interact", "INTEGER DEFAULT 0"),
+    ("allow_actor_interaction", "INTEGER DEFAULT 0"),
+    ("allow_actor_damage", "INTEGER DEFAULT 0"),
+    ("allow_frame", "INTEGER DEFAULT 0"),
+    ("owner_paid_money", "REAL DEFAULT 0"),
+    ("allow_non_public_land", "INTEGER DEFAULT 0"),
+)
+
+# 旧版 lands 表升级时需要补齐的列（后续版本新增的列），定义取自 _LAND_FIELDS
+_LAND_UPGRADE_COLUMNS = tuple(
+    (col, definition) for col, definition in _LAND_FIELDS
+    if col in (
+        "min_y", "max_y", "allow_explosion", "allow_public_interact",
+        "allow_actor_interaction", "allow_actor_damage", "allow_frame",
+        "owner_paid_money", "allow_non_public_land",
+    )
+)
+
+# 生物伤害策略位：bit0 = 公共领地，bit1 = 允许生物伤害
+DAMAGE_POLICY_PUBLIC = 1
+DAMAGE_POLICY_ALLOW_DAMAGE = 2
+
+
+@dataclass(frozen=True)
+class LandInfo:
+    """领地权限判定用的只读快照：shared_users 为 frozenset，标志位为属性，领地变更时由 LandSystem 失效重建"""
+    # 显式 __slots__（dataclass(slots=True) 需 Python 3.10+）：字段紧凑存放，无实例 __dict__
+    __slots__ = (
+        "land_id", "owner_xuid", "shared_users",
+        "allow_explosion", "allow_public_interact", "allow_actor_interaction",
+        "allow_actor_damage", "allow_frame", "is_public", "aabb", "damage_policy",
+    )
+    land_id: int
+    owner_xuid: str
+    shared_users: FrozenSet[str]
+    allow_explosion: bool
+    allow_public_interact: bool
+    allow_actor_interaction: bool
+    allow_actor_damage: bool
+    allow_frame: bool
+    is_public: bool
+    aabb: Tuple[int, int, int, int, int, int]  # (min_x, max_x, min_y, max_y, min_z, max_z)
+    damage_policy: int  # DAMAGE_POLICY_* 位组合
+
+
+@dataclass(frozen=True)
+class SubLandInfo:
+    """子领地权限判定用的只读快照"""
+    __slots__ = ("sub_land_id", "owner_xuid", "shared_users")
+    sub_land_id: int
+    owner_xuid: str
+    shared_users: FrozenSet[str]
 
 
 class LandSystem:
     """领地系统：负责 lands / sub_lands / chunk_lands_* 表的所有数据操作，不包含 UI 逻辑。"""
 
     PUBLIC_LAND_OWNER_XUID = "0"  # 公共领地的 owner_xuid 固定值
+    LAND_GRID_SHIFT = 6  # 内存空间索引的网格边长为 2^6 = 64 方块
 
     def __init__(self, database_manager, setting_manager, logger=None):
         self.db = database_manager
@@ -16,6 +109,23 @@ class LandSystem:
         self._persistent_error_cb: Optional[
             Callable[[str, str, Optional[BaseException]], None]
         ] = None
+        # 内存空间索引（懒加载）：位置查询不再访问数据库
+        # _land_grids: {dimension: {morton2(gx, gz): ((land_id, min_x, max_x, min_y, max_y, min_z, max_z, is_public), ...)}}
+        #   每个维度一张网格，仅包含有领地的维度；单元内直接内联领地范围记录（按 land_id 升序），查询时无需再查 _land_bounds
+        # _land_y_range: {dimension: (该维度全部领地的最小 min_y, 最大 max_y)}，超出范围的 y 直接判定不在领地内
+        # _land_bounds: {land_id: (dimension, min_x, max_x, min_y, max_y, min_z, max_z, is_public)}
+        # _sub_land_index: {parent_land_id: (union_bounds, ((sub_land_id, min_x, max_x, min_y, max_y, min_z, max_z), ...))}
+        #   union_bounds 为全部子领地的外包盒 (min_x, max_x, min_y, max_y, min_z, max_z)，无子领地时为 None
+        # 单元与子领地条目均为不可变元组，修改时整体替换，位置检测线程可无锁读取
+        self._land_grids: Optional[Dict[str, Dict[int, Tuple[tuple, ...]]]] = None
+        self._land_y_range: Dict[str, Tuple[int, int]] = {}
+        self._land_bounds: Dict[int, tuple] = {}
+        self._sub_land_index: Dict[int, tuple] = {}
+        self._index_lock = threading.RLock()
+        # 领地权限快照缓存：{land_id: LandInfo}
+        self._land_info_cache: Dict[int, LandInfo] = {}
+        # 子领地权限快照缓存：{sub_land_id: SubLandInfo}
+        self._sub_land_perm_cache: Dict[int, SubLandInfo] = {}
         self._load_config()
 
     def set_persistent_error_callback(
@@ -37,6 +147,8 @@ class LandSystem:
         self.land_price = self._parse_int("LAND_PRICE", 100)
         self.land_sell_refund_coefficient = self._parse_float("LAND_SELL_REFUND_COEFFICIENT", 0.9)
         self.land_min_size = self._parse_int("LAND_MIN_SIZE", 5)
+        # 公共领地受保护生物：配置加载时解析一次，重载配置时重建
+        self._protected_entities = self._parse_protected_entities()
 
     def reload_config(self):
         self._load_config()
@@ -69,14 +181,6 @@ class LandSystem:
 
     # ─── 工具 ─────────────────────────────────────────────────────────────────
 
-    def _column_exists(self, table: str, column: str) -> bool:
-        """检查表中是否存在指定列"""
-        try:
-            columns_info = self.db.query_all(f"PRAGMA table_info({table})")
-            return any(col["name"] == column for col in columns_info)
-        except Exception:
-            return False
-
     def _get_dimension_table(self, dimension: str) -> str:
         dim_name = dimension.split(":")[-1].lower()
         dim_name = "".join(c if c.isalnum() else "_" for c in dim_name)
@@ -94,6 +198,177 @@ class LandSystem:
                 keys.add(f"{cx}_{cz}")
         return keys
 
+    # ─── 内存空间索引 ─────────────────────────────────────────────────────────
+
+    def _ensure_land_index(self) -> Dict[str, Dict[int, Tuple[tuple, ...]]]:
+        """返回按维度划分的领地网格索引，未加载时从 lands 表构建"""
+        grids = self._land_grids
+        if grids is not None:
+            return grids
+        with self._index_lock:
+            if self._land_grids is not None:
+                return self._land_grids
+            # 先在局部构建完整索引再一次性发布，避免其他线程读到半成品
+            grids: Dict[str, Dict[int, Tuple[tuple, ...]]] = {}
+            land_bounds: Dict[int, tuple] = {}
+            rows = self.db.try_query_all(
+                "SELECT land_id, owner_xuid, dimension, min_x, max_x, min_y, max_y, min_z, max_z "
+                "FROM lands ORDER BY land_id"
+            )
+            if rows is None:
+                # 查询失败时不发布索引（保持 None），下次调用重新构建，避免空索引让领地保护整体失效
+                self._log("error", "Build land index error: query lands failed, will retry on next lookup")
+                self._emit_persistent_error("LAND_SYS5", "_ensure_land_index query lands failed", None)
+                return grids
+            for r in rows:
+                bounds = land_bounds[r["land_id"]] = (
+                    r["dimension"], r["min_x"], r["max_x"], r["min_y"], r["max_y"],
+                    r["min_z"], r["max_z"], r["owner_xuid"] == self.PUBLIC_LAND_OWNER_XUID,
+                )
+                self._grid_insert(grids.setdefault(r["dimension"], {}), r["land_id"], bounds)
+            self._land_bounds = land_bounds
+            self._sub_land_index = {}
+            self._land_y_range = self._compute_y_ranges(land_bounds)
+            self._land_grids = grids
+            return grids
+
+    @staticmethod
+    def _compute_y_ranges(land_bounds: Dict[int, tuple]) -> Dict[str, Tuple[int, int]]:
+        y_range: Dict[str, Tuple[int, int]] = {}
+        for dimension, _, _, min_y, max_y, _, _, _ in land_bounds.values():
+            lo_hi = y_range.get(dimension)
+            if lo_hi is None:
+                y_range[dimension] = (min_y, max_y)
+            else:
+                y_range[dimension] = (min(lo_hi[0], min_y), max(lo_hi[1], max_y))
+        return y_range
+
+    def _get_grid_cells(self, min_x: int, max_x: int, min_z: int, max_z: int):
+        shift = self.LAND_GRID_SHIFT
+        for gx in range(min_x >> shift, (max_x >> shift) + 1):
+            for gz in range(min_z >> shift, (max_z >> shift) + 1):
+                yield gx, gz
+
+    def _grid_keys(self, bounds: tuple):
+        """领地范围 (dimension, min_x, max_x, min_y, max_y, min_z, max_z, is_public) 覆盖的全部网格键"""
+        _, min_x, max_x, _, _, min_z, max_z, _ = bounds
+        for gx, gz in self._get_grid_cells(min_x, max_x, min_z, max_z):
+            yield _morton2(gx, gz)
+
+    def _grid_insert(self, grid: dict, land_id: int, bounds: tuple):
+        record = (land_id,) + bounds[1:]
+        for key in self._grid_keys(bounds):
+            grid[key] = grid.get(key, ()) + (record,)
+
+    def _index_add_land(
+        self, land_id: int, dimension: str,
+        min_x: int, max_x: int, min_y: int, max_y: int, min_z: int, max_z: int,
+        is_public: bool,
+    ):
+        with self._index_lock:
+            grids = self._land_grids
+            if grids is None:
+                return
+            bounds = self._land_bounds[land_id] = (
+                dimension, min_x, max_x, min_y, max_y, min_z, max_z, is_public
+            )
+            # 先扩展 Y 范围再发布新网格，查询线程不会因 Y 范围过窄漏判
+            lo_hi = self._land_y_range.get(dimension)
+            self._land_y_range[dimension] = (
+                (min_y, max_y) if lo_hi is None else (min(lo_hi[0], min_y), max(lo_hi[1], max_y))
+            )
+            grid = grids.get(dimension)
+            if grid is None:
+                grid = {}
+                self._grid_insert(grid, land_id, bounds)
+                grids[dimension] = grid
+            else:
+                self._grid_insert(grid, land_id, bounds)
+
+    def _index_remove_land(self, land_id: int):
+        with self._index_lock:
+            grids = self._land_grids
+            if grids is None:
+                return
+            bounds = self._land_bounds.pop(land_id, None)
+            self._sub_land_index.pop(land_id, None)
+            if bounds is None:
+                return
+            dimension = bounds[0]
+            grid = grids.get(dimension)
+            if grid is not None:
+                for key in self._grid_keys(bounds):
+                    remaining = tuple(rec for rec in grid.get(key, ()) if rec[0] != land_id)
+                    if remaining:
+                        grid[key] = remaining
+                    else:
+                        grid.pop(key, None)
+                if not grid:
+                    grids.pop(dimension, None)
+            self._land_y_range = self._compute_y_ranges(self._land_bounds)
+
+    def _index_set_land_public(self, land_id: int, is_public: bool):
+        with self._index_lock:
+            bounds = self._land_bounds.get(land_id)
+            if bounds is None:
+                return
+            bounds = self._land_bounds[land_id] = bounds[:7] + (is_public,)
+            grids = self._land_grids
+            grid = grids.get(bounds[0]) if grids is not None else None
+            if grid is None:
+                return
+            record = (land_id,) + bounds[1:]
+            for key in self._grid_keys(bounds):
+                cell = grid.get(key)
+                if cell:
+                    grid[key] = tuple(record if rec[0] == land_id else rec for rec in cell)
+
+    def invalidate_land_index(self):
+        """丢弃内存空间索引，下次查询时从数据库重建"""
+        with self._index_lock:
+            self._land_grids = None
+            self._land_bounds = {}
+            self._land_y_range = {}
+            self._sub_land_index = {}
+            self._land_info_cache = {}
+            self._sub_land_perm_cache = {}
+
+    def has_lands_in_dimension(self, dimension: str) -> bool:
+        """该维度是否存在任何领地"""
+        return dimension in self._ensure_land_index()
+
+    def _get_sub_land_entries(self, parent_land_id: int) -> tuple:
+        """返回父领地下的 (外包盒, 子领地范围条目)，未加载时从 sub_lands 表读取"""
+        cached = self._sub_land_index.get(parent_land_id)
+        if cached is not None:
+            return cached
+        rows = self.db.try_query_all(
+            "SELECT sub_land_id, min_x, max_x, min_y, max_y, min_z, max_z "
+            "FROM sub_lands WHERE parent_land_id = ? ORDER BY sub_land_id",
+            (parent_land_id,),
+        )
+        if rows is None:
+            # 查询失败不写入缓存，下次调用重新读取
+            self._log("error", f"Load sub lands error: parent_land_id={parent_land_id}")
+            self._emit_persistent_error(
+                "LAND_SYS6", f"_get_sub_land_entries query sub_lands failed parent_land_id={parent_land_id!r}", None
+            )
+            return None, ()
+        entries = tuple(
+            (r["sub_land_id"], r["min_x"], r["max_x"], r["min_y"], r["max_y"], r["min_z"], r["max_z"])
+            for r in rows
+        )
+        union = None
+        if entries:
+            union = (
+                min(e[1] for e in entries), max(e[2] for e in entries),
+                min(e[3] for e in entries), max(e[4] for e in entries),
+                min(e[5] for e in entries), max(e[6] for e in entries),
+            )
+        cached = (union, entries)
+        self._sub_land_index[parent_land_id] = cached
+        return cached
+
     def _ensure_dimension_table(self, dimension: str) -> bool:
         table = self._get_dimension_table(dimension)
         if self.db.table_exists(table):
@@ -141,33 +416,10 @@ class LandSystem:
 
     def init_land_tables(self) -> bool:
         try:
-            land_fields = {
-                "land_id": "INTEGER PRIMARY KEY AUTOINCREMENT",
-                "owner_xuid": "TEXT NOT NULL",
-                "land_name": "TEXT NOT NULL",
-                "dimension": "TEXT NOT NULL",
-                "min_x": "INTEGER NOT NULL",
-                "max_x": "INTEGER NOT NULL",
-                "min_y": "INTEGER NOT NULL DEFAULT 0",
-                "max_y": "INTEGER NOT NULL DEFAULT 255",
-                "min_z": "INTEGER NOT NULL",
-                "max_z": "INTEGER NOT NULL",
-                "tp_x": "REAL NOT NULL",
-                "tp_y": "REAL NOT NULL",
-                "tp_z": "REAL NOT NULL",
-                "shared_users": "TEXT",
-                "allow_explosion": "INTEGER DEFAULT 0",
-                "allow_public_interact": "INTEGER DEFAULT 0",
-                "allow_actor_interaction": "INTEGER DEFAULT 0",
-                "allow_actor_damage": "INTEGER DEFAULT 0",
-                "allow_frame": "INTEGER DEFAULT 0",
-                "owner_paid_money": "REAL DEFAULT 0",
-                "allow_non_public_land": "INTEGER DEFAULT 0",
-            }
             if self.db.table_exists("lands"):
                 self._upgrade_land_table()
                 return True
-            success = self.db.create_table("lands", land_fields)
+            success = self.db.create_table("lands", dict(_LAND_FIELDS))
             if success:
                 print("[ARC Core]Created new land table with all fields")
             return success
@@ -177,39 +429,25 @@ class LandSystem:
 
     def _upgrade_land_table(self) -> bool:
         try:
-            def _add_col(col: str, definition: str):
-                if not self._column_exists("lands", col):
+            # 一次读取现有列，缺失的列在同一事务中补齐
+            existing = {col["name"] for col in self.db.query_all("PRAGMA table_info(lands)")}
+            with self.db.transaction():
+                for col, definition in _LAND_UPGRADE_COLUMNS:
+                    if col in existing:
+                        continue
                     ok = self.db.execute(f"ALTER TABLE lands ADD COLUMN {col} {definition}")
                     msg = f"added {col}" if ok else f"failed to add {col}"
                     print(f"[ARC Core]Upgraded land table: {msg}")
-                    return ok
-                return None
-
-            _add_col("allow_explosion", "INTEGER DEFAULT 0")
-            _add_col("allow_public_interact", "INTEGER DEFAULT 0")
-            _add_col("allow_actor_interaction", "INTEGER DEFAULT 0")
-            _add_col("allow_actor_damage", "INTEGER DEFAULT 0")
-            _add_col("allow_frame", "INTEGER DEFAULT 0")
-
-            if not self._column_exists("lands", "owner_paid_money"):
-                ok = self.db.execute(
-                    "ALTER TABLE lands ADD COLUMN owner_paid_money REAL DEFAULT 0"
-                )
-                if ok:
-                    upgrade_price = self._parse_float("LAND_PRICE", 100.0)
-                    self.db.execute(
-                        "UPDATE lands SET owner_paid_money = (max_x - min_x + 1) * (max_z - min_z + 1) * ?",
-                        (upgrade_price,),
-                    )
-                    print(
-                        f"[ARC Core]owner_paid_money initialized (land_price={upgrade_price}, one-time migration only)"
-                    )
-                else:
-                    print("[ARC Core]Failed to add owner_paid_money column")
-
-            _add_col("allow_non_public_land", "INTEGER DEFAULT 0")
-            _add_col("min_y", "INTEGER NOT NULL DEFAULT 0")
-            _add_col("max_y", "INTEGER NOT NULL DEFAULT 255")
+                    if ok and col == "owner_paid_money":
+                        # 一次性迁移：按当前地价估算已有领地的购买花费
+                        upgrade_price = self._parse_float("LAND_PRICE", 100.0)
+                        self.db.execute(
+                            "UPDATE lands SET owner_paid_money = (max_x - min_x + 1) * (max_z - min_z + 1) * ?",
+                            (upgrade_price,),
+                        )
+                        print(
+                            f"[ARC Core]owner_paid_money initialized (land_price={upgrade_price}, one-time migration only)"
+                        )
             return True
         except Exception as e:
             print(f"[ARC Core]Upgrade land table error: {str(e)}")
@@ -247,6 +485,7 @@ class LandSystem:
             lands = self.db.query_all(
                 "SELECT land_id, dimension, min_x, max_x, min_z, max_z FROM lands"
             )
+            self.invalidate_land_index()
             if not lands:
                 return True, 0, 0, None
 
@@ -300,6 +539,10 @@ class LandSystem:
             )
             result = self.db.query_one("SELECT last_insert_rowid() as land_id")
             land_id = result["land_id"]
+            self._index_add_land(
+                land_id, dimension, min_x, max_x, min_y, max_y, min_z, max_z,
+                owner_xuid == self.PUBLIC_LAND_OWNER_XUID,
+            )
             if not self._register_land_to_chunk_mapping(land_id, dimension, min_x, max_x, min_z, max_z):
                 self._log("error", f"Create land: chunk mapping failed, land_id={land_id}")
             return land_id
@@ -311,30 +554,27 @@ class LandSystem:
         self, dimension: str, x: int, z: int, y: int = None
     ) -> Optional[int]:
         try:
-            x, z = int(x), int(z)
-            if not self._ensure_dimension_table(dimension):
+            grid = self._ensure_land_index().get(dimension)
+            if grid is None:
                 return None
-            table = self._get_dimension_table(dimension)
-            chunk_key = self._get_chunk_key(x, z)
-            chunk_data = self.db.query_one(
-                f"SELECT land_ids FROM {table} WHERE chunk_key = ?", (chunk_key,)
-            )
-            if not chunk_data:
+            if y is not None:
+                y = int(y)
+                # 超出该维度全部领地的 Y 范围，无需哈希网格
+                y_range = self._land_y_range.get(dimension)
+                if y_range is not None and not (y_range[0] <= y <= y_range[1]):
+                    return None
+            x, z = int(x), int(z)
+            shift = self.LAND_GRID_SHIFT
+            candidates = grid.get(_morton2(x >> shift, z >> shift))
+            if not candidates:
                 return None
-            land_ids = json.loads(chunk_data["land_ids"])
             public_land_id = None
-            for land_id in land_ids:
-                land = self.db.query_one(
-                    "SELECT * FROM lands WHERE land_id = ?", (land_id,)
-                )
-                if not land:
+            for land_id, min_x, max_x, min_y, max_y, min_z, max_z, is_public in candidates:
+                if not (min_x <= x <= max_x and min_z <= z <= max_z):
                     continue
-                if not (land["min_x"] <= x <= land["max_x"] and land["min_z"] <= z <= land["max_z"]):
+                if y is not None and not (min_y <= y <= max_y):
                     continue
-                if y is not None:
-                    if not (land.get("min_y", 0) <= int(y) <= land.get("max_y", 255)):
-                        continue
-                if land["owner_xuid"] != self.PUBLIC_LAND_OWNER_XUID:
+                if not is_public:
                     return land_id
                 public_land_id = land_id
             return public_land_id
@@ -342,11 +582,54 @@ class LandSystem:
             self._log("error", f"Get land at pos error: {str(e)}")
             return None
 
+    def get_lands_at_positions(self, dimension: str, positions) -> list:
+        """
+        批量查询 (x, z) 坐标所在领地，返回与 positions 等长的领地 ID 列表（不在领地内为 None）
+        同一网格单元只查一次，空单元内的坐标直接判定为 None
+        """
+        try:
+            grid = self._ensure_land_index().get(dimension)
+            if grid is None:
+                return [None] * len(positions)
+            shift = self.LAND_GRID_SHIFT
+            cell_candidates: Dict[Tuple[int, int], tuple] = {}
+            result = []
+            append = result.append
+            # 相邻坐标大多落在同一单元：记住上一个单元，连续命中时跳过元组构造与字典查找
+            last_gx = last_gz = None
+            candidates = ()
+            for x, z in positions:
+                gx = x >> shift
+                gz = z >> shift
+                if gx != last_gx or gz != last_gz:
+                    last_gx, last_gz = gx, gz
+                    cell = (gx, gz)
+                    candidates = cell_candidates.get(cell)
+                    if candidates is None:
+                        candidates = cell_candidates[cell] = grid.get(_morton2(gx, gz), ())
+                if not candidates:
+                    append(None)
+                    continue
+                found = None
+                for land_id, min_x, max_x, _, _, min_z, max_z, is_public in candidates:
+                    if min_x <= x <= max_x and min_z <= z <= max_z:
+                        found = land_id
+                        if not is_public:
+                            break
+                append(found)
+            return result
+        except Exception as e:
+            self._log("error", f"Get lands at positions error: {str(e)}")
+            return [None] * len(positions)
+
     def delete_land(self, land_id: int) -> bool:
         try:
             land = self.db.query_one("SELECT * FROM lands WHERE land_id = ?", (land_id,))
             if not land:
                 return False
+            # 先删库，成功后再清理区块映射与内存索引；删除失败时领地仍受保护
+            if not self.db.delete("lands", "land_id = ?", (land_id,)):
+                return False
             table = self._get_dimension_table(land["dimension"])
             for chunk_key in self._get_affected_chunks(
                 land["min_x"], land["max_x"], land["min_z"], land["max_z"]
@@ -365,7 +648,9 @@ class LandSystem:
                             )
                         else:
                             self.db.delete(table, "chunk_key = ?", (chunk_key,))
-            return self.db.delete("lands", "land_id = ?", (land_id,))
+            self._index_remove_land(land_id)
+            self._invalidate_land_info(land_id)
+            return True
         except Exception as e:
             self._log("error", f"Delete land error: {str(e)}")
             return False
@@ -473,6 +758,37 @@ class LandSystem:
             self._log("error", f"Get land info error: {str(e)}")
             return {}
 
+    def get_land_perm_info(self, land_id: int) -> Optional[LandInfo]:
+        """获取领地权限快照（带缓存），领地不存在时返回 None"""
+        info = self._land_info_cache.get(land_id)
+        if info is not None:
+            return info
+        land = self.get_land_info(land_id)
+        if not land:
+            return None
+        is_public = land["owner_xuid"] == self.PUBLIC_LAND_OWNER_XUID
+        info = LandInfo(
+            land_id=land_id,
+            owner_xuid=land["owner_xuid"],
+            shared_users=frozenset(land["shared_users"]),
+            allow_explosion=land["allow_explosion"],
+            allow_public_interact=land["allow_public_interact"],
+            allow_actor_interaction=land["allow_actor_interaction"],
+            allow_actor_damage=land["allow_actor_damage"],
+            allow_frame=land["allow_frame"],
+            is_public=is_public,
+            aabb=(land["min_x"], land["max_x"], land["min_y"], land["max_y"], land["min_z"], land["max_z"]),
+            damage_policy=(
+                (DAMAGE_POLICY_PUBLIC if is_public else 0)
+                | (DAMAGE_POLICY_ALLOW_DAMAGE if land["allow_actor_damage"] else 0)
+            ),
+        )
+        self._land_info_cache[land_id] = info
+        return info
+
+    def _invalidate_land_info(self, land_id: int):
+        self._land_info_cache.pop(land_id, None)
+
     def get_land_owner(self, land_id: int) -> str:
         try:
             row = self.db.query_one("SELECT owner_xuid FROM lands WHERE land_id = ?", (land_id,))
@@ -544,12 +860,16 @@ class LandSystem:
         try:
             if not self.get_land_info(land_id):
                 return False
-            return self.db.execute(
+            ok = self.db.execute(
                 "UPDATE lands SET owner_xuid = ?, owner_paid_money = 0, "
                 "allow_public_interact = 1, allow_actor_interaction = 1, allow_actor_damage = 1 "
                 "WHERE land_id = ?",
                 (self.PUBLIC_LAND_OWNER_XUID, land_id),
             )
+            if ok:
+                self._index_set_land_public(land_id, True)
+            self._invalidate_land_info(land_id)
+            return ok
         except Exception as e:
             self._log("error", f"Set land as public error: {str(e)}")
             return False
@@ -558,10 +878,13 @@ class LandSystem:
         try:
             if not self.get_land_info(land_id):
                 return False
-            self.db.execute(
+            if not self.db.execute(
                 "UPDATE lands SET owner_xuid = ? WHERE land_id = ?",
                 (new_owner_xuid, land_id),
-            )
+            ):
+                return False
+            self._index_set_land_public(land_id, new_owner_xuid == self.PUBLIC_LAND_OWNER_XUID)
+            self._invalidate_land_info(land_id)
             return True
         except Exception as e:
             self._log("error", f"Transfer land error: {str(e)}")
@@ -597,10 +920,12 @@ class LandSystem:
 
     def _set_land_flag(self, land_id: int, col: str, value: bool) -> bool:
         try:
-            return bool(self.db.execute(
+            ok = bool(self.db.execute(
                 f"UPDATE lands SET {col} = ? WHERE land_id = ?",
                 (1 if value else 0, land_id),
             ))
+            self._invalidate_land_info(land_id)
+            return ok
         except Exception as e:
             self._log("error", f"Set land flag {col} error: {str(e)}")
             return False
@@ -635,10 +960,12 @@ class LandSystem:
             if xuid in shared:
                 return False
             shared.append(xuid)
-            return bool(self.db.execute(
+            ok = bool(self.db.execute(
                 "UPDATE lands SET shared_users = ? WHERE land_id = ?",
                 (json.dumps(shared), land_id),
             ))
+            self._invalidate_land_info(land_id)
+            return ok
         except Exception as e:
             self._log("error", f"Add land shared user error: {str(e)}")
             return False
@@ -653,21 +980,26 @@ class LandSystem:
             if xuid not in shared:
                 return False
             shared.remove(xuid)
-            return bool(self.db.execute(
+            ok = bool(self.db.execute(
                 "UPDATE lands SET shared_users = ? WHERE land_id = ?",
                 (json.dumps(shared), land_id),
             ))
+            self._invalidate_land_info(land_id)
+            return ok
         except Exception as e:
             self._log("error", f"Remove land shared user error: {str(e)}")
             return False
 
     # ─── 公共领地 ─────────────────────────────────────────────────────────────
 
-    def get_public_land_protected_entities(self) -> Set[str]:
+    def _parse_protected_entities(self) -> FrozenSet[str]:
         raw = self.setting_manager.GetSetting("PUBLIC_LAND_PROTECTED_ENTITIES")
         if not raw or not str(raw).strip():
-            return set()
-        return {s.strip() for s in str(raw).split(",") if s.strip()}
+            return frozenset()
+        return frozenset(s.strip() for s in str(raw).split(",") if s.strip())
+
+    def get_public_land_protected_entities(self) -> FrozenSet[str]:
+        return self._protected_entities
 
     # ─── 子领地 ───────────────────────────────────────────────────────────────
 
@@ -701,6 +1033,7 @@ class LandSystem:
                 (parent_land_id, owner_xuid, sub_land_name, min_x, max_x, min_y, max_y, min_z, max_z, "[]"),
             )
             row = self.db.query_one("SELECT last_insert_rowid() as sub_land_id")
+            self._sub_land_index.pop(parent_land_id, None)
             return row["sub_land_id"] if row else None
         except Exception as e:
             self._log("error", f"Create sub land error: {str(e)}")
@@ -708,7 +1041,11 @@ class LandSystem:
 
     def delete_sub_land(self, sub_land_id: int) -> bool:
         try:
-            return self.db.delete("sub_lands", "sub_land_id = ?", (sub_land_id,))
+            # 子领地范围索引按父领地缓存，删除时整体失效（低频操作）
+            self._sub_land_index.clear()
+            ok = self.db.delete("sub_lands", "sub_land_id = ?", (sub_land_id,))
+            self._sub_land_perm_cache.pop(sub_land_id, None)
+            return ok
         except Exception as e:
             self._log("error", f"Delete sub land error: {str(e)}")
             return False
@@ -723,6 +1060,22 @@ class LandSystem:
             self._log("error", f"Get sub land info error: {str(e)}")
             return {}
 
+    def get_sub_land_perm_info(self, sub_land_id: int) -> Optional[SubLandInfo]:
+        """获取子领地权限快照（带缓存），子领地不存在时返回 None"""
+        info = self._sub_land_perm_cache.get(sub_land_id)
+        if info is not None:
+            return info
+        sub = self.get_sub_land_info(sub_land_id)
+        if not sub:
+            return None
+        info = SubLandInfo(
+            sub_land_id=sub_land_id,
+            owner_xuid=sub["owner_xuid"],
+            shared_users=frozenset(sub["shared_users"]),
+        )
+        self._sub_land_perm_cache[sub_land_id] = info
+        return info
+
     def get_sub_lands_by_parent(self, parent_land_id: int) -> Dict[int, dict]:
         try:
             rows = self.db.query_all(
@@ -750,18 +1103,15 @@ class LandSystem:
         self, parent_land_id: int, x: int, y: int, z: int
     ) -> Optional[int]:
         try:
-            rows = self.db.query_all(
-                "SELECT sub_land_id, min_x, max_x, min_y, max_y, min_z, max_z "
-                "FROM sub_lands WHERE parent_land_id = ?",
-                (parent_land_id,),
-            )
-            for r in rows:
-                if (
-                    r["min_x"] <= x <= r["max_x"]
-                    and r.get("min_y", 0) <= y <= r.get("max_y", 255)
-                    and r["min_z"] <= z <= r["max_z"]
-                ):
-                    return r["sub_land_id"]
+            union, entries = self._get_sub_land_entries(parent_land_id)
+            # 外包盒快速排除：绝大多数位置不在任何子领地内，无需逐条扫描
+            if union is None or not (
+                union[0] <= x <= union[1] and union[2] <= y <= union[3] and union[4] <= z <= union[5]
+            ):
+                return None
+            for sub_land_id, min_x, max_x, min_y, max_y, min_z, max_z in entries:
+                if min_x <= x <= max_x and min_y <= y <= max_y and min_z <= z <= max_z:
+                    return sub_land_id
             return None
         except Exception as e:
             self._log("error", f"Get sub land at pos error: {str(e)}")
@@ -821,10 +1171,12 @@ class LandSystem:
             if not info or xuid in info["shared_users"]:
                 return False
             info["shared_users"].append(xuid)
-            return bool(self.db.execute(
+            ok = bool(self.db.execute(
                 "UPDATE sub_lands SET shared_users = ? WHERE sub_land_id = ?",
                 (json.dumps(info["shared_users"]), sub_land_id),
             ))
+            self._sub_land_perm_cache.pop(sub_land_id, None)
+            return ok
         except Exception as e:
             self._log("error", f"Add sub land shared user error: {str(e)}")
             return False
@@ -835,10 +1187,12 @@ class LandSystem:
             if not info or xuid not in info["shared_users"]:
                 return False
             info["shared_users"].remove(xuid)
-            return bool(self.db.execute(
+            ok = bool(self.db.execute(
                 "UPDATE sub_lands SET shared_users = ? WHERE sub_land_id = ?",
                 (json.dumps(info["shared_users"]), sub_land_id),
             ))
+            self._sub_land_perm_cache.pop(sub_land_id, None)
+            return ok
         except Exception as e:
             self._log("error", f"Remove sub land shared user error: {str(e)}")
             return False
@@ -4,6 +4,8 @@ MAIN_PATH = 'plugins/ARCCore'
 
 class LanguageManager:
     language_dict = {}  # Class variable shared across instances
+    # 已解析文本缓存：{(语言代码, 键): 文本}，仅缓存非空文本，重载语言时清空
+    _text_cache = {}
 
     def __init__(self, default_language_code):
         self.language_code = default_language_code.upper()
@@ -31,8 +33,13 @@ class LanguageManager:
                     LanguageManager.language_dict[self.language_code][key.strip()] = value.strip()
 
     def GetText(self, key, lang_code=None):
+        cache_key = (lang_code or self.language_code, key)
+        text = LanguageManager._text_cache.get(cache_key)
+        if text is not None:
+            return text
+
         # If no language code provided, use instance's language code
-        target_lang = (lang_code or self.language_code).upper()
+        target_lang = cache_key[0].upper()
 
         # If the target language hasn't been loaded yet, load it
         if target_lang not in LanguageManager.language_dict:
@@ -49,10 +56,13 @@ class LanguageManager:
             print(f'[ARC Core]Key {key} not found in language file {target_lang}.txt.')
             return ''
         else:
-            return LanguageManager.language_dict[target_lang][key].replace('\\n', '\n')
+            text = LanguageManager.language_dict[target_lang][key].replace('\\n', '\n')
+            LanguageManager._text_cache[cache_key] = text
+            return text
 
     def ReloadCurrentLanguage(self):
         """重新从文件加载当前语言（实例对应的 language_code）"""
+        LanguageManager._text_cache.clear()
         if self.language_code in LanguageManager.language_dict:
             LanguageManager.language_dict[self.language_code].clear()
         self._load_language_file()
\ No newline at end of file
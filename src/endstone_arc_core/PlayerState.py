@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""玩家运行时状态：登录、所在领地、圈地暂存、OP 坐标记录等，按玩家集中存放。"""
+from typing import Optional
+
+
+class PlayerState:
+    """单个在线玩家的运行时状态，使用 __slots__ 固定字段，减少每次事件的字典查找。"""
+
+    __slots__ = (
+        'authed',
+        'in_land_id',
+        'last_block_pos',
+        'land_pos1',
+        'new_land',
+        'op_c1',
+        'op_c2',
+        'op_last_cmd',
+    )
+
+    def __init__(self):
+        # 是否已登录
+        self.authed: bool = False
+        # 当前所在领地 ID（移动事件维护），-1 表示不在任何领地
+        self.in_land_id: int = -1
+        # 上次移动事件所在方块 (x, y, z, dimension)，未跨方块的移动不重新判定领地
+        self.last_block_pos: Optional[tuple] = None
+        # /landpos1 暂存：{'dimension': str, 'x': int, 'y': int, 'z': int}
+        self.land_pos1: Optional[dict] = None
+        # 待购买领地：{'dimension': str, 'min_x': int, 'max_x': int, 'min_y': int, 'max_y': int, 'min_z': int, 'max_z': int}
+        self.new_land: Optional[dict] = None
+        # OP 坐标记录与上次执行指令（空输入时重复执行）
+        self.op_c1: Optional[tuple] = None
+        self.op_c2: Optional[tuple] = None
+        self.op_last_cmd: str = ''
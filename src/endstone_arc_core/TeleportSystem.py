@@ -1,39 +1,52 @@
 # -*- coding: utf-8 -*-
 """传送系统：公共传送点、玩家 Home、死亡回归、随机传送、TPA/TPHERE 数据与执行逻辑"""
+import heapq
 import math
 import random
 import time
-from typing import Dict, Any, Optional, List, Tuple
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional, List, Tuple
+
+
+_TWO_PI = 2.0 * math.pi
+
+# 维度名称 -> execute 命令所需格式（模块级常量，避免每次调用重建映射）
+_DIMENSION_MAP = {
+    "minecraft:overworld": "overworld",
+    "minecraft:the_nether": "the_nether",
+    "minecraft:the_end": "the_end",
+    "Overworld": "overworld",
+    "TheNether": "the_nether",
+    "TheEnd": "the_end",
+    "overworld": "overworld",
+    "the_nether": "the_nether",
+    "the_end": "the_end",
+    "nether": "the_nether",
+    "end": "the_end",
+}
 
 
 def format_dimension_name(dimension: str) -> str:
     """将完整维度名称转换为 execute 命令所需格式"""
-    dimension_mapping = {
-        "minecraft:overworld": "overworld",
-        "minecraft:the_nether": "the_nether",
-        "minecraft:the_end": "the_end",
-        "Overworld": "overworld",
-        "TheNether": "the_nether",
-        "TheEnd": "the_end",
-        "overworld": "overworld",
-        "the_nether": "the_nether",
-        "the_end": "the_end",
-        "nether": "the_nether",
-        "end": "the_end",
-    }
-    if dimension in dimension_mapping:
-        return dimension_mapping[dimension]
-    if ":" in dimension:
-        return dimension.split(":")[1]
-    return dimension
+    mapped = _DIMENSION_MAP.get(dimension)
+    if mapped is not None:
+        return mapped
+    # 未知的命名空间维度（如 "mod:custom"）取冒号后部分
+    return dimension.partition(":")[2] or dimension
+
+
+def format_command_player_name(player_name: str) -> str:
+    """命令中的玩家名：含空格时加引号"""
+    return f'"{player_name}"' if " " in player_name else player_name
 
 
 def generate_tp_command_to_position(
     player_name: str, position: tuple, dimension: str = "overworld"
 ) -> str:
-    formatted_name = f'"{player_name}"' if " " in player_name else player_name
+    formatted_name = format_command_player_name(player_name)
     formatted_dimension = format_dimension_name(dimension)
-    return f'execute in {formatted_dimension} run tp {formatted_name} {" ".join([str(int(_)) for _ in position])}'
+    x, y, z = position
+    return f"execute in {formatted_dimension} run tp {formatted_name} {int(x)} {int(y)} {int(z)}"
 
 
 def generate_tp_command_to_player(
@@ -41,10 +54,8 @@ def generate_tp_command_to_player(
     target_player_name: str,
     dimension: str = "overworld",
 ) -> str:
-    formatted_player = f'"{player_name}"' if " " in player_name else player_name
-    formatted_target = (
-        f'"{target_player_name}"' if " " in target_player_name else target_player_name
-    )
+    formatted_player = format_command_player_name(player_name)
+    formatted_target = format_command_player_name(target_player_name)
     formatted_dimension = format_dimension_name(dimension)
     return f"execute in {formatted_dimension} run tp {formatted_player} {formatted_target}"
 
@@ -58,8 +69,13 @@ class TeleportSystem:
         self.logger = logger
         self.server = None
 
-        self.player_death_locations: Dict[str, Dict[str, Any]] = {}
+        # 死亡位置：{player_key: (dimension, x, y, z)}
+        self.player_death_locations: Dict[Any, Tuple[str, float, float, float]] = {}
         self.teleport_requests: Dict[str, Dict[str, Any]] = {}
+        # 请求过期小顶堆：(expire_time, target_name)，清理时只弹出已到期的堆顶
+        self._tp_expiry_heap: List[Tuple[float, str]] = []
+        # 公共传送点缓存：只读视图 {warp_name: 记录}，创建/删除成功后清空，下次读取重新加载
+        self._public_warps_cache: Optional[Mapping[str, Mapping[str, Any]]] = None
 
         self._load_config()
 
@@ -154,8 +170,14 @@ class TeleportSystem:
                 "z": "REAL NOT NULL",
                 "created_time": "INTEGER NOT NULL",
             }
-            return self.db.create_table("public_warps", warp_fields) and self.db.create_table(
-                "player_homes", home_fields
+            if not (
+                self.db.create_table("public_warps", warp_fields)
+                and self.db.create_table("player_homes", home_fields)
+            ):
+                return False
+            # 按主人 + 名称查找/排序 Home 均走此索引（仅按主人过滤时使用其前缀）
+            return self.db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_homes_owner_name ON player_homes(owner_xuid, home_name)"
             )
         except Exception as e:
             self._log("error", f"Init teleport tables error: {str(e)}")
@@ -181,14 +203,20 @@ class TeleportSystem:
                 "created_by": creator_xuid,
                 "created_time": int(time.time()),
             }
-            return self.db.insert("public_warps", warp_data)
+            success = self.db.insert("public_warps", warp_data)
+            if success:
+                self._public_warps_cache = None
+            return success
         except Exception as e:
             self._log("error", f"Create public warp error: {str(e)}")
             return False
 
     def delete_public_warp(self, warp_name: str) -> bool:
         try:
-            return self.db.delete("public_warps", "warp_name = ?", (warp_name,))
+            success = self.db.delete("public_warps", "warp_name = ?", (warp_name,))
+            if success:
+                self._public_warps_cache = None
+            return success
         except Exception as e:
             self._log("error", f"Delete public warp error: {str(e)}")
             return False
@@ -202,18 +230,30 @@ class TeleportSystem:
             self._log("error", f"Get public warp error: {str(e)}")
             return None
 
-    def get_all_public_warps(self) -> Dict[str, Dict[str, Any]]:
-        try:
-            results = self.db.query_all(
-                "SELECT * FROM public_warps ORDER BY warp_name"
-            )
-            return {row["warp_name"]: dict(row) for row in results}
-        except Exception as e:
-            self._log("error", f"Get all public warps error: {str(e)}")
-            return {}
+    def get_all_public_warps(self) -> Mapping[str, Mapping[str, Any]]:
+        """所有公共传送点 {warp_name: 记录} 的只读视图，结果缓存至下次创建/删除；查询失败时返回空且不缓存"""
+        cached = self._public_warps_cache
+        if cached is not None:
+            return cached
+        results = self.db.try_query_all(
+            "SELECT * FROM public_warps ORDER BY warp_name"
+        )
+        if results is None:
+            self._log("error", "Get all public warps error: query public_warps failed")
+            return MappingProxyType({})
+        cached = self._public_warps_cache = MappingProxyType(
+            {row["warp_name"]: MappingProxyType(row) for row in results}
+        )
+        return cached
 
     def public_warp_exists(self, warp_name: str) -> bool:
-        return self.get_public_warp(warp_name) is not None
+        try:
+            return self.db.query_one(
+                "SELECT 1 FROM public_warps WHERE warp_name = ? LIMIT 1", (warp_name,)
+            ) is not None
+        except Exception as e:
+            self._log("error", f"Check public warp exists error: {str(e)}")
+            return False
 
     # ---------- 玩家 Home ----------
     def create_player_home(
@@ -274,6 +314,18 @@ class TeleportSystem:
             self._log("error", f"Get player homes error: {str(e)}")
             return {}
 
+    def get_player_home_dimensions(self, owner_xuid: str) -> Dict[str, str]:
+        """玩家所有 Home 的 {名称: 维度}，只取列表展示所需的两列"""
+        try:
+            results = self.db.query_all(
+                "SELECT home_name, dimension FROM player_homes WHERE owner_xuid = ? ORDER BY home_name",
+                (owner_xuid,),
+            )
+            return {row["home_name"]: row["dimension"] for row in results}
+        except Exception as e:
+            self._log("error", f"Get player home dimensions error: {str(e)}")
+            return {}
+
     def get_player_home_count(self, owner_xuid: str) -> int:
         try:
             result = self.db.query_one(
@@ -286,68 +338,87 @@ class TeleportSystem:
             return 0
 
     def player_home_exists(self, owner_xuid: str, home_name: str) -> bool:
-        return self.get_player_home(owner_xuid, home_name) is not None
+        try:
+            return self.db.query_one(
+                "SELECT 1 FROM player_homes WHERE owner_xuid = ? AND home_name = ? LIMIT 1",
+                (owner_xuid, home_name),
+            ) is not None
+        except Exception as e:
+            self._log("error", f"Check player home exists error: {str(e)}")
+            return False
 
     # ---------- 死亡位置 ----------
     def record_death_location(
-        self, player_name: str, dimension: str, x: float, y: float, z: float
+        self, player_key, dimension: str, x: float, y: float, z: float
     ):
-        self.player_death_locations[player_name] = {
-            "dimension": dimension,
-            "x": x,
-            "y": y,
-            "z": z,
-        }
+        self.player_death_locations[player_key] = (dimension, x, y, z)
+
+    def get_death_location(self, player_key) -> Optional[Tuple[str, float, float, float]]:
+        return self.player_death_locations.get(player_key)
 
-    def get_death_location(self, player_name: str) -> Optional[Dict[str, Any]]:
-        return self.player_death_locations.get(player_name)
+    def has_death_location(self, player_key) -> bool:
+        return player_key in self.player_death_locations
 
-    def has_death_location(self, player_name: str) -> bool:
-        return player_name in self.player_death_locations
+    def pop_death_location(self, player_key) -> Optional[Tuple[str, float, float, float]]:
+        """取出并清除死亡位置（一次查找），没有记录时返回 None"""
+        return self.player_death_locations.pop(player_key, None)
 
-    def clear_death_location(self, player_name: str):
-        if player_name in self.player_death_locations:
-            del self.player_death_locations[player_name]
+    def clear_death_location(self, player_key):
+        self.player_death_locations.pop(player_key, None)
 
     # ---------- 传送请求 ----------
     def add_request(
         self, target_name: str, request_type: str, sender_name: str
     ) -> bool:
-        if target_name in self.teleport_requests:
+        now = time.time()
+        if self.has_request(target_name, now):
             return False
+        expire_time = now + 60
         self.teleport_requests[target_name] = {
             "type": request_type,
             "sender": sender_name,
-            "expire_time": time.time() + 60,
+            "expire_time": expire_time,
         }
+        heapq.heappush(self._tp_expiry_heap, (expire_time, target_name))
         return True
 
+    def has_request(self, target_name: str, now: Optional[float] = None) -> bool:
+        """目标玩家是否已有未过期的请求（已过期但尚未清理的视为没有）"""
+        req = self.teleport_requests.get(target_name)
+        if req is None:
+            return False
+        return req["expire_time"] > (time.time() if now is None else now)
+
     def get_request(self, target_name: str) -> Optional[Dict[str, Any]]:
         return self.teleport_requests.get(target_name)
 
     def remove_request(self, target_name: str):
-        if target_name in self.teleport_requests:
-            del self.teleport_requests[target_name]
+        self.teleport_requests.pop(target_name, None)
+
+    def peek_pending_request(self, player_name: str) -> Optional[Dict[str, Any]]:
+        """取玩家当前待处理的请求（每个目标至多一个），已过期的顺带删除并返回 None"""
+        req = self.teleport_requests.get(player_name)
+        if req is None:
+            return None
+        if req["expire_time"] <= time.time():
+            del self.teleport_requests[player_name]
+            return None
+        return req
 
     def get_pending_requests_for_player(self, player_name: str) -> List[Dict[str, Any]]:
-        pending = []
-        if player_name in self.teleport_requests:
-            req = self.teleport_requests[player_name]
-            if req["expire_time"] > time.time():
-                pending.append(req)
-            else:
-                del self.teleport_requests[player_name]
-        return pending
+        req = self.peek_pending_request(player_name)
+        return [req] if req is not None else []
 
     def cleanup_expired_requests(self):
         now = time.time()
-        expired = [
-            name
-            for name, req in self.teleport_requests.items()
-            if req["expire_time"] <= now
-        ]
-        for name in expired:
-            del self.teleport_requests[name]
+        heap = self._tp_expiry_heap
+        requests = self.teleport_requests
+        while heap and heap[0][0] <= now:
+            _, name = heapq.heappop(heap)
+            # 堆中可能残留已被处理或被新请求替换的条目，需再次核对
+            req = requests.get(name)
+            if req is not None and req["expire_time"] <= now:
+                del requests[name]
 
     # ---------- 执行传送 ----------
     def execute_teleport_to_position(
@@ -372,13 +443,12 @@ class TeleportSystem:
         self.server.dispatch_command(self.server.command_sender, cmd)
 
     def get_random_teleport_position(self) -> Tuple[int, int, int]:
-        angle = random.uniform(0, 2 * math.pi)
-        radius = getattr(self, "random_teleport_radius", 5000)
-        center_x = getattr(self, "random_teleport_center_x", 0)
-        center_z = getattr(self, "random_teleport_center_z", 0)
-        distance = random.uniform(0, radius)
-        x = center_x + int(distance * math.cos(angle))
-        z = center_z + int(distance * math.sin(angle))
+        # 中心与半径由 _load_config 保证已设置
+        uniform = random.uniform
+        angle = uniform(0.0, _TWO_PI)
+        distance = uniform(0.0, self.random_teleport_radius)
+        x = self.random_teleport_center_x + int(distance * math.cos(angle))
+        z = self.random_teleport_center_z + int(distance * math.sin(angle))
         return (x, 256, z)
 
     def apply_slow_falling_effect(self, player_name: str):
@@ -1,17 +1,19 @@
 import hashlib
+import hmac
 import json
 import math
 import random
-import threading
 import time
 from datetime import datetime
+from functools import partial
 from pathlib import Path
-from typing import Dict, Any, Optional, Set
+from typing import Dict, Any, FrozenSet, Mapping, Optional, Set
 
 from endstone import ColorFormat, Player, GameMode
 from endstone.form import ActionForm, TextInput, ModalForm, Label
 from endstone.command import Command, CommandSender
-from endstone.event import event_handler, PlayerJoinEvent, PlayerQuitEvent, PlayerRespawnEvent, BlockBreakEvent, BlockPlaceEvent, PlayerDeathEvent, PlayerInteractEvent, ActorExplodeEvent, PlayerInteractActorEvent, ActorDamageEvent, ActorDeathEvent, PlayerChatEvent 
+from endstone.event import event_handler, PlayerJoinEvent, PlayerQuitEvent, PlayerRespawnEvent, BlockBreakEvent, BlockPlaceEvent, PlayerDeathEvent, PlayerInteractEvent, ActorExplodeEvent, PlayerInteractActorEvent, ActorDamageEvent, ActorDeathEvent, PlayerChatEvent, PlayerMoveEvent, PlayerTeleportEvent
+from endstone.level import Location
 from endstone.plugin import Plugin
 
 from endstone_arc_core.DatabaseManager import DatabaseManager
@@ -19,13 +21,50 @@ from endstone_arc_core.Economy import Economy
 from endstone_arc_core.LanguageManager import LanguageManager
 from endstone_arc_core.SettingManager import SettingManager
 from endstone_arc_core.TeleportSystem import TeleportSystem, generate_tp_command_to_position
-from endstone_arc_core.LandSystem import LandSystem
+from endstone_arc_core.LandSystem import LandSystem, LandInfo, SubLandInfo, DAMAGE_POLICY_PUBLIC, DAMAGE_POLICY_ALLOW_DAMAGE
+from endstone_arc_core.PlayerState import PlayerState
 from endstone_arc_core.TitleSystem import TitleSystem
 from endstone_arc_core.AchievementSystem import AchievementSystem
 from endstone_arc_core.EntityDisplayNameManager import EntityDisplayNameManager
 from endstone_arc_core.KillRewardConfig import KillRewardConfig, normalize_entity_type_id
 from endstone_arc_core.arc_error_log import append_arc_error_log, format_context_lines
 
+_sha256 = hashlib.sha256
+
+# 表单提交数据解析：直接复用一个无自定义参数的解码器，跳过 json.loads 每次的参数判断
+_decode_form_data = json.JSONDecoder().decode
+
+
+# 领地生物伤害判定表：按 LandInfo.damage_policy 分派，返回是否拦截本次伤害
+def _damage_private_deny(plugin, land_info: LandInfo, attacker, actor_type) -> bool:
+    # 非公共领地且未开放生物伤害：仅主人/授权用户可造成伤害
+    attacker_xuid = plugin.get_player_xuid_by_name(attacker.name)
+    return attacker_xuid is None or (
+        attacker_xuid != land_info.owner_xuid and attacker_xuid not in land_info.shared_users
+    )
+
+
+def _damage_public_deny(plugin, land_info: LandInfo, attacker, actor_type) -> bool:
+    # 公共领地且禁止生物伤害：一律拦截
+    return True
+
+
+def _damage_private_allow(plugin, land_info: LandInfo, attacker, actor_type) -> bool:
+    return False
+
+
+def _damage_public_allow(plugin, land_info: LandInfo, attacker, actor_type) -> bool:
+    # 公共领地且开放生物伤害：仅保护白名单生物
+    return bool(actor_type) and actor_type in plugin._get_public_land_protected_entities()
+
+
+_DAMAGE_DISPATCH = {
+    0: _damage_private_deny,
+    DAMAGE_POLICY_PUBLIC: _damage_public_deny,
+    DAMAGE_POLICY_ALLOW_DAMAGE: _damage_private_allow,
+    DAMAGE_POLICY_PUBLIC | DAMAGE_POLICY_ALLOW_DAMAGE: _damage_public_allow,
+}
+
 MAIN_PATH = 'plugins/ARCCore'
 
 class ARCCorePlugin(Plugin):
@@ -121,6 +160,12 @@ class ARCCorePlugin(Plugin):
         self.entity_display_name_manager = EntityDisplayNameManager(Path(MAIN_PATH), logger=None)
         self.kill_reward_config = KillRewardConfig(Path(MAIN_PATH), logger=None)
         self.init_database()
+        # 玩家身份缓存（player_basic_info 的 xuid/name）：{小写去空白的玩家名: xuid}、{xuid: 玩家名}
+        self._xuid_by_name: Dict[str, str] = {}
+        self._name_by_xuid: Dict[str, str] = {}
+        # 离线 OP 状态缓存：{xuid: 是否为OP}，与 player_basic_info.is_op 一致（仅 sync_player_identity 改写该列）
+        self._op_status_by_xuid: Dict[str, bool] = {}
+        self._load_player_identity_cache()
         self._arc_error_log_path = str(Path(MAIN_PATH) / "error_log.txt")
 
         # 首富头衔：缓存当前首富 xuid，避免每次都重复发放
@@ -129,8 +174,11 @@ class ARCCorePlugin(Plugin):
         self.if_protect_spawn = self.setting_manager.GetSetting('IF_PROTECT_SPAWN')
         if self.if_protect_spawn is None:
             self.if_protect_spawn = False
+        else:
+            self.if_protect_spawn = str(self.if_protect_spawn).lower() in ['true', '1', 'yes']
         self.spawn_pos_dict = self.get_all_spawn_locations()
-        self.spawn_protect_range = self.setting_manager.GetSetting('SPAWN_PROTECT_RANGE')
+        self._spawn_tp_templates: Dict[str, str] = {}
+        self._rebuild_spawn_tp_templates()
         self.spawn_protect_range = self.setting_manager.GetSetting('SPAWN_PROTECT_RANGE')
         if self.spawn_protect_range is None:
             self.spawn_protect_range = 8
@@ -139,9 +187,14 @@ class ARCCorePlugin(Plugin):
                 self.spawn_protect_range = int(self.spawn_protect_range)
             except ValueError:
                 self.spawn_protect_range = 8
+        # 出生点保护范围（按维度预计算 AABB）：{dimension: (min_x, max_x, min_z, max_z)}
+        self._spawn_aabb: Dict[str, tuple] = {}
+        self._rebuild_spawn_protect_aabb()
 
-        # 玩家认证
-        self.player_authentication_state = {}
+        # 玩家运行时状态（认证、所在领地、圈地暂存、OP 坐标等）：{player_key: PlayerState}，键见 _player_key
+        self.players: Dict[Any, PlayerState] = {}
+        # 在线玩家快照：{小写去空白的玩家名: xuid}，仅在进服/退出时维护，按名查 xuid 无需遍历在线列表
+        self._online_xuid_by_name: Dict[str, str] = {}
 
         # 玩家圈地
         self.land_min_distance = self.setting_manager.GetSetting('MIN_LAND_DISTANCE')
@@ -164,26 +217,22 @@ class ARCCorePlugin(Plugin):
             self.land_min_size = int(self.land_min_size)
         except (ValueError, TypeError):
             self.land_min_size = 5  # 默认最小尺寸为5
-        self.player_new_land_creation_info = {}  # {name: {'dimension': str, 'min_x': int, 'max_x': int, 'min_y': int, 'max_y': int, 'min_z': int, 'max_z': int}}
-        self.player_land_pos1 = {}  # {name: {'dimension': str, 'x': int, 'y': int, 'z': int}} 暂存/landpos1
 
-        # OP坐标记录与上次执行指令（空输入时重复执行）
-        self.op_coordinate1_dict = {}
-        self.op_coordinate2_dict = {}
-        self.op_last_command_dict = {}
+        # 静态表单缓存（内容不随玩家变化的菜单复用同一实例，重载配置时清空）：{menu_id: ActionForm}
+        self._form_cache: Dict[str, ActionForm] = {}
+
+        # 财富榜快照：[(玩家名, 金钱)]，已按配置过滤 OP；经济模块在任一余额写入后标记脏，脏或过期时重新查询
+        self._money_rank_cache: Optional[list] = None
+        self._money_rank_cache_time = 0.0
+        self._money_rank_dirty = True
+        self._money_rank_cache_ttl = 30.0
+
+        # 邀请奖励配置解析结果缓存（首次使用时解析，重载配置或 OP 修改时清空）
+        self._invite_reward_cache: Optional[Dict[str, Any]] = None
 
         # OP 调试模式（开启后触发方块/生物相关事件时向该 OP 发送调试信息）
         self.op_debug_mode = set()
 
-        # 玩家出入领地
-        self.player_in_land_id_dict = {}
-        
-        # 多线程位置检测相关
-        self.position_thread = None
-        self.position_thread_running = False
-        self.position_thread_lock = threading.Lock()
-        self.position_check_interval = 0.5  # 每0.5秒检查一次，比原来的1.25秒更快
-
 
         # 公告系统
         self.broadcast_messages = []  # 存储公告消息列表
@@ -328,6 +377,7 @@ class ARCCorePlugin(Plugin):
             self._arc_persistent_error(error_code, detail, exc)
 
         self.economy.set_persistent_error_callback(_on_arc_persistent_error)
+        self.economy.set_money_changed_callback(self._mark_money_rank_dirty)
         self.land_system.set_persistent_error_callback(_on_arc_persistent_error)
         self.teleport_system.set_server(self.server)
         self.teleport_system.set_logger(self.logger)
@@ -340,11 +390,12 @@ class ARCCorePlugin(Plugin):
         self._load_broadcast_messages()
         self._init_cleaner_system()
 
-        # 启动多线程位置检测系统
-        self.start_position_thread()
+        # 插件启用前已在线的玩家（如热重载）不会触发进服事件，补录到在线玩家快照
+        for online_player in self.server.online_players:
+            self._online_xuid_by_name[(online_player.name or '').strip().lower()] = str(online_player.xuid)
 
         # Scheduler tasks
-        # 移除了原有的 player_position_listener，现在使用多线程方式
+        # 领地进入提示由 PlayerMoveEvent / PlayerTeleportEvent 驱动，不再轮询玩家位置
         self.server.scheduler.run_task(self, self.teleport_system.cleanup_expired_requests, delay=0, period=100)  # 每5秒清理一次过期请求
         
         # 公告系统定时任务
@@ -361,7 +412,7 @@ class ARCCorePlugin(Plugin):
         
         # 别踩白块接入
         self.dtwt_plugin = self.server.plugin_manager.get_plugin('arc_dtwt')
-        print('[ARC Core]DTWT plugin loaded:', self.dtwt_plugin is not None)
+        self.logger.info(f"[ARC Core]DTWT plugin loaded: {self.dtwt_plugin is not None}")
 
         # 首富头衔：启动时做一次同步
         try:
@@ -372,8 +423,6 @@ class ARCCorePlugin(Plugin):
             pass
 
     def on_disable(self) -> None:
-        # 停止位置检测线程
-        self.stop_position_thread()
         self.logger.info(f"{ColorFormat.YELLOW}[ARC Core]Plugin disabled!")
 
     def _arc_persistent_error(
@@ -426,10 +475,9 @@ class ARCCorePlugin(Plugin):
                 sender.send_message(f'[ARC Core]This command only works for players.')
                 return True
             dimension_name = sender.location.dimension.name
-            new_spawn_pos = (sender.location.x, sender.location.y, sender.location.z)
+            new_spawn_pos = (int(sender.location.x), int(sender.location.y), int(sender.location.z))
             r = self.update_spawn_location(dimension_name, new_spawn_pos)
             if r:
-                self.spawn_pos_dict[dimension_name] = new_spawn_pos
                 sender.send_message(self.language_manager.GetText('UPDATE_SPAWN_POS_SUCCESSFUL').format(dimension_name, new_spawn_pos))
             else:
                 sender.send_message(self.language_manager.GetText('UPDATE_SPAWN_POS_FAILED'))
@@ -450,16 +498,28 @@ class ARCCorePlugin(Plugin):
             if not isinstance(sender, Player):
                 sender.send_message(f'[ARC Core]This command only works for players.')
                 return True
-            self.server.dispatch_command(self.server.command_sender, f'kill {sender.name}')
+            # 优先直接设置生命值，避免命令解析；失败时退回 kill 指令
+            try:
+                sender.health = 0
+            except Exception:
+                self.server.dispatch_command(self.server.command_sender, f'kill {sender.name}')
             self.server.broadcast_message(self.language_manager.GetText('PLAYER_SUICIDE_MESSAGE').format(sender.name))
             return True
         if command.name == "spawn":
             if not isinstance(sender, Player):
                 sender.send_message(f'[ARC Core]This command only works for players.')
                 return True
-            if sender.location.dimension.name in self.spawn_pos_dict:
-                self.server.dispatch_command(self.server.command_sender,
-                                             f'tp {sender.name} {int(self.spawn_pos_dict[sender.location.dimension.name][0])} {int(self.spawn_pos_dict[sender.location.dimension.name][1])} {int(self.spawn_pos_dict[sender.location.dimension.name][2])}')
+            dimension = sender.location.dimension
+            spawn_pos = self.spawn_pos_dict.get(dimension.name)
+            if spawn_pos is not None:
+                # 优先直接调用传送 API，避免命令解析；失败时退回预生成的 tp 指令
+                # 整数坐标的 tp 指令会落在方块中心，API 传送同样偏移 0.5，两条路径落点一致
+                x, y, z = spawn_pos
+                try:
+                    sender.teleport(Location(dimension, x + 0.5, y, z + 0.5))
+                except Exception:
+                    self.server.dispatch_command(self.server.command_sender,
+                                                 self._spawn_tp_templates[dimension.name].format(name=sender.name))
                 sender.send_message(self.language_manager.GetText('PLAYER_TELEPORTED_TO_SPAWN_HINT'))
             else:
                 sender.send_message(self.language_manager.GetText('NO_SPAWN_POSITION_SET_MESSAGE'))
@@ -471,17 +531,16 @@ class ARCCorePlugin(Plugin):
             if not self.if_player_logined(sender):
                 self.show_main_menu(sender)
                 return True
-            self.player_land_pos1[sender.name] = {
+            pos1 = {
                 'dimension': sender.location.dimension.name,
                 'x': math.floor(sender.location.x),
                 'y': math.floor(sender.location.y),
                 'z': math.floor(sender.location.z)
             }
+            self._get_player_state(sender).land_pos1 = pos1
             sender.send_message(self.language_manager.GetText('CREATE_NEW_LAND_POS1_SET').format(
-                self.player_land_pos1[sender.name]['dimension'],
-                (self.player_land_pos1[sender.name]['x'],
-                 self.player_land_pos1[sender.name]['y'],
-                 self.player_land_pos1[sender.name]['z']))
+                pos1['dimension'],
+                (pos1['x'], pos1['y'], pos1['z']))
             )
             return True
         if command.name == 'landpos2':
@@ -491,17 +550,18 @@ class ARCCorePlugin(Plugin):
             if not self.if_player_logined(sender):
                 self.show_main_menu(sender)
                 return True
-            if sender.name not in self.player_land_pos1:
+            state = self._get_player_state(sender)
+            pos1 = state.land_pos1
+            if pos1 is None:
                 sender.send_message(self.language_manager.GetText('CREATE_NEW_LAND_POS2_SET_FAIL_POS1_NOT_SET'))
                 return True
-            pos1 = self.player_land_pos1[sender.name]
             if sender.location.dimension.name != pos1['dimension']:
                 sender.send_message(self.language_manager.GetText('CREATE_NEW_LAND_POS2_SET_FAIL_DIMENSION_CHANGED'))
                 return True
             x2 = math.floor(sender.location.x)
             y2 = math.floor(sender.location.y)
             z2 = math.floor(sender.location.z)
-            self.player_new_land_creation_info[sender.name] = {
+            state.new_land = {
                 'dimension': pos1['dimension'],
                 'min_x': min(pos1['x'], x2),
                 'max_x': max(pos1['x'], x2),
@@ -510,7 +570,7 @@ class ARCCorePlugin(Plugin):
                 'min_z': min(pos1['z'], z2),
                 'max_z': max(pos1['z'], z2)
             }
-            del self.player_land_pos1[sender.name]
+            state.land_pos1 = None
             sender.send_message(self.language_manager.GetText('CREATE_NEW_LAND_POS2_SET').format(
                 (x2, y2, z2)))
             self.show_new_land_info(sender)
@@ -549,6 +609,9 @@ class ARCCorePlugin(Plugin):
     # Event handlers
     @event_handler
     def on_player_join(self, event: PlayerJoinEvent):
+        xuid_s = str(event.player.xuid)
+        # 进服时丢弃该玩家的余额缓存，之后首次读取以数据库为准
+        self.economy.invalidate_money_cache(xuid_s)
         # 在玩家加入时立即初始化玩家数据（基本信息和经济数据）
         success, is_new_player = self.ensure_player_data_initialized(event.player)
         
@@ -560,15 +623,15 @@ class ARCCorePlugin(Plugin):
             self._execute_newbie_commands(event.player)
         
         self.server.broadcast_message(self.language_manager.GetText('PLAYER_JOIN_MESSAGE').format(event.player.name))
-        self.player_authentication_state[event.player.name] = False
+        self.players[self._player_key(event.player)] = PlayerState()
+        self._online_xuid_by_name[(event.player.name or '').strip().lower()] = xuid_s
         event.player.send_message(self.language_manager.GetText('PLAYER_JOIN_HINT'))
 
         # 登录时提示可领取的邀请奖励次数
         try:
-            player_xuid = str(event.player.xuid)
             pending_info = self.database_manager.query_one(
                 "SELECT pending_invite_reward_times FROM player_basic_info WHERE xuid = ?",
-                (player_xuid,)
+                (xuid_s,)
             )
             if pending_info is not None:
                 try:
@@ -619,53 +682,45 @@ class ARCCorePlugin(Plugin):
     @event_handler
     def on_player_quit(self, event: PlayerQuitEvent):
         self.server.broadcast_message(self.language_manager.GetText('PLAYER_QUIT_MESSAGE').format(event.player.name))
-        self.player_authentication_state[event.player.name] = False
-        
-        # 线程安全地清理玩家领地位置记录
-        with self.position_thread_lock:
-            if event.player.name in self.player_in_land_id_dict:
-                del self.player_in_land_id_dict[event.player.name]
+
+        # 清理玩家运行时状态（含领地位置记录）；单次 dict.pop 在 GIL 下是原子的，无需加锁
+        self.players.pop(self._player_key(event.player), None)
+        self._online_xuid_by_name.pop((event.player.name or '').strip().lower(), None)
         
         # 清理死亡位置记录
-        self.teleport_system.clear_death_location(event.player.name)
+        self.teleport_system.clear_death_location(self._player_key(event.player))
 
     @event_handler
     def on_block_break(self, event: BlockBreakEvent):
-        block_loc = event.block.location
-        target_desc = getattr(event.block, 'identifier', getattr(event.block, 'type', 'block'))
-        self._send_op_debug_message(
-            event.player, 'BlockBreak', str(target_desc),
-            block_loc.dimension.name, block_loc.x, block_loc.y, block_loc.z
-        )
-        if event.player.is_op:
+        player = event.player
+        block = event.block
+        block_loc = block.location
+        x, y, z, dimension = block_loc.x, block_loc.y, block_loc.z, block_loc.dimension.name
+        target_desc = str(getattr(block, 'identifier', getattr(block, 'type', 'block')))
+        if self.op_debug_mode:
+            self._send_op_debug_message(player, 'BlockBreak', target_desc, dimension, x, y, z)
+        if player.is_op:
             return
 
-        if self.dtwt_plugin is not None and self.dtwt_plugin.api_judge_if_start_block(event.block.location.x, event.block.location.y, event.block.location.z, event.block.dimension.name):
-            # print('DTWT block break, ignore')
+        if self.dtwt_plugin is not None and self.dtwt_plugin.api_judge_if_start_block(x, y, z, dimension):
             return
 
-        if not self.land_operation_check(event.player, event.block.location.dimension.name,
-                                    (event.block.location.x, event.block.location.y, event.block.location.z)):
+        pos = (x, y, z)
+        if not self.land_operation_check(player, dimension, pos):
             event.is_cancelled = True
-        if not event.is_cancelled and self._is_frame_block(event.block):
-            land_id = self.get_land_at_pos(
-                event.block.location.dimension.name,
-                int(event.block.location.x), int(event.block.location.z),
-                int(event.block.location.y)
-            )
+        if not event.is_cancelled and self._is_frame_block(block):
+            land_id = self.get_land_at_pos(dimension, int(x), int(z), int(y))
             if land_id is not None:
-                land_info = self.get_land_info(land_id)
-                if land_info and not land_info.get('allow_frame', False):
+                land_info = self.get_land_perm_info(land_id)
+                if land_info and not land_info.allow_frame:
                     event.is_cancelled = True
-                    event.player.send_message(self.language_manager.GetText('LAND_FRAME_PROTECT_HINT'))
-        if not self.spawn_protect_check(event.player, event.block.location.dimension.name,
-                                    (event.block.location.x, event.block.location.y, event.block.location.z)):
+                    player.send_message(self.language_manager.GetText('LAND_FRAME_PROTECT_HINT'))
+        if not event.is_cancelled and not self.spawn_protect_check(player, dimension, pos):
             event.is_cancelled = True
 
         if not event.is_cancelled:
             try:
-                block_id = getattr(event.block, 'identifier', getattr(event.block, 'type', 'block'))
-                self.achievement_system.record_block_break(event.player, str(block_id))
+                self.achievement_system.record_block_break(player, target_desc)
             except Exception:
                 pass
         return
@@ -677,31 +732,32 @@ class ARCCorePlugin(Plugin):
 
     @event_handler
     def on_block_place(self, event: BlockPlaceEvent):
-        block_loc = event.block.location
-        target_desc = getattr(event.block, 'identifier', getattr(event.block, 'type', 'block'))
-        self._send_op_debug_message(
-            event.player, 'BlockPlace', str(target_desc),
-            block_loc.dimension.name, block_loc.x, block_loc.y, block_loc.z
-        )
-        if event.player.is_op:
+        player = event.player
+        block = event.block
+        block_loc = block.location
+        x, y, z, dimension = block_loc.x, block_loc.y, block_loc.z, block_loc.dimension.name
+        if self.op_debug_mode:
+            target_desc = getattr(block, 'identifier', getattr(block, 'type', 'block'))
+            self._send_op_debug_message(player, 'BlockPlace', str(target_desc), dimension, x, y, z)
+        if player.is_op:
             return
-        if not self.land_operation_check(event.player, event.block.location.dimension.name,
-                                    (event.block.location.x, event.block.location.y, event.block.location.z)):
+        pos = (x, y, z)
+        if not self.land_operation_check(player, dimension, pos):
             event.is_cancelled = True
-        if not self.spawn_protect_check(event.player, event.block.location.dimension.name,
-                                    (event.block.location.x, event.block.location.y, event.block.location.z)):
+        if not event.is_cancelled and not self.spawn_protect_check(player, dimension, pos):
             event.is_cancelled = True
         return
     
     @event_handler
     def on_player_death(self, event: PlayerDeathEvent):
         # 记录玩家死亡位置
+        location = event.player.location
         self.teleport_system.record_death_location(
-            event.player.name,
-            event.player.location.dimension.name,
-            event.player.location.x,
-            event.player.location.y,
-            event.player.location.z,
+            self._player_key(event.player),
+            location.dimension.name,
+            location.x,
+            location.y,
+            location.z,
         )
         event.player.send_message(self.language_manager.GetText('DEATH_LOCATION_RECORDED'))
         
@@ -712,61 +768,47 @@ class ARCCorePlugin(Plugin):
     def on_player_interact(self, event: PlayerInteractEvent):
         """处理玩家交互事件，保护领地免受非法交互"""
         try:
-            # 玩家或OP判定
-            if not hasattr(event, 'player') or event.player is None:
-                return
-            # 调试模式：有方块时发送方块交互信息
-            if getattr(event, 'has_block', False):
-                block = getattr(event, 'block', None)
-                if block is not None and hasattr(block, 'location') and block.location is not None:
-                    bl = block.location
-                    target_desc = getattr(block, 'identifier', getattr(block, 'type', 'block'))
-                    dim_name = bl.dimension.name if hasattr(bl, 'dimension') and bl.dimension else getattr(event.player.location.dimension, 'name', '')
-                    self._send_op_debug_message(event.player, 'BlockInteract', str(target_desc), dim_name, bl.x, bl.y, bl.z)
-            if getattr(event.player, 'is_op', False):
-                return
-
+            player = event.player
             # 只检查有方块的交互事件
-            if not getattr(event, 'has_block', False):
+            if player is None or not event.has_block:
                 return
 
-            block = getattr(event, 'block', None)
-            if block is None or not hasattr(block, 'location') or block.location is None:
+            # 维度与坐标（一次性取出，方块信息不完整时直接跳过）
+            block = event.block
+            try:
+                block_location = block.location
+                x, y, z = block_location.x, block_location.y, block_location.z
+                dimension = block.dimension.name
+            except AttributeError:
                 return
 
-            block_location = block.location
+            # 调试模式：发送方块交互信息
+            if self.op_debug_mode:
+                target_desc = getattr(block, 'identifier', getattr(block, 'type', 'block'))
+                self._send_op_debug_message(player, 'BlockInteract', str(target_desc), dimension, x, y, z)
+            if player.is_op:
+                return
 
             # DTWT 设施判定（若可用）
             try:
-                if (
-                    self.dtwt_plugin is not None and
-                    hasattr(block, 'dimension') and block.dimension is not None and hasattr(block.dimension, 'name') and
-                    self.dtwt_plugin.api_judge_if_start_block(block_location.x, block_location.y, block_location.z, block.dimension.name)
-                ):
+                if self.dtwt_plugin is not None and self.dtwt_plugin.api_judge_if_start_block(x, y, z, dimension):
                     return
             except Exception:
                 # 外部插件异常不影响主流程
                 pass
 
-            # 维度与坐标
-            if hasattr(block, 'dimension') and block.dimension is not None and hasattr(block.dimension, 'name'):
-                dimension = block.dimension.name
-            else:
-                # 回退到玩家维度
-                dimension = event.player.location.dimension.name if hasattr(event.player, 'location') and event.player.location else ''
-
-            pos = (block_location.x, block_location.y, block_location.z)
+            pos = (x, y, z)
 
             # 检查是否在领地内且不是领地主人
-            if not self.land_interact_check(event.player, dimension, pos):
+            if not self.land_interact_check(player, dimension, pos):
                 event.is_cancelled = True
             elif self._is_frame_block(block):
-                land_id = self.get_land_at_pos(dimension, int(block_location.x), int(block_location.z), int(block_location.y))
+                land_id = self.get_land_at_pos(dimension, int(x), int(z), int(y))
                 if land_id is not None:
-                    land_info = self.get_land_info(land_id)
-                    if land_info and not land_info.get('allow_frame', False):
+                    land_info = self.get_land_perm_info(land_id)
+                    if land_info and not land_info.allow_frame:
                         event.is_cancelled = True
-                        event.player.send_message(self.language_manager.GetText('LAND_FRAME_PROTECT_HINT'))
+                        player.send_message(self.language_manager.GetText('LAND_FRAME_PROTECT_HINT'))
         except Exception as e:
             pass
             # self.logger.error(f"[ARC Core] on_player_interact error: {str(e)}")
@@ -775,30 +817,37 @@ class ARCCorePlugin(Plugin):
     def on_actor_explode(self, event: ActorExplodeEvent):
         """处理爆炸事件，保护领地免受爆炸伤害"""
         try:
+            _floor = math.floor
             explosion_location = event.location
             dimension = explosion_location.dimension.name
             
             # 检查爆炸位置是否在任何领地内
-            land_id = self.get_land_at_pos(dimension, math.floor(explosion_location.x), math.floor(explosion_location.z))
+            land_id = self.get_land_at_pos(dimension, _floor(explosion_location.x), _floor(explosion_location.z))
             if land_id is not None:
-                land_info = self.get_land_info(land_id)
-                if land_info and not land_info.get('allow_explosion', False):
+                land_info = self.get_land_perm_info(land_id)
+                if land_info and not land_info.allow_explosion:
                     # 如果领地不允许爆炸，则取消爆炸事件
                     event.is_cancelled = True
                     return
                     
             # 检查爆炸影响的方块是否在领地内
+            if not self.land_system.has_lands_in_dimension(dimension):
+                return
+            blocks = list(event.block_list)
+            # 一次性取出方块整数坐标（Block.x/z 已是方块坐标，无需构造 Location 再取整），按网格单元批量解析所在领地
+            block_land_ids = self.land_system.get_lands_at_positions(
+                dimension, [(b.x, b.z) for b in blocks]
+            )
+            # 每个领地的爆炸许可只查一次
+            allow_by_land = {None: True}
             filtered_blocks = []
-            for block in event.block_list:
-                block_land_id = self.get_land_at_pos(dimension, math.floor(block.location.x), math.floor(block.location.z))
-                if block_land_id is not None:
-                    block_land_info = self.get_land_info(block_land_id)
-                    if block_land_info and block_land_info.get('allow_explosion', False):
-                        # 如果该领地允许爆炸，保留这个方块在爆炸列表中
-                        filtered_blocks.append(block)
-                    # 如果不允许爆炸，则不添加到列表中（移除）
-                else:
-                    # 不在领地内的方块保持原样
+            for block, block_land_id in zip(blocks, block_land_ids):
+                allowed = allow_by_land.get(block_land_id)
+                if allowed is None:
+                    block_land_info = self.get_land_perm_info(block_land_id)
+                    allowed = allow_by_land[block_land_id] = bool(block_land_info and block_land_info.allow_explosion)
+                # 不在领地内或领地允许爆炸的方块保留，其余移除
+                if allowed:
                     filtered_blocks.append(block)
             
             # 更新爆炸影响的方块列表
@@ -811,37 +860,25 @@ class ARCCorePlugin(Plugin):
     def on_player_interact_actor(self, event: PlayerInteractActorEvent):
         """处理玩家与生物交互事件，保护领地内生物免受非法交互"""
         actor_location = event.actor.location
-        target_desc = getattr(event.actor, 'identifier', getattr(event.actor, 'type', 'actor'))
-        self._send_op_debug_message(
-            event.player, 'ActorInteract', str(target_desc),
-            actor_location.dimension.name, actor_location.x, actor_location.y, actor_location.z
-        )
+        if self.op_debug_mode:
+            target_desc = getattr(event.actor, 'identifier', getattr(event.actor, 'type', 'actor'))
+            self._send_op_debug_message(
+                event.player, 'ActorInteract', str(target_desc),
+                actor_location.dimension.name, actor_location.x, actor_location.y, actor_location.z
+            )
         # OP玩家跳过检查
         if event.player.is_op:
             return
 
-        # 获取生物位置
-        actor_location = event.actor.location
-        dimension = actor_location.dimension.name
-        ax = math.floor(actor_location.x)
-        ay = math.floor(actor_location.y)
-        az = math.floor(actor_location.z)
-
-        # 检查生物是否在领地内
-        land_id = self.get_land_at_pos(dimension, ax, az, ay)
-        if land_id is not None:
-            # 先检查子领地权限
-            sub_land_id = self.get_sub_land_at_pos(land_id, ax, ay, az)
-            if sub_land_id is not None:
-                sub_info = self.get_sub_land_info(sub_land_id)
-                if sub_info and self._check_sub_land_permission(event.player, sub_info):
-                    return
-            land_info = self.get_land_info(land_id)
-            if land_info and not land_info.get('allow_actor_interaction', False):
-                # 检查玩家是否有权限（领地主人或授权用户）
-                if not self._check_land_permission(event.player, land_info):
-                    event.is_cancelled = True
-                    event.player.send_message(self.language_manager.GetText('LAND_ACTOR_INTERACTION_DENIED'))
+        # 检查生物所在领地的互动权限
+        _, allowed = self.resolve_permission(
+            event.player, actor_location.dimension.name,
+            math.floor(actor_location.x), math.floor(actor_location.y), math.floor(actor_location.z),
+            'actor_interact'
+        )
+        if not allowed:
+            event.is_cancelled = True
+            event.player.send_message(self.language_manager.GetText('LAND_ACTOR_INTERACTION_DENIED'))
 
     @event_handler
     def on_actor_damage(self, event: ActorDamageEvent):
@@ -852,59 +889,25 @@ class ARCCorePlugin(Plugin):
             return
 
         actor_location = event.actor.location
-        target_desc = getattr(event.actor, 'identifier', getattr(event.actor, 'type', 'actor'))
-        self._send_op_debug_message(
-            attacker, 'ActorDamage', str(target_desc),
-            actor_location.dimension.name, actor_location.x, actor_location.y, actor_location.z
-        )
+        if self.op_debug_mode:
+            target_desc = getattr(event.actor, 'identifier', getattr(event.actor, 'type', 'actor'))
+            self._send_op_debug_message(
+                attacker, 'ActorDamage', str(target_desc),
+                actor_location.dimension.name, actor_location.x, actor_location.y, actor_location.z
+            )
         # 如果玩家是op则不判断
         if attacker.is_op:
             return
 
-        # 获取被攻击生物位置
-        actor_location = event.actor.location
-        dimension = actor_location.dimension.name
-        ax = math.floor(actor_location.x)
-        ay = math.floor(actor_location.y)
-        az = math.floor(actor_location.z)
-
-        # 检查生物是否在领地内
-        land_id = self.get_land_at_pos(dimension, ax, az, ay)
-        if land_id is not None:
-            # 先检查子领地权限：有子领地权限则直接放行
-            sub_land_id = self.get_sub_land_at_pos(land_id, ax, ay, az)
-            if sub_land_id is not None:
-                sub_info = self.get_sub_land_info(sub_land_id)
-                if sub_info and self._check_sub_land_permission(attacker, sub_info):
-                    return
-            land_info = self.get_land_info(land_id)
-            if not land_info:
-                return
-            # 公共领地：禁止生物伤害时一律拦截；开放生物伤害时仅保护白名单生物
-            if self.is_public_land(land_id):
-                if not land_info.get('allow_actor_damage', False):
-                    event.is_cancelled = True
-                    attacker.send_message(self.language_manager.GetText('LAND_ACTOR_DAMAGE_DENIED'))
-                    return
-                protected = self._get_public_land_protected_entities()
-                # print("entity",event.actor.type, "public land protected entities", protected)
-                damaged_entity_type = event.actor.type
-                if damaged_entity_type and damaged_entity_type in protected:
-                    event.is_cancelled = True
-                    attacker.send_message(self.language_manager.GetText('LAND_ACTOR_DAMAGE_DENIED'))
-                return
-            # 非公共领地：未开放生物伤害时仅主人/授权用户可造成伤害
-            if not land_info.get('allow_actor_damage', False):
-                attacker_xuid = self.get_player_xuid_by_name(attacker.name)
-                if attacker_xuid is None:
-                    event.is_cancelled = True
-                    attacker.send_message(self.language_manager.GetText('LAND_ACTOR_DAMAGE_DENIED'))
-                    return
-                owner_xuid = land_info['owner_xuid']
-                shared_users = land_info.get('shared_users', [])
-                if owner_xuid != attacker_xuid and attacker_xuid not in shared_users:
-                    event.is_cancelled = True
-                    attacker.send_message(self.language_manager.GetText('LAND_ACTOR_DAMAGE_DENIED'))
+        # 检查被攻击生物所在领地的伤害权限
+        _, allowed = self.resolve_permission(
+            attacker, actor_location.dimension.name,
+            math.floor(actor_location.x), math.floor(actor_location.y), math.floor(actor_location.z),
+            'actor_damage', event.actor.type
+        )
+        if not allowed:
+            event.is_cancelled = True
+            attacker.send_message(self.language_manager.GetText('LAND_ACTOR_DAMAGE_DENIED'))
 
     @event_handler
     def on_actor_death(self, event: ActorDeathEvent):
@@ -943,229 +946,146 @@ class ARCCorePlugin(Plugin):
         except Exception:
             return
 
-    def _check_sub_land_permission(self, player: Player, sub_land_info: dict) -> bool:
+    def _check_sub_land_permission(self, player: Player, sub_land_info: SubLandInfo) -> bool:
         """检查玩家是否拥有子领地权限（主人或授权用户）"""
         try:
-            owner_xuid = sub_land_info.get('owner_xuid', '')
-            shared_users = sub_land_info.get('shared_users', [])
-            return owner_xuid == str(player.xuid) or str(player.xuid) in shared_users
+            player_xuid = str(player.xuid)
+            return sub_land_info.owner_xuid == player_xuid or player_xuid in sub_land_info.shared_users
         except Exception as e:
             self.logger.error(f"Check sub land permission error: {str(e)}")
             return False
 
-    def _check_land_permission(self, player: Player, land_info: dict) -> bool:
+    def _check_land_permission(self, player: Player, land_info: LandInfo) -> bool:
         """
         检查玩家是否有领地权限（领地主人或授权用户）；公共领地仅 OP 有权限
         :param player: 玩家对象
-        :param land_info: 领地信息字典
+        :param land_info: 领地权限快照
         :return: 是否有权限
         """
         try:
-            owner_xuid = land_info['owner_xuid']
-            if owner_xuid == self.PUBLIC_LAND_OWNER_XUID:
+            if land_info.is_public:
                 return player.is_op
-            shared_users = land_info.get('shared_users', [])
-            return owner_xuid == str(player.xuid) or str(player.xuid) in shared_users
+            player_xuid = str(player.xuid)
+            return land_info.owner_xuid == player_xuid or player_xuid in land_info.shared_users
         except Exception as e:
             self.logger.error(f"Check land permission error: {str(e)}")
             return False
 
+    def resolve_permission(self, player: Player, dimension: str, x, y, z, action: str, actor_type: str = None) -> tuple:
+        """
+        一次解析位置所在领地与子领地并判定玩家权限：子领地权限优先，其次领地开放标志，最后领地主人/授权用户
+        :param action: 'operate' 破坏/放置，'interact' 方块互动，'actor_interact' 生物互动，'actor_damage' 生物伤害
+        :param actor_type: action 为 'actor_damage' 时受伤生物的类型
+        :return: (所在领地权限快照，不在领地内时为 None, 是否放行)
+        """
+        if not self.land_system.has_lands_in_dimension(dimension):
+            return None, True
+        land_id = self.get_land_at_pos(dimension, x, z, y)
+        if land_id is None:
+            return None, True
+        land_info = self.get_land_perm_info(land_id)
+        if not land_info:
+            return None, True
+        # 子领地权限优先
+        if y is not None:
+            sub_land_id = self.get_sub_land_at_pos(land_id, int(x), int(y), int(z))
+            if sub_land_id is not None:
+                sub_info = self.land_system.get_sub_land_perm_info(sub_land_id)
+                if sub_info and self._check_sub_land_permission(player, sub_info):
+                    return land_info, True
+        if action == 'actor_damage':
+            return land_info, not _DAMAGE_DISPATCH[land_info.damage_policy](self, land_info, player, actor_type)
+        if action == 'interact' and land_info.allow_public_interact:
+            return land_info, True
+        if action == 'actor_interact' and land_info.allow_actor_interaction:
+            return land_info, True
+        return land_info, self._check_land_permission(player, land_info)
+
+    def _send_land_protect_hint(self, player: Player, land_info: LandInfo):
+        if land_info.is_public:
+            owner_name = self.language_manager.GetText('PUBLIC_LAND_NAME')
+        else:
+            owner_name = self.get_player_name_by_xuid(land_info.owner_xuid)
+        player.send_message(self.language_manager.GetText('LAND_PROTECT_HINT').format(owner_name))
+
     def land_operation_check(self, player: Player, dimension: str, pos: tuple):
         x, y, z = pos[0], (pos[1] if len(pos) > 1 else None), pos[2]
-        land_id = self.get_land_at_pos(dimension, x, z, y)
-        if land_id is not None:
-            # 先检查子领地权限
-            if y is not None:
-                sub_land_id = self.get_sub_land_at_pos(land_id, int(x), int(y), int(z))
-                if sub_land_id is not None:
-                    sub_info = self.get_sub_land_info(sub_land_id)
-                    if sub_info and self._check_sub_land_permission(player, sub_info):
-                        return True
-            # 回落到父领地权限检查
-            land_info = self.get_land_info(land_id)
-            if not land_info:
-                return True
-            owner_xuid = land_info['owner_xuid']
-            if owner_xuid == self.PUBLIC_LAND_OWNER_XUID:
-                if not player.is_op:
-                    player.send_message(self.language_manager.GetText('LAND_PROTECT_HINT').format(self.language_manager.GetText('PUBLIC_LAND_NAME')))
-                    return False
-                return True
-            shared_users = land_info['shared_users']
-            if owner_xuid != str(player.xuid) and str(player.xuid) not in shared_users:
-                player.send_message(self.language_manager.GetText('LAND_PROTECT_HINT').format(self.get_player_name_by_xuid(owner_xuid)))
-                return False
+        land_info, allowed = self.resolve_permission(player, dimension, x, y, z, 'operate')
+        if not allowed:
+            self._send_land_protect_hint(player, land_info)
+            return False
         return True
 
     def land_interact_check(self, player: Player, dimension: str, pos: tuple):
         """检查玩家是否有权限在领地内进行方块互动"""
         x, y, z = pos[0], (pos[1] if len(pos) > 1 else None), pos[2]
-        land_id = self.get_land_at_pos(dimension, x, z, y)
-        if land_id is not None:
-            # 先检查子领地权限
-            if y is not None:
-                sub_land_id = self.get_sub_land_at_pos(land_id, int(x), int(y), int(z))
-                if sub_land_id is not None:
-                    sub_info = self.get_sub_land_info(sub_land_id)
-                    if sub_info and self._check_sub_land_permission(player, sub_info):
-                        return True
-            # 回落到父领地权限检查
-            land_info = self.get_land_info(land_id)
-            if not land_info:
-                return True
-            if land_info.get('allow_public_interact', False):
-                return True
-            owner_xuid = land_info['owner_xuid']
-            if owner_xuid == self.PUBLIC_LAND_OWNER_XUID:
-                if not player.is_op:
-                    player.send_message(self.language_manager.GetText('LAND_PROTECT_HINT').format(self.language_manager.GetText('PUBLIC_LAND_NAME')))
-                    return False
-                return True
-            shared_users = land_info['shared_users']
-            if owner_xuid != str(player.xuid) and str(player.xuid) not in shared_users:
-                player.send_message(self.language_manager.GetText('LAND_PROTECT_HINT').format(self.get_player_name_by_xuid(owner_xuid)))
-                return False
+        land_info, allowed = self.resolve_permission(player, dimension, x, y, z, 'interact')
+        if not allowed:
+            self._send_land_protect_hint(player, land_info)
+            return False
         return True
     
     def spawn_protect_check(self, player: Player, dimension: str, pos: tuple):
-        if self.if_protect_spawn and len(self.spawn_pos_dict):
-            if not self.spawn_protect_check(dimension, pos[0], pos[2]):
-                player.send_message(self.language_manager.GetText('SPAWN_PROTECT_HINT').format(self.spawn_protect_range))
-                return False
+        if self.if_protect_spawn and not self._is_outside_spawn_protect(dimension, pos[0], pos[2]):
+            player.send_message(self.language_manager.GetText('SPAWN_PROTECT_HINT').format(self.spawn_protect_range))
+            return False
         return True
 
     # Listener
-    def _threaded_position_listener(self):
-        """多线程位置检测方法"""
-        self.logger.info(f"{ColorFormat.GREEN}[ARC Core]Position detection thread started")
-        
-        while self.position_thread_running:
-            try:
-                # 检查是否有在线玩家，如果没有则跳过此次检测
-                if not self.server.online_players:
-                    time.sleep(self.position_check_interval)
-                    continue
-                
-                # 批量处理所有在线玩家
-                players_to_process = list(self.server.online_players)
-                
-                for player in players_to_process:
-                    if not self.position_thread_running:  # 提前退出检查
-                        break
-                        
-                    try:
-                        # 获取玩家位置信息
-                        player_pos = self.get_player_position_vector(player)
-                        dimension = player.location.dimension.name
-                        land_id = self.get_land_at_pos(dimension, player_pos[0], player_pos[2], player_pos[1])
-                        
-                        # 使用锁保护共享数据
-                        with self.position_thread_lock:
-                            # 初始化玩家领地记录
-                            if player.name not in self.player_in_land_id_dict:
-                                self.player_in_land_id_dict[player.name] = None
-                            
-                            # 检查领地变化
-                            old_land_id = self.player_in_land_id_dict[player.name]
-                            if self.is_land_id_changed(old_land_id, land_id):
-                                self.player_in_land_id_dict[player.name] = land_id
-                                
-                                # 进入新领地时发送提示
-                                if land_id is not None:
-                                    try:
-                                        new_land_name = self.get_land_name(land_id)
-                                        land_owner = self.get_land_display_owner_name(land_id)
-                                        
-                                        # 创建固定参数的闭包，避免循环变量捕获问题
-                                        def create_land_message_sender(target_player, land_name, owner_name, land_id):
-                                            def send_land_message():
-                                                try:
-                                                    # 发送领地信息字幕（公共领地只显示「公共领地」，不显示「领主：公共领地」）
-                                                    if self.is_public_land(land_id):
-                                                        subtitle = self.language_manager.GetText('PUBLIC_LAND_NAME')
-                                                    else:
-                                                        subtitle = self.language_manager.GetText('STEP_IN_LAND_SUBTITLE').format(owner_name)
-                                                    target_player.send_popup(
-                                                        f'{self.language_manager.GetText("STEP_IN_LAND_TITLE").format(land_name)}\n{subtitle}'
-                                                    )
-                                                    # 显示领地边界粒子效果
-                                                    land_info = self.get_land_info(land_id)
-                                                    if land_info:
-                                                        self.display_land_particle_boundary(target_player, land_info)
-                                                    
-                                                except Exception as e:
-                                                    self.logger.warning(f"[ARC Core]Failed to send land message to {target_player.name}: {str(e)}")
-                                            return send_land_message
-                                        
-                                        # 创建消息发送器，固定当前玩家和领地信息
-                                        message_sender = create_land_message_sender(player, new_land_name, land_owner, land_id)
-                                        
-                                        # 在主线程中执行UI操作
-                                        if hasattr(self.server, 'scheduler'):
-                                            self.server.scheduler.run_task(self, message_sender, delay=0)
-                                        
-                                    except Exception as e:
-                                        self.logger.warning(f"[ARC Core]Error processing land change for {player.name}: {str(e)}")
-                                        
-                    except Exception as e:
-                        self.logger.warning(f"[ARC Core]Error processing player {player.name} position: {str(e)}")
-                        continue
-                
-                # 等待下次检测
-                time.sleep(self.position_check_interval)
-                
-            except Exception as e:
-                self.logger.error(f"[ARC Core]Position detection thread error: {str(e)}")
-                time.sleep(1)  # 发生错误时等待1秒再继续
-        
-        self.logger.info(f"{ColorFormat.YELLOW}[ARC Core]Position detection thread stopped")
-
-    def start_position_thread(self):
-        """启动位置检测线程"""
-        if self.position_thread is None or not self.position_thread.is_alive():
-            self.position_thread_running = True
-            self.position_thread = threading.Thread(
-                target=self._threaded_position_listener,
-                daemon=True,  # 设为守护线程，主程序退出时自动结束
-                name="ARCCore-PositionDetection"
-            )
-            self.position_thread.start()
-            self.logger.info(f"{ColorFormat.GREEN}[ARC Core]Position detection thread initialized")
-        else:
-            self.logger.warning(f"{ColorFormat.YELLOW}[ARC Core]Position detection thread already running")
-
-    def stop_position_thread(self):
-        """停止位置检测线程"""
-        if self.position_thread and self.position_thread.is_alive():
-            self.position_thread_running = False
-            try:
-                self.position_thread.join(timeout=2.0)  # 等待最多2秒让线程正常结束
-                if self.position_thread.is_alive():
-                    self.logger.warning(f"{ColorFormat.YELLOW}[ARC Core]Position detection thread did not stop gracefully")
-                else:
-                    self.logger.info(f"{ColorFormat.GREEN}[ARC Core]Position detection thread stopped successfully")
-            except Exception as e:
-                self.logger.error(f"[ARC Core]Error stopping position detection thread: {str(e)}")
-        self.position_thread = None
+    @event_handler
+    def on_player_move(self, event: PlayerMoveEvent):
+        self._update_player_land(event.player, event.to_location)
 
-    @staticmethod
-    def is_land_id_changed(old_land_id: int | None, new_land_id: int | None) -> bool:
-        """
-        判断玩家所在领地ID是否发生变化
-        :param old_land_id: 玩家之前所在的领地ID（可能为None）
-        :param new_land_id: 玩家当前所在的领地ID（可能为None）
-        :return: 是否发生变化
-        """
-        # 都是None则未变化
-        if old_land_id is None and new_land_id is None:
-            return False
+    @event_handler
+    def on_player_teleport(self, event: PlayerTeleportEvent):
+        self._update_player_land(event.player, event.to_location)
 
-        # 一个是None另一个不是,说明进入或离开了领地
-        if (old_land_id is None) != (new_land_id is None):
-            return True
+    def _update_player_land(self, player: Player, location):
+        """玩家移动到新的方块时重新判定所在领地，进入新领地时发送提示；同一方块内的移动直接跳过"""
+        try:
+            dimension = location.dimension.name
+            block_pos = (math.floor(location.x), math.floor(location.y), math.floor(location.z), dimension)
+            state = self._get_player_state(player)
+            if state.last_block_pos == block_pos:
+                return
+            state.last_block_pos = block_pos
+            x, y, z = block_pos[0], block_pos[1], block_pos[2]
+            # 不在任何领地时记为 -1，变化判断即为整数比较
+            land_id = -1
+            if self.land_system.has_lands_in_dimension(dimension):
+                found = self.get_land_at_pos(dimension, x, z, y)
+                if found is not None:
+                    land_id = found
+            if land_id == state.in_land_id:
+                return
+            state.in_land_id = land_id
+            # 进入新领地时发送提示
+            if land_id != -1:
+                self._send_land_enter_message(player, land_id)
+        except Exception as e:
+            self.logger.warning(f"[ARC Core]Error processing player {player.name} position: {str(e)}")
 
-        # 都不是None,直接比较数值是否相同
-        return old_land_id != new_land_id
+    def _send_land_enter_message(self, player: Player, land_id: int):
+        """发送进入领地的字幕提示与边界粒子"""
+        try:
+            # 名称、领主与边界均取自同一次领地查询
+            land_info = self.get_land_info(land_id)
+            if not land_info:
+                return
+            owner_xuid = land_info['owner_xuid']
+            # 发送领地信息字幕（公共领地只显示「公共领地」，不显示「领主：公共领地」）
+            if owner_xuid == LandSystem.PUBLIC_LAND_OWNER_XUID:
+                subtitle = self.language_manager.GetText('PUBLIC_LAND_NAME')
+            else:
+                owner_name = self.get_player_name_by_xuid(owner_xuid) or owner_xuid or ''
+                subtitle = self.language_manager.GetText('STEP_IN_LAND_SUBTITLE').format(owner_name)
+            player.send_popup(
+                f'{self.language_manager.GetText("STEP_IN_LAND_TITLE").format(land_info["land_name"])}\n{subtitle}'
+            )
+            # 显示领地边界粒子效果
+            self.display_land_particle_boundary(player, land_info)
+        except Exception as e:
+            self.logger.warning(f"[ARC Core]Failed to send land message to {player.name}: {str(e)}")
 
     # Database
     def init_database(self):
@@ -1391,6 +1311,10 @@ class ARCCorePlugin(Plugin):
         # 对于已存在的表，执行升级操作
         if result:
             self._upgrade_player_basic_table()
+            # 主键是 uuid，而绝大多数查询与更新按 xuid 定位（邀请奖励累加、登录同步等），无索引时每次都要全表扫描
+            self.database_manager.execute(
+                "CREATE INDEX IF NOT EXISTS idx_player_basic_xuid ON player_basic_info(xuid)"
+            )
         
         return result
 
@@ -1401,7 +1325,7 @@ class ARCCorePlugin(Plugin):
         :return: 加密后的密码
         """
         # 使用SHA-256进行加密
-        return hashlib.sha256(password.encode()).hexdigest()
+        return _sha256(password.encode('utf-8')).hexdigest()
 
     def init_player_basic_info(self, player: Player) -> bool:
         """
@@ -1423,7 +1347,10 @@ class ARCCorePlugin(Plugin):
                 'inviter_xuid': None,  # 初始无邀请人
                 'pending_invite_reward_times': 0  # 初始无待领取邀请奖励
             }
-            return self.database_manager.insert('player_basic_info', player_data)
+            success = self.database_manager.insert('player_basic_info', player_data)
+            if success:
+                self._cache_player_identity(player_data['xuid'], player_data['name'])
+            return success
         except Exception as e:
             self._safe_log('error', f"{ColorFormat.RED}[ARC Core]Init player basic info error: {str(e)}")
             return False
@@ -1456,11 +1383,8 @@ class ARCCorePlugin(Plugin):
                 else:
                     self._safe_log('info', f"{ColorFormat.GREEN}[ARC Core]Initialized basic info for new player {player.name}")
 
-            # 更新玩家名称（如果发生变化）
-            self.update_player_name(player)
-
-            # 更新玩家OP状态
-            self.update_player_op_status(player)
+            # 同步玩家名称与OP状态（如果发生变化）
+            self._sync_player_identity(player)
 
             # 检查并初始化玩家经济信息
             if not self.init_player_economy_info(player):
@@ -1538,75 +1462,52 @@ class ARCCorePlugin(Plugin):
             )
             if not result or not result['password']:
                 return False
-            return result['password'] == self._hash_password(password)
+            # 常量时间比较，避免按耗时推测哈希前缀
+            return hmac.compare_digest(result['password'], self._hash_password(password))
         except Exception as e:
             self.logger.error(f"{ColorFormat.RED}[ARC Core]Verify player password error: {str(e)}")
             return False
 
-    def update_player_name(self, player: Player) -> bool:
+    def _sync_player_identity(self, player: Player) -> bool:
         """
-        更新玩家名称（如果发生变化）
+        同步玩家名称与OP状态到数据库：一次查询，有变化时合并为一条 UPDATE
         :param player: 玩家对象
-        :return: 是否需要更新以及更新是否成功
+        :return: 是否同步成功（记录不存在时返回 False）
         """
         try:
+            player_xuid = str(player.xuid)
+            current_op_status = 1 if player.is_op else 0
             current_info = self.database_manager.query_one(
-                "SELECT name FROM player_basic_info WHERE xuid = ?",
-                (str(player.xuid),)
+                "SELECT name, is_op FROM player_basic_info WHERE xuid = ?",
+                (player_xuid,)
             )
-
             if not current_info:
                 return False
 
-            if current_info['name'] != player.name:
-                # 名称发生变化，需要更新
-                success = self.database_manager.update(
-                    table='player_basic_info',
-                    data={'name': player.name},
-                    where='xuid = ?',
-                    params=(str(player.xuid),)
-                )
-                if success:
-                    self._safe_log('info', f"Player {current_info['name']} changed name to {player.name}")
-                return success
-
-            return True  # 名称没有变化，视为成功
-        except Exception as e:
-            self._safe_log('error', f"{ColorFormat.RED}[ARC Core]Update player name error: {str(e)}")
-            return False
+            name_changed = current_info['name'] != player.name
+            op_changed = current_info.get('is_op', 0) != current_op_status
+            if not name_changed and not op_changed:
+                return True  # 无变化，视为成功
 
-    def update_player_op_status(self, player: Player) -> bool:
-        """
-        更新玩家OP状态
-        :param player: 玩家对象
-        :return: 是否更新成功
-        """
-        try:
-            current_op_status = 1 if player.is_op else 0
-            
-            # 检查当前数据库中的OP状态
-            current_info = self.database_manager.query_one(
-                "SELECT is_op FROM player_basic_info WHERE xuid = ?",
-                (str(player.xuid),)
+            success = self.database_manager.update(
+                table='player_basic_info',
+                data={'name': player.name, 'is_op': current_op_status},
+                where='xuid = ?',
+                params=(player_xuid,)
             )
-            
-            if current_info is not None:
-                stored_op_status = current_info.get('is_op', 0)
-                if stored_op_status != current_op_status:
-                    # OP状态发生变化，更新数据库
-                    success = self.database_manager.update(
-                        table='player_basic_info',
-                        data={'is_op': current_op_status},
-                        where='xuid = ?',
-                        params=(str(player.xuid),)
-                    )
-                    if success:
-                        status_text = "OP" if current_op_status else "非OP"
-                        self._safe_log('info', f"{ColorFormat.GREEN}[ARC Core]Updated player OP status: {player.name} -> {status_text}")
-                    return success
-            return True  # 状态未变化或记录不存在，返回成功
+            if success:
+                # 财富榜快照中含玩家名与 OP 过滤结果
+                self._invalidate_money_rank_cache()
+                if name_changed:
+                    self._cache_player_identity(player_xuid, player.name)
+                    self._safe_log('info', f"Player {current_info['name']} changed name to {player.name}")
+                if op_changed:
+                    self._op_status_by_xuid[player_xuid] = bool(current_op_status)
+                    status_text = "OP" if current_op_status else "非OP"
+                    self._safe_log('info', f"{ColorFormat.GREEN}[ARC Core]Updated player OP status: {player.name} -> {status_text}")
+            return success
         except Exception as e:
-            self._safe_log('error', f"{ColorFormat.RED}[ARC Core]Update player OP status error: {str(e)}")
+            self._safe_log('error', f"{ColorFormat.RED}[ARC Core]Sync player identity error: {str(e)}")
             return False
 
     def get_offline_player_op_status(self, player_name: str) -> Optional[bool]:
@@ -1624,23 +1525,33 @@ class ARCCorePlugin(Plugin):
             self._safe_log('error', f"{ColorFormat.RED}[ARC Core]Get offline player OP status error: {str(e)}")
             return None
 
+    # 离线 OP 状态查询：按列分派到固定 SQL
+    _OP_STATUS_SQL = {
+        'xuid': "SELECT is_op FROM player_basic_info WHERE xuid = ?",
+        'uuid': "SELECT is_op FROM player_basic_info WHERE uuid = ?",
+    }
+
+    def _get_offline_player_op_status_by(self, column: str, value: str) -> Optional[bool]:
+        try:
+            result = self.database_manager.query_one(self._OP_STATUS_SQL[column], (value,))
+            return bool(result['is_op']) if result is not None else None
+        except Exception as e:
+            self._safe_log('error', f"{ColorFormat.RED}[ARC Core]Get offline player OP status by {column.upper()} error: {str(e)}")
+            return None
+
     def get_offline_player_op_status_by_xuid(self, player_xuid: str) -> Optional[bool]:
         """
         通过XUID获取离线玩家的OP状态
         :param player_xuid: 玩家XUID
         :return: OP状态，如果玩家不存在则返回None
         """
-        try:
-            result = self.database_manager.query_one(
-                "SELECT is_op FROM player_basic_info WHERE xuid = ?",
-                (player_xuid,)
-            )
-            if result is not None:
-                return bool(result['is_op'])
-            return None
-        except Exception as e:
-            self._safe_log('error', f"{ColorFormat.RED}[ARC Core]Get offline player OP status by XUID error: {str(e)}")
-            return None
+        cached = self._op_status_by_xuid.get(player_xuid)
+        if cached is not None:
+            return cached
+        status = self._get_offline_player_op_status_by('xuid', player_xuid)
+        if status is not None:
+            self._op_status_by_xuid[player_xuid] = status
+        return status
 
     def get_offline_player_op_status_by_uuid(self, player_uuid: str) -> Optional[bool]:
         """
@@ -1648,17 +1559,28 @@ class ARCCorePlugin(Plugin):
         :param player_uuid: 玩家UUID
         :return: OP状态，如果玩家不存在则返回None
         """
+        return self._get_offline_player_op_status_by('uuid', player_uuid)
+
+    def _load_player_identity_cache(self):
+        """启动时一次性读取全部玩家的 xuid/name 到内存"""
         try:
-            result = self.database_manager.query_one(
-                "SELECT is_op FROM player_basic_info WHERE uuid = ?",
-                (player_uuid,)
-            )
-            if result is not None:
-                return bool(result['is_op'])
-            return None
+            rows = self.database_manager.query_all("SELECT xuid, name FROM player_basic_info")
+            for row in rows:
+                if row.get('xuid') is not None and row.get('name') is not None:
+                    self._cache_player_identity(str(row['xuid']), row['name'])
         except Exception as e:
-            self._safe_log('error', f"{ColorFormat.RED}[ARC Core]Get offline player OP status by UUID error: {str(e)}")
-            return None
+            # 在__init__期间不能使用self.logger，使用print代替
+            print(f"[ARC Core]Load player identity cache error: {str(e)}")
+
+    def _cache_player_identity(self, player_xuid: str, player_name: str):
+        """写入/更新身份缓存；改名时移除旧名称的映射"""
+        old_name = self._name_by_xuid.get(player_xuid)
+        if old_name is not None and old_name != player_name:
+            old_key = old_name.strip().lower()
+            if self._xuid_by_name.get(old_key) == player_xuid:
+                del self._xuid_by_name[old_key]
+        self._name_by_xuid[player_xuid] = player_name
+        self._xuid_by_name[player_name.strip().lower()] = player_xuid
 
     def get_player_name_by_xuid(self, player_xuid: str) -> Optional[str]:
         """
@@ -1667,14 +1589,48 @@ class ARCCorePlugin(Plugin):
         :return: 玩家名称，如果未找到则返回None
         """
         try:
+            cached_name = self._name_by_xuid.get(player_xuid)
+            if cached_name is not None:
+                return cached_name
             result = self.database_manager.query_one(
                 "SELECT name FROM player_basic_info WHERE xuid = ?",
                 (player_xuid,)
             )
-            return result['name'] if result else None
+            if not result:
+                return None
+            self._cache_player_identity(player_xuid, result['name'])
+            return result['name']
         except Exception as e:
             self.logger.error(f"{ColorFormat.RED}[ARC Core]Get player name by XUID error: {str(e)}")
             return None
+
+    def get_player_names_by_xuids(self, player_xuids) -> Dict[str, str]:
+        """
+        批量通过XUID获取玩家名称：先查身份缓存，未命中的合并为 IN 查询（每批 500 个参数）
+        :param player_xuids: 玩家XUID字符串集合
+        :return: {xuid: 玩家名称}，未找到的XUID不在结果中
+        """
+        names: Dict[str, str] = {}
+        missing = []
+        for player_xuid in set(player_xuids):
+            cached_name = self._name_by_xuid.get(player_xuid)
+            if cached_name is not None:
+                names[player_xuid] = cached_name
+            else:
+                missing.append(player_xuid)
+        try:
+            for start in range(0, len(missing), 500):
+                batch = missing[start:start + 500]
+                rows = self.database_manager.query_all(
+                    f"SELECT xuid, name FROM player_basic_info WHERE xuid IN ({','.join('?' * len(batch))})",
+                    tuple(batch)
+                )
+                for row in rows:
+                    self._cache_player_identity(row['xuid'], row['name'])
+                    names[row['xuid']] = row['name']
+        except Exception as e:
+            self.logger.error(f"{ColorFormat.RED}[ARC Core]Get player names by XUIDs error: {str(e)}")
+        return names
     
     def get_player_xuid_by_name(self, player_name: str) -> Optional[str]:
         """
@@ -1688,25 +1644,22 @@ class ARCCorePlugin(Plugin):
             return None
         try:
             # 1) 在线玩家优先：与运行时 player.name 一致，可规避 DB 未及时同步或第三方传入名与库不完全一致
-            server = getattr(self, "server", None)
-            if server is not None:
-                try:
-                    online_players = server.online_players
-                    if online_players:
-                        key_lower = normalized_name.lower()
-                        for online_player in online_players:
-                            on_name = (online_player.name or "").strip()
-                            if on_name.lower() == key_lower:
-                                return str(online_player.xuid)
-                except Exception:
-                    pass
-            # 2) 数据库：TRIM + 大小写不敏感（SQLite 默认 BINARY 下 name = ? 对英文大小写敏感）
+            name_key = normalized_name.lower()
+            online_xuid = self._online_xuid_by_name.get(name_key)
+            if online_xuid is not None:
+                return online_xuid
+            # 2) 身份缓存：启动时载入，进服/改名时维护
+            cached_xuid = self._xuid_by_name.get(name_key)
+            if cached_xuid is not None:
+                return cached_xuid
+            # 3) 数据库：TRIM + 大小写不敏感（SQLite 默认 BINARY 下 name = ? 对英文大小写敏感）
             result = self.database_manager.query_one(
-                "SELECT xuid FROM player_basic_info WHERE LOWER(TRIM(name)) = LOWER(?)",
+                "SELECT xuid, name FROM player_basic_info WHERE LOWER(TRIM(name)) = LOWER(?)",
                 (normalized_name,),
             )
             if not result or result.get("xuid") is None:
                 return None
+            self._cache_player_identity(str(result["xuid"]), result["name"])
             return str(result["xuid"])
         except Exception as e:
             self.logger.error(f"{ColorFormat.RED}[ARC Core]Get player XUID by name error: {str(e)}")
@@ -1725,8 +1678,7 @@ class ARCCorePlugin(Plugin):
 
     def update_spawn_location(self, dimension: str, coordinates: tuple) -> bool:
         """
-        更新出生地信息
-        :param db: 数据库管理器
+        更新出生地信息，成功后同步内存中的 spawn_pos_dict 及其派生缓存
         :param dimension: 维度名称
         :param coordinates: (x, y, z) 坐标元组
         :return: 是否更新成功
@@ -1738,31 +1690,51 @@ class ARCCorePlugin(Plugin):
             'spawn_z': z
         }
 
-        existing = self.database_manager.query_one("SELECT * FROM spawn_locations WHERE dimension = ?", (dimension,))
-
-        if existing:
-            return self.database_manager.update('spawn_locations', data, 'dimension = ?', (dimension,))
+        # spawn_pos_dict 与 spawn_locations 表一一对应，无需再查询记录是否存在
+        if dimension in self.spawn_pos_dict:
+            success = self.database_manager.update('spawn_locations', data, 'dimension = ?', (dimension,))
         else:
             data['dimension'] = dimension
-            return self.database_manager.insert('spawn_locations', data)
+            success = self.database_manager.insert('spawn_locations', data)
+        if success:
+            self.spawn_pos_dict[dimension] = (int(x), int(y), int(z))
+            self._rebuild_spawn_tp_templates()
+            self._rebuild_spawn_protect_aabb()
+        return success
 
     def get_all_spawn_locations(self) -> Dict[str, tuple]:
         """
         获取所有出生地信息
         :return: 字典，键为维度名称，值为坐标元组(x, y, z)
         """
-        result = self.database_manager.query_all("SELECT * FROM spawn_locations")
+        result = self.database_manager.query_all("SELECT dimension, spawn_x, spawn_y, spawn_z FROM spawn_locations")
         return {
-            row['dimension']: (row['spawn_x'], row['spawn_y'], row['spawn_z'])
+            row['dimension']: (int(row['spawn_x']), int(row['spawn_y']), int(row['spawn_z']))
             for row in result
         }
 
-    def spawn_protect_check(self, dimension_name: str, pos_x: float, pos_z: float) -> bool:
-        if dimension_name in self.spawn_pos_dict:
-            if math.fabs(pos_x - self.spawn_pos_dict[dimension_name][0]) <= self.spawn_protect_range and \
-                    math.fabs(pos_z - self.spawn_pos_dict[dimension_name][2]) <= self.spawn_protect_range:
-                return False
-        return True
+    def _rebuild_spawn_tp_templates(self):
+        """根据 spawn_pos_dict 预生成各维度的 tp 指令模板，/spawn 时只需填入玩家名"""
+        self._spawn_tp_templates = {
+            dimension: f'tp {{name}} {x} {y} {z}'
+            for dimension, (x, y, z) in self.spawn_pos_dict.items()
+        }
+
+    def _rebuild_spawn_protect_aabb(self):
+        """根据出生点与保护半径预计算各维度的保护范围 AABB"""
+        r = self.spawn_protect_range
+        self._spawn_aabb = {
+            dimension: (x - r, x + r, z - r, z + r)
+            for dimension, (x, _, z) in self.spawn_pos_dict.items()
+        }
+
+    def _is_outside_spawn_protect(self, dimension_name: str, pos_x: float, pos_z: float) -> bool:
+        """坐标是否位于出生点保护范围之外"""
+        box = self._spawn_aabb.get(dimension_name)
+        if box is None:
+            return True
+        min_x, max_x, min_z, max_z = box
+        return not (min_x <= pos_x <= max_x and min_z <= pos_z <= max_z)
 
     # UI Main menu
     def show_main_menu(self, player: Player):
@@ -1775,35 +1747,55 @@ class ARCCorePlugin(Plugin):
                     player,
                 )
                 return
-            self.update_player_name(player)
+            self._sync_player_identity(player)
             if player_basic_info['password'] is None:
                 self.show_register_panel(player)
             else:
                 self.show_login_panel(player)
         else:
-            arc_menu = ActionForm(
-                title=self.language_manager.GetText('MAIN_MENU_TITLE'),
-            )
-            arc_menu.add_button(self.language_manager.GetText('NEWBIE_GUIDE_BUTTON'), on_click=self.show_newbie_welcome_panel)
-            arc_menu.add_button(self.language_manager.GetText('BANK_MENU_NAME'), on_click=self.show_bank_main_menu)
-            arc_menu.add_button(self.language_manager.GetText('TELEPORT_MENU_NAME'), on_click=self.show_teleport_menu)
-            arc_menu.add_button(self.language_manager.GetText('LAND_MENU_NAME'), on_click=self.show_land_main_menu)
-            arc_menu.add_button(self.language_manager.GetText('MAIN_MENU_MY_INFO_NAME'), on_click=self.show_my_info_panel)
-            arc_menu.add_button(self.language_manager.GetText('CHECKIN_MENU_BUTTON'), on_click=self.show_daily_checkin_panel)
-            if self.server.plugin_manager.get_plugin('ushop'):
-                arc_menu.add_button(self.language_manager.GetText('SHOP_MENU_NAME'), on_click=self.show_shop_menu)
-            if self.server.plugin_manager.get_plugin('arc_button_shop'):
-                arc_menu.add_button(self.language_manager.GetText('BUTTON_SHOP_MENU_NAME'), on_click=self.show_button_shop_menu)
-            if self.server.plugin_manager.get_plugin('arc_dtwt'):
-                arc_menu.add_button(self.language_manager.GetText('DTWT_MENU_NAME'), on_click=self.show_dtwt_panel)
-            if self.server.plugin_manager.get_plugin('up_and_down'):
-                arc_menu.add_button(self.language_manager.GetText('STOCK_MARKET_NAME'), on_click=self.show_stock_ui)
-            if player.is_op:
-                arc_menu.add_button(self.language_manager.GetText('OP_PANEL_NAME'), on_click=self.show_op_main_panel)
-            arc_menu.add_button(self.language_manager.GetText('SUICIDE_FUNC_BUTTON'), on_click=self.execute_suicide)
-            arc_menu.on_close = None
+            # 可选插件的加载情况计入缓存键，插件启用或卸载后自动换用对应的菜单
+            plugin_manager = self.server.plugin_manager
+            available = tuple(
+                plugin_manager.get_plugin(plugin_name) is not None
+                for plugin_name, _, _ in self._OPTIONAL_PLUGIN_MENU_BUTTONS
+            )
+            menu_id = ('main_op:' if player.is_op else 'main:') + ''.join('1' if a else '0' for a in available)
+            arc_menu = self._form_cache.get(menu_id)
+            if arc_menu is None:
+                arc_menu = self._form_cache[menu_id] = self._build_main_menu(player.is_op, available)
             player.send_form(arc_menu)
-    
+
+    # 主菜单中依赖其他插件的按钮：(插件名, 文本键, 回调方法名)，是否显示由调用方传入的插件加载情况决定
+    _OPTIONAL_PLUGIN_MENU_BUTTONS = (
+        ('ushop', 'SHOP_MENU_NAME', 'show_shop_menu'),
+        ('arc_button_shop', 'BUTTON_SHOP_MENU_NAME', 'show_button_shop_menu'),
+        ('arc_dtwt', 'DTWT_MENU_NAME', 'show_dtwt_panel'),
+        ('up_and_down', 'STOCK_MARKET_NAME', 'show_stock_ui'),
+    )
+
+    def _build_main_menu(self, is_op: bool, available: tuple) -> ActionForm:
+        """
+        构建主菜单表单；按钮回调均以点击玩家为参数，因此同一实例可被所有玩家复用
+        :param available: 与 _OPTIONAL_PLUGIN_MENU_BUTTONS 一一对应的插件是否已加载
+        """
+        arc_menu = ActionForm(
+            title=self.language_manager.GetText('MAIN_MENU_TITLE'),
+        )
+        arc_menu.add_button(self.language_manager.GetText('NEWBIE_GUIDE_BUTTON'), on_click=self.show_newbie_welcome_panel)
+        arc_menu.add_button(self.language_manager.GetText('BANK_MENU_NAME'), on_click=self.show_bank_main_menu)
+        arc_menu.add_button(self.language_manager.GetText('TELEPORT_MENU_NAME'), on_click=self.show_teleport_menu)
+        arc_menu.add_button(self.language_manager.GetText('LAND_MENU_NAME'), on_click=self.show_land_main_menu)
+        arc_menu.add_button(self.language_manager.GetText('MAIN_MENU_MY_INFO_NAME'), on_click=self.show_my_info_panel)
+        arc_menu.add_button(self.language_manager.GetText('CHECKIN_MENU_BUTTON'), on_click=self.show_daily_checkin_panel)
+        for (_, text_key, handler_name), is_available in zip(self._OPTIONAL_PLUGIN_MENU_BUTTONS, available):
+            if is_available:
+                arc_menu.add_button(self.language_manager.GetText(text_key), on_click=getattr(self, handler_name))
+        if is_op:
+            arc_menu.add_button(self.language_manager.GetText('OP_PANEL_NAME'), on_click=self.show_op_main_panel)
+        arc_menu.add_button(self.language_manager.GetText('SUICIDE_FUNC_BUTTON'), on_click=self.execute_suicide)
+        arc_menu.on_close = None
+        return arc_menu
+
     def execute_suicide(self, player: Player):
         player.perform_command('suicide')
 
@@ -1828,39 +1820,54 @@ class ARCCorePlugin(Plugin):
         player.send_form(newbie_form)
 
     # Player info & invite system UI
+    # 个人信息面板：一次查询取回基本信息、余额、领地数量与邀请人名称
+    _SQL_MY_INFO = (
+        "SELECT p.inviter_xuid, p.remaining_free_land_blocks, p.pending_invite_reward_times, "
+        "e.money, (SELECT COUNT(*) FROM lands WHERE owner_xuid = p.xuid) AS land_count, "
+        "inv.name AS inviter_name "
+        "FROM player_basic_info p "
+        "LEFT JOIN player_economy e ON e.xuid = p.xuid "
+        "LEFT JOIN player_basic_info inv ON inv.xuid = p.inviter_xuid "
+        "WHERE p.xuid = ?"
+    )
+
     def show_my_info_panel(self, player: Player):
         """显示玩家自己的信息面板"""
-        player_basic_info = self.get_player_basic_info(player)
-        if player_basic_info is None:
-            self.report_arc_error(
-                "INFO1",
-                f"show_my_info_panel get_player_basic_info returned None player={player.name!r}",
-                player,
-            )
-            return
-
         player_name = player.name
         player_xuid = str(player.xuid)
-        player_money = self.get_player_money(player)
-        player_land_count = self.get_player_land_count(player_xuid)
-        remaining_free_blocks = self.get_player_free_land_blocks(player)
+        info = self.database_manager.query_one(self._SQL_MY_INFO, (player_xuid,))
+        if info is None:
+            # 尚无基本信息记录：走原有初始化流程
+            if self.get_player_basic_info(player) is None:
+                self.report_arc_error(
+                    "INFO1",
+                    f"show_my_info_panel get_player_basic_info returned None player={player.name!r}",
+                    player,
+                )
+                return
+            info = self.database_manager.query_one(self._SQL_MY_INFO, (player_xuid,)) or {}
+
+        if info.get('money') is None:
+            # 尚无经济记录：由经济系统按初始金钱建档
+            player_money = self.get_player_money(player)
+        else:
+            player_money = self._round_money(info['money'])
+        player_land_count = info.get('land_count') or 0
+        if 'remaining_free_land_blocks' in info:
+            remaining_free_blocks = info['remaining_free_land_blocks'] or 0
+        else:
+            remaining_free_blocks = self.get_player_free_land_blocks(player)
 
-        inviter_xuid = player_basic_info.get('inviter_xuid')
+        inviter_xuid = info.get('inviter_xuid')
         if inviter_xuid:
-            inviter_name = self.get_player_name_by_xuid(inviter_xuid) or inviter_xuid
+            inviter_name = info.get('inviter_name') or inviter_xuid
         else:
             inviter_name = self.language_manager.GetText('INVITER_NONE_TEXT')
 
-        pending_info = self.database_manager.query_one(
-            "SELECT pending_invite_reward_times FROM player_basic_info WHERE xuid = ?",
-            (player_xuid,)
-        )
-        pending_times = 0
-        if pending_info is not None:
-            try:
-                pending_times = int(pending_info.get('pending_invite_reward_times', 0) or 0)
-            except (ValueError, TypeError):
-                pending_times = 0
+        try:
+            pending_times = int(info.get('pending_invite_reward_times', 0) or 0)
+        except (ValueError, TypeError):
+            pending_times = 0
 
         info_content = self.language_manager.GetText('MY_INFO_PANEL_CONTENT').format(
             player_name,
@@ -2008,7 +2015,7 @@ class ARCCorePlugin(Plugin):
 
         def try_set_inviter(player: Player, json_str: str):
             try:
-                data = json.loads(json_str)
+                data = _decode_form_data(json_str)
             except Exception as parse_exc:
                 self.report_arc_error(
                     "INV1",
@@ -2026,25 +2033,6 @@ class ARCCorePlugin(Plugin):
             inviter_name_input = str(data[0]).strip()
             player_xuid = str(player.xuid)
 
-            # 再次检查自己是否已经填写过邀请人
-            basic_info = self.database_manager.query_one(
-                "SELECT inviter_xuid FROM player_basic_info WHERE xuid = ?",
-                (player_xuid,)
-            )
-            if basic_info is None:
-                self.report_arc_error(
-                    "INV2",
-                    f"fill_inviter SELECT inviter_xuid returned None xuid={player_xuid!r}",
-                    player,
-                )
-                self.show_my_info_panel(player)
-                return
-
-            if basic_info.get('inviter_xuid'):
-                player.send_message(self.language_manager.GetText('FILL_INVITER_FAIL_ALREADY_HAS_INVITER'))
-                self.show_my_info_panel(player)
-                return
-
             inviter_xuid = self.get_player_xuid_by_name(inviter_name_input)
             if not inviter_xuid:
                 self.show_fill_inviter_panel(player, self.language_manager.GetText('FILL_INVITER_FAIL_PLAYER_NOT_FOUND'))
@@ -2054,31 +2042,52 @@ class ARCCorePlugin(Plugin):
                 self.show_fill_inviter_panel(player, self.language_manager.GetText('FILL_INVITER_FAIL_CANNOT_INVITE_SELF'))
                 return
 
-            # 写入邀请人信息
+            # 写入邀请人（仅在尚未填写时写入，检查与写入在同一条语句内完成）、给自己发放一次邀请奖励、
+            # 给邀请人累加一份待领取奖励：三者同一事务，任一步失败整体回滚
+            updated_rows = -1
+            reward = None
             try:
-                update_success = self.database_manager.update(
-                    table='player_basic_info',
-                    data={'inviter_xuid': inviter_xuid},
-                    where='xuid = ?',
-                    params=(player_xuid,)
-                )
-            except Exception:
-                update_success = False
-
-            if not update_success:
+                with self.database_manager.transaction():
+                    updated_rows = self.database_manager.execute_rowcount(
+                        "UPDATE player_basic_info SET inviter_xuid = ? "
+                        "WHERE xuid = ? AND (inviter_xuid IS NULL OR inviter_xuid = '')",
+                        (inviter_xuid, player_xuid)
+                    )
+                    if updated_rows < 0:
+                        raise RuntimeError("UPDATE inviter_xuid failed")
+                    if updated_rows > 0:
+                        reward = self._write_invite_reward(player, 1)
+                        if not self.add_pending_invite_rewards(inviter_xuid, 1):
+                            raise RuntimeError(f"add pending invite rewards failed inviter={inviter_xuid!r}")
+            except Exception as e:
                 self.report_arc_error(
                     "INV3",
-                    f"fill_inviter UPDATE inviter_xuid failed xuid={player_xuid!r}",
+                    f"fill_inviter transaction failed xuid={player_xuid!r}",
                     player,
+                    exception=e,
                 )
                 self.show_my_info_panel(player)
                 return
 
-            # 给自己发放一次邀请奖励
-            self.grant_invite_reward_to_player(player, 1)
+            if updated_rows == 0:
+                # 未写入：区分“已填写过邀请人”与“没有基本信息记录”
+                basic_info = self.database_manager.query_one(
+                    "SELECT inviter_xuid FROM player_basic_info WHERE xuid = ?",
+                    (player_xuid,)
+                )
+                if basic_info is None:
+                    self.report_arc_error(
+                        "INV2",
+                        f"fill_inviter SELECT inviter_xuid returned None xuid={player_xuid!r}",
+                        player,
+                    )
+                else:
+                    player.send_message(self.language_manager.GetText('FILL_INVITER_FAIL_ALREADY_HAS_INVITER'))
+                self.show_my_info_panel(player)
+                return
 
-            # 给邀请人累加一份待领取奖励
-            self.add_pending_invite_rewards(inviter_xuid, 1)
+            # 事务已提交，再发放物资并通知
+            self._deliver_invite_reward(player, reward)
 
             player.send_message(self.language_manager.GetText('FILL_INVITER_SUBMIT_SUCCESS').format(inviter_name_input))
 
@@ -2120,19 +2129,30 @@ class ARCCorePlugin(Plugin):
             player.send_form(no_reward_panel)
             return
 
-        # 发放奖励（按照累计次数一次性发放）
-        self.grant_invite_reward_to_player(player, pending_times)
-
-        # 清零数据库中的待领取次数
+        # 按读到的次数原子清零（未被并发领取时才生效）并写入奖励，二者同一事务，发放失败时待领取次数随之回滚
+        claimed = -1
+        reward = None
         try:
-            self.database_manager.update(
-                table='player_basic_info',
-                data={'pending_invite_reward_times': 0},
-                where='xuid = ?',
-                params=(player_xuid,)
-            )
+            with self.database_manager.transaction():
+                claimed = self.database_manager.execute_rowcount(
+                    "UPDATE player_basic_info SET pending_invite_reward_times = 0 "
+                    "WHERE xuid = ? AND pending_invite_reward_times = ?",
+                    (player_xuid, pending_times)
+                )
+                if claimed < 0:
+                    raise RuntimeError("clear pending invite reward times failed")
+                if claimed == 1:
+                    reward = self._write_invite_reward(player, pending_times)
         except Exception as e:
-            self.logger.error(f"{ColorFormat.RED}[ARC Core]Clear pending invite reward times error: {str(e)}")
+            self.logger.error(f"{ColorFormat.RED}[ARC Core]Claim invite rewards error: xuid={player_xuid} {str(e)}")
+            self.show_my_info_panel(player)
+            return
+        if claimed != 1:
+            self.show_my_info_panel(player)
+            return
+
+        # 事务已提交，再按照累计次数一次性发放物资并通知
+        self._deliver_invite_reward(player, reward)
 
         result_content = self.language_manager.GetText('INVITE_REWARD_CLAIM_RESULT_CONTENT').format(pending_times)
         result_panel = ActionForm(
@@ -2144,7 +2164,7 @@ class ARCCorePlugin(Plugin):
 
     # Register and login
     def login_successfully(self, player: Player):
-        self.player_authentication_state[player.name] = True
+        self._get_player_state(player).authed = True
         self.show_main_menu(player) # 登录成功后自动弹出主菜单
 
     def _on_login_form_closed(self, player: Player, is_register: bool):
@@ -2171,7 +2191,7 @@ class ARCCorePlugin(Plugin):
         panel_title = self.language_manager.GetText('REGISTER_PANEL_TITLE') if hint_message is None else hint_message
 
         def try_register(player: Player, json_str: str):
-            data = json.loads(json_str)
+            data = _decode_form_data(json_str)
             if len(data) < 2:
                 self.show_register_panel(player, self.language_manager.GetText('REGISTER_FAIL_PASSWORD_NOT_INPUT'))
                 return
@@ -2206,7 +2226,7 @@ class ARCCorePlugin(Plugin):
         panel_title = self.language_manager.GetText('LOGIN_PANEL_TITLE') if hint_message is None else hint_message
 
         def try_login(player: Player, json_str: str):
-            data = json.loads(json_str)
+            data = _decode_form_data(json_str)
             if len(data) == 0:
                 # 密码未输入，重新显示登录面板并提示
                 self.show_login_panel(player, self.language_manager.GetText('LOGIN_FAIL_PASSWORD_NOT_INPUT'))
@@ -2227,10 +2247,41 @@ class ARCCorePlugin(Plugin):
         )
         player.send_form(login_panel)
 
-    def if_player_logined(self, player: Player):
-        if not player.name in self.player_authentication_state:
-            self.player_authentication_state[player.name] = False
-        return self.player_authentication_state[player.name]
+    @staticmethod
+    def _player_key(player: Player) -> Any:
+        """运行时状态字典的键：优先使用整数 xuid（哈希更快且不受改名影响），无有效 xuid 时退回玩家名"""
+        xuid = player.xuid
+        if isinstance(xuid, int):
+            return xuid
+        try:
+            return int(xuid)
+        except (ValueError, TypeError):
+            return player.name
+
+    def _online_players_except(self, player: Player) -> list:
+        """除指定玩家外的在线玩家列表（按 xuid 排除，在线列表只遍历一次）"""
+        caller_xuid = player.xuid
+        return [p for p in self.server.online_players if p.xuid != caller_xuid]
+
+    def _is_player_online(self, player: Player, xuid: Optional[str] = None) -> bool:
+        """通过在线名册（名字 -> xuid）判断玩家是否仍在线，O(1)，不遍历在线列表"""
+        if xuid is None:
+            xuid = str(player.xuid)
+        return self._online_xuid_by_name.get((player.name or '').strip().lower()) == xuid
+
+    def _get_player_state(self, player: Player) -> PlayerState:
+        """获取玩家运行时状态，不存在时创建（如插件重载时已在线的玩家）"""
+        key = self._player_key(player)
+        state = self.players.get(key)
+        if state is None:
+            state = self.players[key] = PlayerState()
+        return state
+
+    def if_player_logined(self, player: Player) -> bool:
+        # 登录状态缓存在 PlayerState.authed 中：登录成功时置 True，退出时随状态一并移除
+        # 仅做一次字典查找，且未登录玩家不会被写入任何状态
+        state = self.players.get(self._player_key(player))
+        return state is not None and state.authed
 
     # Economy system（委托 Economy 模块，金钱以 float 存储，精确到分）
     def _round_money(self, value: float) -> float:
@@ -2273,7 +2324,10 @@ class ARCCorePlugin(Plugin):
                 online_player,
             )
             return False
-        success = self.economy.increase_player_money_by_xuid(player_xuid, amount)
+        # 一次读写完成变更并拿到新余额，通知时无需再查询
+        amount = abs(self._round_money(amount))
+        new_money = self.economy.add_player_money_by_xuid(player_xuid, amount) if amount > 0 else None
+        success = amount <= 0 or new_money is not None
         if not success:
             online_player = self.server.get_player(player_name)
             self.report_arc_error(
@@ -2284,7 +2338,8 @@ class ARCCorePlugin(Plugin):
         if success and notify:
             online_player = self.server.get_player(player_name)
             if online_player is not None:
-                new_money = self.economy.get_player_money_by_xuid(player_xuid)
+                if new_money is None:
+                    new_money = self.economy.get_player_money_by_xuid(player_xuid)
                 online_player.send_message(
                     self.language_manager.GetText('MONEY_ADD_HINT').format(
                         self._format_money_display(amount),
@@ -2299,6 +2354,10 @@ class ARCCorePlugin(Plugin):
         return success
 
     def decrease_player_money_by_name(self, player_name: str, amount: float, notify: bool = True) -> bool:
+        return self._decrease_player_money_with_balance(player_name, amount, notify) is not None
+
+    def _decrease_player_money_with_balance(self, player_name: str, amount: float, notify: bool = True) -> Optional[float]:
+        """扣除玩家金钱并返回扣除后的余额，失败返回 None（调用方展示余额时无需再查询）"""
         player_xuid = self.get_player_xuid_by_name(player_name)
         if not player_xuid:
             online_player = self.server.get_player(player_name)
@@ -2307,31 +2366,81 @@ class ARCCorePlugin(Plugin):
                 f"decrease_player_money_by_name cannot resolve xuid for name={player_name!r}",
                 online_player,
             )
-            return False
-        success = self.economy.decrease_player_money_by_xuid(player_xuid, amount)
-        if not success:
+            return None
+        # 一次读写完成变更并拿到新余额，通知时无需再查询
+        amount = abs(self._round_money(amount))
+        if amount > 0:
+            new_money = self.economy.add_player_money_by_xuid(player_xuid, -amount)
+        else:
+            new_money = self.economy.get_player_money_by_xuid(player_xuid)
+        if new_money is None:
             online_player = self.server.get_player(player_name)
             self.report_arc_error(
                 "BANK11",
                 f"decrease_player_money_by_name failed name={player_name!r} amount={amount!r}",
                 online_player,
             )
-        if success and notify:
+            return None
+        if notify:
             online_player = self.server.get_player(player_name)
             if online_player is not None:
-                new_money = self.economy.get_player_money_by_xuid(player_xuid)
                 online_player.send_message(
                     self.language_manager.GetText('MONEY_REDUCE_HINT').format(
                         self._format_money_display(amount),
                         self._format_money_display(new_money)
                     )
                 )
-        if success:
+        try:
+            self._update_richest_title_if_needed()
+        except Exception:
+            pass
+        return new_money
+
+    def _charge_teleport_cost(self, player: Player, cost: float, error_code: str, error_context: str) -> bool:
+        """
+        传送类功能统一扣费：余额不足或出错时提示并返回 False，成功时提示扣费与余额
+        :param error_code: 扣费出错时上报的错误码
+        :param error_context: 扣费出错时记录的上下文
+        """
+        if cost <= 0:
+            return True
+        charged, balance = self._charge_player_money(player, cost)
+        if not charged:
+            if balance is None:
+                self.report_arc_error(error_code, error_context, player)
+            else:
+                player.send_message(self.language_manager.GetText('TELEPORT_COST_NOT_ENOUGH_MONEY').format(
+                    self._format_money_display(cost),
+                    self._format_money_display(balance)
+                ))
+            return False
+        if balance is not None:
+            player.send_message(self.language_manager.GetText('TELEPORT_COST_DEDUCTED').format(
+                self._format_money_display(cost),
+                self._format_money_display(balance)
+            ))
+        return True
+
+    def _charge_player_money(self, player: Player, amount: float) -> tuple[bool, Optional[float]]:
+        """
+        在线玩家扣费：余额判断与扣减为同一条条件 UPDATE，成功时通知扣款
+        :return: (是否扣费成功, 当前余额)，余额为 None 表示出错
+        """
+        amount = abs(self._round_money(amount))
+        charged, balance = self.economy.try_charge_player_money_by_xuid(str(player.xuid), amount)
+        if charged:
+            if balance is not None:
+                player.send_message(
+                    self.language_manager.GetText('MONEY_REDUCE_HINT').format(
+                        self._format_money_display(amount),
+                        self._format_money_display(balance)
+                    )
+                )
             try:
                 self._update_richest_title_if_needed()
             except Exception:
                 pass
-        return success
+        return charged, balance
 
     def change_player_money_by_name(self, player_name: str, money_to_change: float, notify: bool = True) -> bool:
         m = self._round_money(money_to_change)
@@ -2595,14 +2704,18 @@ class ARCCorePlugin(Plugin):
             return self.database_manager.update(
                 'player_basic_info',
                 {'remaining_free_land_blocks': amount},
-                f"xuid = '{player_xuid}'"
+                'xuid = ?',
+                (player_xuid,)
             )
         except Exception as e:
             self.logger.error(f"{ColorFormat.RED}[ARC Core]Set player free land blocks error: {str(e)}")
             return False
 
     def get_invite_reward_config(self) -> Dict[str, Any]:
-        """获取邀请奖励配置"""
+        """获取邀请奖励配置（解析结果缓存至下次重载配置）"""
+        if self._invite_reward_cache is not None:
+            return self._invite_reward_cache
+
         item_name_setting = self.setting_manager.GetSetting('INVITE_REWARD_ITEM_NAME')
         item_name = item_name_setting if item_name_setting is not None else ''
 
@@ -2636,26 +2749,43 @@ class ARCCorePlugin(Plugin):
         money_amount = parse_float_money_setting(money_setting)
         free_blocks = parse_int_setting(free_blocks_setting)
 
-        return {
+        self._invite_reward_cache = {
             'item_name': item_name,
             'item_count': item_count,
             'money': money_amount,
             'free_blocks': free_blocks
         }
+        return self._invite_reward_cache
 
-    def grant_invite_reward_to_player(self, player: Player, times: int = 1):
-        """给玩家发放邀请奖励（可一次性发放多份）"""
-        if times <= 0:
-            return
-
+    def _write_invite_reward(self, player: Player, times: int) -> tuple:
+        """
+        在调用方的事务内写入 times 份邀请奖励中的金钱与免费领地格子，任一写入失败即抛出异常使事务整体回滚
+        :return: (物品名, 物品数量, 金钱, 免费领地格子, 写入后的余额或 None)，交给 _deliver_invite_reward 在提交后发放与通知
+        """
         reward_config = self.get_invite_reward_config()
 
         total_item_count = reward_config['item_count'] * times
         total_money = reward_config['money'] * times
         total_free_blocks = reward_config['free_blocks'] * times
 
+        new_money = None
+        if total_money > 0:
+            new_money = self.economy.add_player_money_by_xuid(str(player.xuid), total_money)
+            if new_money is None:
+                raise RuntimeError(f"add invite reward money failed amount={total_money!r}")
+
+        if total_free_blocks > 0:
+            current_free_blocks = self.get_player_free_land_blocks(player)
+            if not self.set_player_free_land_blocks(player, current_free_blocks + total_free_blocks):
+                raise RuntimeError(f"set invite reward free land blocks failed blocks={total_free_blocks!r}")
+
+        return reward_config['item_name'], total_item_count, total_money, total_free_blocks, new_money
+
+    def _deliver_invite_reward(self, player: Player, reward: tuple):
+        """事务提交后发放物资并通知玩家（give 指令不在持有数据库写锁时执行）"""
+        item_name, total_item_count, total_money, total_free_blocks, new_money = reward
+
         # 物资奖励通过服务器指令发放
-        item_name = reward_config['item_name']
         if item_name and total_item_count > 0:
             try:
                 self.server.dispatch_command(
@@ -2665,15 +2795,17 @@ class ARCCorePlugin(Plugin):
             except Exception as e:
                 self.logger.error(f"{ColorFormat.RED}[ARC Core]Give invite reward item error: {str(e)}")
 
-        # 金钱奖励
-        if total_money > 0:
-            self.increase_player_money(player, total_money)
-
-        # 免费领地格子奖励
-        if total_free_blocks > 0:
-            current_free_blocks = self.get_player_free_land_blocks(player)
-            new_free_blocks = current_free_blocks + total_free_blocks
-            self.set_player_free_land_blocks(player, new_free_blocks)
+        if new_money is not None:
+            player.send_message(
+                self.language_manager.GetText('MONEY_ADD_HINT').format(
+                    self._format_money_display(total_money),
+                    self._format_money_display(new_money)
+                )
+            )
+            try:
+                self._update_richest_title_if_needed()
+            except Exception:
+                pass
 
         player.send_message(
             self.language_manager.GetText('INVITE_REWARD_GIVE_SELF_HINT').format(
@@ -2683,30 +2815,63 @@ class ARCCorePlugin(Plugin):
             )
         )
 
-    def add_pending_invite_rewards(self, inviter_xuid: str, times: int = 1):
-        """为邀请人累加待领取邀请奖励次数"""
+    def grant_invite_reward_to_player(self, player: Player, times: int = 1) -> bool:
+        """给玩家发放邀请奖励（可一次性发放多份）：金钱与免费领地格子同一事务写入，提交后再发放物资"""
         if times <= 0:
-            return
+            return True
         try:
-            self.database_manager.execute(
-                "UPDATE player_basic_info "
-                "SET pending_invite_reward_times = COALESCE(pending_invite_reward_times, 0) + ? "
-                "WHERE xuid = ?",
-                (times, inviter_xuid)
-            )
+            with self.database_manager.transaction():
+                reward = self._write_invite_reward(player, times)
+        except Exception as e:
+            self.logger.error(f"{ColorFormat.RED}[ARC Core]Grant invite reward error: {str(e)}")
+            return False
+        self._deliver_invite_reward(player, reward)
+        return True
+
+    _SQL_ADD_PENDING_INVITE = (
+        "UPDATE player_basic_info "
+        "SET pending_invite_reward_times = COALESCE(pending_invite_reward_times, 0) + ? "
+        "WHERE xuid = ?"
+    )
+
+    def add_pending_invite_rewards(self, inviter_xuid: str, times: int = 1) -> bool:
+        """为邀请人累加待领取邀请奖励次数，返回是否写入成功"""
+        if times <= 0:
+            return True
+        try:
+            return self.database_manager.execute_rowcount(self._SQL_ADD_PENDING_INVITE, (times, inviter_xuid)) == 1
         except Exception as e:
             self.logger.error(f"{ColorFormat.RED}[ARC Core]Add pending invite rewards error: {str(e)}")
+            return False
 
-    def get_top_richest_players(self, top_count: int) -> Dict[str, float]:
-        rich_list = {}
-        for entry in self.economy.get_top_richest_xuids(top_count):
+    # 财富榜：一次查询连同玩家名取回，可在 SQL 中直接排除 OP
+    _SQL_TOP_RICHEST = (
+        "SELECT e.xuid, e.money, b.name FROM player_economy e "
+        "LEFT JOIN player_basic_info b ON e.xuid = b.xuid "
+        "ORDER BY e.money DESC LIMIT ?"
+    )
+    _SQL_TOP_RICHEST_NON_OP = (
+        "SELECT e.xuid, e.money, b.name FROM player_economy e "
+        "LEFT JOIN player_basic_info b ON e.xuid = b.xuid "
+        "WHERE (b.is_op IS NULL OR b.is_op = 0) "
+        "ORDER BY e.money DESC LIMIT ?"
+    )
+
+    def _query_top_richest(self, top_count: int, exclude_op: bool = False) -> list:
+        """财富榜前 top_count 名 [(玩家名, 金钱)]，查不到名字的记录跳过"""
+        sql = self._SQL_TOP_RICHEST_NON_OP if exclude_op else self._SQL_TOP_RICHEST
+        entries = []
+        for row in self.database_manager.query_all(sql, (top_count,)):
             try:
-                player_name = self.get_player_name_by_xuid(entry['xuid'])
+                player_name = row['name'] or self.get_player_name_by_xuid(row['xuid'])
                 if player_name:
-                    rich_list[player_name] = self._round_money(entry['money'])
+                    entries.append((player_name, self._round_money(row['money'])))
             except Exception:
                 continue
-        return rich_list
+        return entries
+
+    def get_top_richest_players(self, top_count: int) -> Dict[str, float]:
+        return dict(self._query_top_richest(top_count))
 
     def get_player_money_rank(self, player: Player) -> Optional[int]:
         return self.economy.get_player_money_rank_by_xuid(str(player.xuid))
@@ -2718,6 +2883,10 @@ class ARCCorePlugin(Plugin):
     def judge_if_player_has_enough_money(self, player: Player, amount: float) -> bool:
         return self.economy.judge_if_player_has_enough_money_by_xuid(str(player.xuid), amount)
 
+    def _has_enough_money(self, player: Player, amount: float) -> bool:
+        """内部快速路径：amount 已校验为正数且已取整时使用，省去重复取整与 abs"""
+        return self.economy.has_enough_money_by_xuid(str(player.xuid), amount)
+
     # Bank
     def show_bank_main_menu(self, player: Player):
         bank_main_menu = ActionForm(
@@ -2735,9 +2904,8 @@ class ARCCorePlugin(Plugin):
 
     def show_transfer_panel(self, player: Player):
         """显示在线玩家选择面板"""
-        online_players = self.server.online_players
-        # 过滤掉自己
-        available_players = [p for p in online_players if p.name != player.name]
+        # 过滤掉自己（按 xuid 比较）
+        available_players = self._online_players_except(player)
         
         if not available_players:
             # 没有其他在线玩家
@@ -2793,39 +2961,38 @@ class ARCCorePlugin(Plugin):
             # 直接使用目标玩家对象和金额进行转账
             error_code, receive_player, amount = self._validate_transfer_data_new(sender, target_player, data[1])
             if error_code == 0:
-                if not self.decrease_player_money(sender, amount):
+                balances = self.economy.transfer_money_by_xuid(str(sender.xuid), str(receive_player.xuid), amount)
+                if balances is None and not self._has_enough_money(sender, amount):
+                    # 提交前余额已被其他操作扣减
+                    error_code = 4
+                elif balances is None:
                     self.report_arc_error(
                         "BANK12",
-                        f"bank transfer decrease failed sender={sender.name!r} receiver={receive_player.name!r} amount={amount!r}",
+                        f"bank transfer failed sender={sender.name!r} receiver={receive_player.name!r} amount={amount!r}",
                         sender,
                     )
                     result_str = self.language_manager.GetText("TRANSFER_FAIL_DB_TEXT").format("BANK12")
-                elif not self.increase_player_money(receive_player, amount):
-                    self.report_arc_error(
-                        "BANK13",
-                        f"bank transfer increase failed after decrease; attempting rollback sender={sender.name!r} receiver={receive_player.name!r} amount={amount!r}",
-                        sender,
-                    )
-                    if not self.increase_player_money(sender, amount):
-                        self.report_arc_error(
-                            "BANK14",
-                            f"bank transfer rollback to sender FAILED sender={sender.name!r} amount={amount!r}",
-                            sender,
-                        )
-                        result_str = self.language_manager.GetText("TRANSFER_FAIL_DB_TEXT").format("BANK14")
-                    else:
-                        result_str = self.language_manager.GetText("TRANSFER_FAIL_DB_TEXT").format("BANK13")
                 else:
+                    sender_money, receiver_money = balances
+                    try:
+                        self._update_richest_title_if_needed()
+                    except Exception:
+                        pass
+                    amount_text = self._format_money_display(amount)
+                    sender.send_message(self.language_manager.GetText('MONEY_REDUCE_HINT').format(
+                        amount_text, self._format_money_display(sender_money)))
+                    receive_player.send_message(self.language_manager.GetText('MONEY_ADD_HINT').format(
+                        amount_text, self._format_money_display(receiver_money)))
                     receive_player.send_message(self.language_manager.GetText('RECEIVE_PLAYER_TRANSFER_MESSAGE').format(
                         sender.name,
-                        self._format_money_display(amount),
-                        self._format_money_display(self.get_player_money(receive_player))))
+                        amount_text,
+                        self._format_money_display(receiver_money)))
                     result_str = self.language_manager.GetText('TRANSFER_COMPLETED_HINT_TEXT').format(
                         receive_player.name,
-                        self._format_money_display(amount),
-                        self._format_money_display(self.get_player_money(sender))
+                        amount_text,
+                        self._format_money_display(sender_money)
                     )
-            else:
+            if error_code != 0:
                 result_str = self.language_manager.GetText(f'TRANSFER_ERROR_{error_code}_TEXT')
                 if error_code == 2:
                     result_str = result_str.format(target_player.name)
@@ -2880,7 +3047,7 @@ class ARCCorePlugin(Plugin):
             return 5, receive_player, amount
 
         # 检查玩家余额是否足够
-        if not self.judge_if_player_has_enough_money(player, amount):
+        if not self._has_enough_money(player, amount):
             return 4, receive_player, amount
 
         return error_code, receive_player, amount
@@ -2896,45 +3063,57 @@ class ARCCorePlugin(Plugin):
         error_code = 0
         amount = None
 
-        if target_player not in self.server.online_players:
+        target_xuid = str(target_player.xuid)
+        if not self._is_player_online(target_player, target_xuid):
             return 2, target_player, None
 
-        if target_player.name == player.name:
+        if target_xuid == str(player.xuid):
             return 6, target_player, None
 
-        try:
-            amount = self._round_money(float(amount_str))
-        except (ValueError, TypeError):
+        amount = self.economy.parse_money_input(amount_str)
+        if amount is None:
             return 3, target_player, None
 
         if amount <= 0:
             return 5, target_player, amount
 
-        if not self.judge_if_player_has_enough_money(player, amount):
+        if not self._has_enough_money(player, amount):
             return 4, target_player, amount
 
         return error_code, target_player, amount
 
+    def _get_money_rank_entries(self) -> list:
+        """
+        财富榜前 10 名 [(玩家名, 金钱)]：快照仅在无余额变化且未过期时复用，
+        与实时查询的本人余额、名次保持一致
+        """
+        now = time.monotonic()
+        if (
+            self._money_rank_cache is not None
+            and not self._money_rank_dirty
+            and now - self._money_rank_cache_time < self._money_rank_cache_ttl
+        ):
+            return self._money_rank_cache
+
+        # 隐藏 OP 时直接在查询中排除，名字随查询一并取回
+        entries = self._query_top_richest(10, exclude_op=self.hide_op_in_money_ranking)
+
+        self._money_rank_cache = entries
+        self._money_rank_cache_time = now
+        self._money_rank_dirty = False
+        return entries
+
+    def _mark_money_rank_dirty(self):
+        """余额发生变化（由经济模块回调），下次打开财富榜时重新查询"""
+        self._money_rank_dirty = True
+
+    def _invalidate_money_rank_cache(self):
+        """丢弃财富榜快照（OP 状态或榜单配置变化时调用），下次打开时重新查询"""
+        self._money_rank_cache = None
+
     def show_money_rank_panel(self, player: Player):
-        # 获取更多的玩家数据以便过滤后仍有足够的显示数量
-        initial_count = 20 if self.hide_op_in_money_ranking else 10
-        rank_dict = self.get_top_richest_players(initial_count)
-        
-        # 如果启用了隐藏OP功能，在业务逻辑层过滤OP玩家
-        filtered_rank_dict = {}
-        for player_name, player_money in rank_dict.items():
-            if self.hide_op_in_money_ranking:
-                # 检查玩家是否为OP
-                is_op = self.get_offline_player_op_status(player_name)
-                if is_op is True:
-                    continue  # 跳过OP玩家
-            filtered_rank_dict[player_name] = player_money
-            # 如果已经有足够的显示数量，停止添加
-            if len(filtered_rank_dict) >= 10:
-                break
-        
         rank_list = []
-        for i, (player_name, player_money) in enumerate(filtered_rank_dict.items()):
+        for i, (player_name, player_money) in enumerate(self._get_money_rank_entries()):
             rank_list.append(
                 self.language_manager.GetText('MONEY_RANK_INFO_TEXT').format(
                     i + 1, player_name, self._format_money_display(player_money)))
@@ -2960,38 +3139,40 @@ class ARCCorePlugin(Plugin):
             title=self.language_manager.GetText('TELEPORT_MAIN_MENU_TITLE'),
             content=self.language_manager.GetText('TELEPORT_MAIN_MENU_CONTENT')
         )
+        # 带价格按钮模板只取一次
+        with_cost_tmpl = self.language_manager.GetText('TELEPORT_BUTTON_WITH_COST')
         
         # 公共传送点按钮
         public_warp_text = self.language_manager.GetText('TELEPORT_MAIN_MENU_PUBLIC_WARP_BUTTON')
         if self.teleport_system.teleport_cost_public_warp > 0:
-            public_warp_text = self.language_manager.GetText('TELEPORT_BUTTON_WITH_COST').format(public_warp_text, self.teleport_system.teleport_cost_public_warp)
+            public_warp_text = with_cost_tmpl.format(public_warp_text, self.teleport_system.teleport_cost_public_warp)
         teleport_main_menu.add_button(public_warp_text, on_click=self.show_public_warp_menu)
         
         # 私人传送点按钮
         home_text = self.language_manager.GetText('TELEPORT_MAIN_MENU_HOME_BUTTON')
         if self.teleport_system.teleport_cost_home > 0:
-            home_text = self.language_manager.GetText('TELEPORT_BUTTON_WITH_COST').format(home_text, self.teleport_system.teleport_cost_home)
+            home_text = with_cost_tmpl.format(home_text, self.teleport_system.teleport_cost_home)
         teleport_main_menu.add_button(home_text, on_click=self.show_home_menu)
         
         # 随机传送按钮
         if self.teleport_system.enable_random_teleport:
             random_text = self.language_manager.GetText('TELEPORT_MAIN_MENU_RANDOM_BUTTON')
             if self.teleport_system.teleport_cost_random > 0:
-                random_text = self.language_manager.GetText('TELEPORT_BUTTON_WITH_COST').format(random_text, self.teleport_system.teleport_cost_random)
+                random_text = with_cost_tmpl.format(random_text, self.teleport_system.teleport_cost_random)
             teleport_main_menu.add_button(random_text, on_click=self.start_random_teleport)
         
         # 如果玩家有死亡位置记录，显示返回死亡地点的按钮
-        if self.teleport_system.has_death_location(player.name):
-            death_location = self.teleport_system.get_death_location(player.name)
-            death_text = self.language_manager.GetText('TELEPORT_MAIN_MENU_DEATH_LOCATION_BUTTON').format(death_location['dimension'])
+        death_location = self.teleport_system.get_death_location(self._player_key(player))
+        if death_location is not None:
+            death_text = self.language_manager.GetText('TELEPORT_MAIN_MENU_DEATH_LOCATION_BUTTON').format(death_location[0])
             if self.teleport_system.teleport_cost_death_location > 0:
-                death_text = self.language_manager.GetText('TELEPORT_BUTTON_WITH_COST').format(death_text, self.teleport_system.teleport_cost_death_location)
+                death_text = with_cost_tmpl.format(death_text, self.teleport_system.teleport_cost_death_location)
             teleport_main_menu.add_button(death_text, on_click=self.teleport_to_death_location)
         
         # 玩家传送请求按钮
         player_request_text = self.language_manager.GetText('TELEPORT_MAIN_MENU_PLAYER_REQUEST_BUTTON')
         if self.teleport_system.teleport_cost_player > 0:
-            player_request_text = self.language_manager.GetText('TELEPORT_BUTTON_WITH_COST').format(player_request_text, self.teleport_system.teleport_cost_player)
+            player_request_text = with_cost_tmpl.format(player_request_text, self.teleport_system.teleport_cost_player)
         teleport_main_menu.add_button(player_request_text, on_click=self.show_player_teleport_request_menu)
         
         # 返回
@@ -3009,7 +3190,7 @@ class ARCCorePlugin(Plugin):
     def get_public_warp(self, warp_name: str) -> Optional[Dict[str, Any]]:
         return self.teleport_system.get_public_warp(warp_name)
 
-    def get_all_public_warps(self) -> Dict[str, Dict[str, Any]]:
+    def get_all_public_warps(self) -> Mapping[str, Mapping[str, Any]]:
         return self.teleport_system.get_all_public_warps()
 
     def public_warp_exists(self, warp_name: str) -> bool:
@@ -3052,22 +3233,37 @@ class ARCCorePlugin(Plugin):
             on_close=self.show_teleport_menu
         )
         
+        # 按钮模板与价格在循环外取一次
+        button_tmpl = self.language_manager.GetText('PUBLIC_WARP_BUTTON_TEXT')
+        warp_cost = self.teleport_system.teleport_cost_public_warp
+        with_cost_tmpl = self.language_manager.GetText('TELEPORT_BUTTON_WITH_COST') if warp_cost > 0 else None
+        # 创建者名称一次批量解析
+        creator_names = self.get_player_names_by_xuids(w['created_by'] for w in public_warps.values())
         for warp_name, warp_info in public_warps.items():
-            creator_name = self.get_player_name_by_xuid(warp_info['created_by']) or 'Unknown'
-            warp_button_text = self.language_manager.GetText('PUBLIC_WARP_BUTTON_TEXT').format(warp_name, warp_info['dimension'], creator_name)
+            creator_name = creator_names.get(warp_info['created_by']) or 'Unknown'
+            warp_button_text = button_tmpl.format(warp_name, warp_info['dimension'], creator_name)
             # 如果公共传送点收费，显示价格
-            if self.teleport_system.teleport_cost_public_warp > 0:
-                warp_button_text = self.language_manager.GetText('TELEPORT_BUTTON_WITH_COST').format(warp_button_text, self.teleport_system.teleport_cost_public_warp)
+            if with_cost_tmpl is not None:
+                warp_button_text = with_cost_tmpl.format(warp_button_text, warp_cost)
             warp_menu.add_button(
                 warp_button_text,
-                on_click=lambda p=player, w_name=warp_name, w_info=warp_info: self.teleport_to_public_warp(p, w_name, w_info)
+                on_click=lambda p, w_name=warp_name: self._teleport_to_public_warp_by_name(p, w_name)
             )
         
         player.send_form(warp_menu)
 
+    def _teleport_to_public_warp_by_name(self, player: Player, warp_name: str):
+        """按钮回调只持有传送点名称，点击时再从公共传送点缓存取记录（已被删除时回到列表）"""
+        warp_info = self.get_all_public_warps().get(warp_name)
+        if warp_info is None:
+            self.show_public_warp_menu(player)
+            return
+        self.teleport_to_public_warp(player, warp_name, warp_info)
+
     def show_home_menu(self, player: Player):
         """显示玩家传送点菜单"""
-        player_homes = self.get_player_homes(str(player.xuid))
+        # 列表只展示名称与维度，坐标在打开详情时再按需查询
+        player_homes = self.teleport_system.get_player_home_dimensions(str(player.xuid))
         home_count = len(player_homes)
         
         home_menu = ActionForm(
@@ -3077,10 +3273,10 @@ class ARCCorePlugin(Plugin):
         )
         
         # 显示现有传送点
-        for home_name, home_info in player_homes.items():
+        for home_name, home_dimension in player_homes.items():
             home_menu.add_button(
-                self.language_manager.GetText('HOME_BUTTON_TEXT').format(home_name, home_info['dimension']),
-                on_click=lambda p=player, h_name=home_name, h_info=home_info: self.show_home_detail_menu(p, h_name, h_info)
+                self.language_manager.GetText('HOME_BUTTON_TEXT').format(home_name, home_dimension),
+                on_click=lambda p, h_name=home_name: self._open_home_detail_menu(p, h_name)
             )
         
         # 添加新传送点按钮
@@ -3092,6 +3288,14 @@ class ARCCorePlugin(Plugin):
         
         player.send_form(home_menu)
 
+    def _open_home_detail_menu(self, player: Player, home_name: str):
+        """从传送点列表进入详情：按名称取出完整记录（已被删除时回到列表）"""
+        home_info = self.get_player_home(str(player.xuid), home_name)
+        if home_info is None:
+            self.show_home_menu(player)
+            return
+        self.show_home_detail_menu(player, home_name, home_info)
+
     def show_home_detail_menu(self, player: Player, home_name: str, home_info: Dict[str, Any]):
         """显示传送点详情菜单"""
         detail_menu = ActionForm(
@@ -3143,14 +3347,15 @@ class ARCCorePlugin(Plugin):
                 self.show_create_home_panel(player)
                 return
             
-            # 创建传送点
+            # 创建传送点（位置只读取一次）
+            location = player.location
             success = self.create_player_home(
                 str(player.xuid),
                 home_name,
-                player.location.dimension.name,
-                player.location.x,
-                player.location.y,
-                player.location.z
+                location.dimension.name,
+                location.x,
+                location.y,
+                location.z
             )
             
             if success:
@@ -3194,59 +3399,25 @@ class ARCCorePlugin(Plugin):
         self.show_home_menu(player)
 
     # Teleport Functions
-    def teleport_to_public_warp(self, player: Player, warp_name: str, warp_info: Dict[str, Any]):
+    def teleport_to_public_warp(self, player: Player, warp_name: str, warp_info: Mapping[str, Any]):
         """传送到公共传送点"""
-        # 检查费用
-        if self.teleport_system.teleport_cost_public_warp > 0:
-            player_money = self.get_player_money(player)
-            if player_money < self.teleport_system.teleport_cost_public_warp:
-                player.send_message(self.language_manager.GetText('TELEPORT_COST_NOT_ENOUGH_MONEY').format(
-                    self._format_money_display(self.teleport_system.teleport_cost_public_warp),
-                    self._format_money_display(player_money)
-                ))
-                return
-            
-            # 扣除费用
-            if self.decrease_player_money(player, self.teleport_system.teleport_cost_public_warp):
-                player.send_message(self.language_manager.GetText('TELEPORT_COST_DEDUCTED').format(
-                    self._format_money_display(self.teleport_system.teleport_cost_public_warp),
-                    self._format_money_display(self.get_player_money(player))
-                ))
-            else:
-                self.report_arc_error(
-                    "TP1",
-                    f"teleport_to_public_warp decrease failed warp={warp_name!r} cost={self.teleport_system.teleport_cost_public_warp!r}",
-                    player,
-                )
-                return
+        # 检查并扣除费用
+        if not self._charge_teleport_cost(
+            player, self.teleport_system.teleport_cost_public_warp,
+            "TP1", f"teleport_to_public_warp decrease failed warp={warp_name!r} cost={self.teleport_system.teleport_cost_public_warp!r}",
+        ):
+            return
         
         self.start_teleport_to_position_countdown(player, warp_name, (warp_info['x'], warp_info['y'], warp_info['z']), 'PUBLIC_WARP', warp_info['dimension'])
 
     def teleport_to_home(self, player: Player, home_name: str, home_info: Dict[str, Any]):
         """传送到玩家传送点"""
-        # 检查费用
-        if self.teleport_system.teleport_cost_home > 0:
-            player_money = self.get_player_money(player)
-            if player_money < self.teleport_system.teleport_cost_home:
-                player.send_message(self.language_manager.GetText('TELEPORT_COST_NOT_ENOUGH_MONEY').format(
-                    self._format_money_display(self.teleport_system.teleport_cost_home),
-                    self._format_money_display(player_money)
-                ))
-                return
-            
-            # 扣除费用
-            if self.decrease_player_money(player, self.teleport_system.teleport_cost_home):
-                player.send_message(self.language_manager.GetText('TELEPORT_COST_DEDUCTED').format(
-                    self._format_money_display(self.teleport_system.teleport_cost_home),
-                    self._format_money_display(self.get_player_money(player))
-                ))
-            else:
-                self.report_arc_error(
-                    "TP2",
-                    f"teleport_to_home decrease failed home={home_name!r} cost={self.teleport_system.teleport_cost_home!r}",
-                    player,
-                )
-                return
+        # 检查并扣除费用
+        if not self._charge_teleport_cost(
+            player, self.teleport_system.teleport_cost_home,
+            "TP2", f"teleport_to_home decrease failed home={home_name!r} cost={self.teleport_system.teleport_cost_home!r}",
+        ):
+            return
         
         self.start_teleport_to_position_countdown(player, home_name, (home_info['x'], home_info['y'], home_info['z']), 'HOME', home_info['dimension'])
 
@@ -3254,7 +3425,7 @@ class ARCCorePlugin(Plugin):
         """开始传送到位置倒计时"""
         self.server.scheduler.run_task(
             self, 
-            lambda: self.execute_teleport_to_position(player, destination_name, position, teleport_type, dimension), 
+            partial(self.execute_teleport_to_position, player, destination_name, position, teleport_type, dimension), 
             delay=45
         )
         
@@ -3271,7 +3442,7 @@ class ARCCorePlugin(Plugin):
         """开始传送到玩家倒计时"""
         self.server.scheduler.run_task(
             self, 
-            lambda: self.execute_teleport_to_player(player, target_player), 
+            partial(self.execute_teleport_to_player, player, target_player), 
             delay=45
         )
 
@@ -3300,40 +3471,21 @@ class ARCCorePlugin(Plugin):
     # Death Location Teleport
     def teleport_to_death_location(self, player: Player):
         """传送到死亡地点"""
-        if not self.teleport_system.has_death_location(player.name):
+        if not self.teleport_system.has_death_location(self._player_key(player)):
             player.send_message(self.language_manager.GetText('NO_DEATH_LOCATION_RECORDED'))
             return
         
-        # 检查费用
-        if self.teleport_system.teleport_cost_death_location > 0:
-            player_money = self.get_player_money(player)
-            if player_money < self.teleport_system.teleport_cost_death_location:
-                player.send_message(self.language_manager.GetText('TELEPORT_COST_NOT_ENOUGH_MONEY').format(
-                    self._format_money_display(self.teleport_system.teleport_cost_death_location),
-                    self._format_money_display(player_money)
-                ))
-                return
-            
-            # 扣除费用
-            if self.decrease_player_money(player, self.teleport_system.teleport_cost_death_location):
-                player.send_message(self.language_manager.GetText('TELEPORT_COST_DEDUCTED').format(
-                    self._format_money_display(self.teleport_system.teleport_cost_death_location),
-                    self._format_money_display(self.get_player_money(player))
-                ))
-            else:
-                self.report_arc_error(
-                    "TP3",
-                    f"teleport_to_death_location decrease failed cost={self.teleport_system.teleport_cost_death_location!r}",
-                    player,
-                )
-                return
-        
-        death_location = self.teleport_system.get_death_location(player.name)
+        # 检查并扣除费用
+        if not self._charge_teleport_cost(
+            player, self.teleport_system.teleport_cost_death_location,
+            "TP3", f"teleport_to_death_location decrease failed cost={self.teleport_system.teleport_cost_death_location!r}",
+        ):
+            return
         
         # 开始传送倒计时
         self.server.scheduler.run_task(
             self, 
-            lambda: self.execute_death_location_teleport(player), 
+            partial(self.execute_death_location_teleport, player), 
             delay=45
         )
         
@@ -3341,15 +3493,13 @@ class ARCCorePlugin(Plugin):
 
     def execute_death_location_teleport(self, player: Player):
         """执行死亡地点传送"""
-        if not self.teleport_system.has_death_location(player.name):
+        death_location = self.teleport_system.pop_death_location(self._player_key(player))
+        if death_location is None:
             player.send_message(self.language_manager.GetText('NO_DEATH_LOCATION_RECORDED'))
             return
-        death_location = self.teleport_system.get_death_location(player.name)
-        position = (death_location['x'], death_location['y'], death_location['z'])
-        dimension = death_location['dimension']
+        dimension, x, y, z = death_location
         player.send_message(self.language_manager.GetText('TELEPORT_TO_DEATH_LOCATION_SUCCESS'))
-        self.teleport_system.execute_teleport_to_position(player.name, position, dimension)
-        self.teleport_system.clear_death_location(player.name)
+        self.teleport_system.execute_teleport_to_position(player.name, (x, y, z), dimension)
 
     # Random Teleport System
     def start_random_teleport(self, player: Player):
@@ -3359,29 +3509,12 @@ class ARCCorePlugin(Plugin):
             player.send_message(self.language_manager.GetText('RANDOM_TELEPORT_DISABLED'))
             return
         
-        # 检查费用
-        if self.teleport_system.teleport_cost_random > 0:
-            player_money = self.get_player_money(player)
-            if player_money < self.teleport_system.teleport_cost_random:
-                player.send_message(self.language_manager.GetText('TELEPORT_COST_NOT_ENOUGH_MONEY').format(
-                    self._format_money_display(self.teleport_system.teleport_cost_random),
-                    self._format_money_display(player_money)
-                ))
-                return
-            
-            # 扣除费用
-            if self.decrease_player_money(player, self.teleport_system.teleport_cost_random):
-                player.send_message(self.language_manager.GetText('TELEPORT_COST_DEDUCTED').format(
-                    self._format_money_display(self.teleport_system.teleport_cost_random),
-                    self._format_money_display(self.get_player_money(player))
-                ))
-            else:
-                self.report_arc_error(
-                    "TP4",
-                    f"start_random_teleport decrease failed cost={self.teleport_system.teleport_cost_random!r}",
-                    player,
-                )
-                return
+        # 检查并扣除费用
+        if not self._charge_teleport_cost(
+            player, self.teleport_system.teleport_cost_random,
+            "TP4", f"start_random_teleport decrease failed cost={self.teleport_system.teleport_cost_random!r}",
+        ):
+            return
         
         # 发送倒计时消息
         player.send_message(self.language_manager.GetText('RANDOM_TELEPORT_COUNTDOWN'))
@@ -3389,7 +3522,7 @@ class ARCCorePlugin(Plugin):
         # 延迟执行传送
         self.server.scheduler.run_task(
             self,
-            lambda: self.execute_random_teleport(player),
+            partial(self.execute_random_teleport, player),
             delay=45
         )
     
@@ -3401,7 +3534,7 @@ class ARCCorePlugin(Plugin):
         self.teleport_system.execute_teleport_to_position(player.name, position, dimension)
         self.server.scheduler.run_task(
             self,
-            lambda: self._apply_slow_falling_effect(player),
+            partial(self._apply_slow_falling_effect, player),
             delay=2
         )
 
@@ -3429,11 +3562,10 @@ class ARCCorePlugin(Plugin):
             on_click=self.show_send_tphere_request_panel
         )
         
-        # 检查是否有待处理的请求
-        pending_requests = self.get_pending_requests_for_player(player)
-        if pending_requests:
+        # 检查是否有待处理的请求（每个玩家至多一个）
+        if self.teleport_system.peek_pending_request(player.name) is not None:
             request_menu.add_button(
-                self.language_manager.GetText('HANDLE_PENDING_REQUESTS_BUTTON').format(len(pending_requests)),
+                self.language_manager.GetText('HANDLE_PENDING_REQUESTS_BUTTON').format(1),
                 on_click=self.show_pending_requests_menu
             )
         
@@ -3441,83 +3573,60 @@ class ARCCorePlugin(Plugin):
 
     def show_send_tpa_request_panel(self, player: Player):
         """显示发送TPA请求面板"""
-        online_players = [p for p in self.server.online_players if p.name != player.name]
-        if not online_players:
-            no_players_panel = ActionForm(
-                title=self.language_manager.GetText('SEND_TPA_REQUEST_TITLE'),
-                content=self.language_manager.GetText('NO_OTHER_PLAYERS_ONLINE'),
-                on_close=self.show_player_teleport_request_menu
-            )
-            player.send_form(no_players_panel)
-            return
-
-        tpa_menu = ActionForm(
-            title=self.language_manager.GetText('SEND_TPA_REQUEST_TITLE'),
-            content=self.language_manager.GetText('SEND_TPA_REQUEST_CONTENT'),
-            on_close=self.show_player_teleport_request_menu
-        )
-        
-        for target_player in online_players:
-            tpa_menu.add_button(
-                self.language_manager.GetText('TPA_TARGET_BUTTON').format(target_player.name),
-                on_click=lambda p=player, t=target_player: self.send_tpa_request(p, t)
-            )
-        
-        player.send_form(tpa_menu)
+        self._show_send_teleport_request_panel(player, 'TPA', self.send_tpa_request)
 
     def show_send_tphere_request_panel(self, player: Player):
         """显示发送TPHERE请求面板"""
-        online_players = [p for p in self.server.online_players if p.name != player.name]
+        self._show_send_teleport_request_panel(player, 'TPHERE', self.send_tphere_request)
+
+    def _show_send_teleport_request_panel(self, player: Player, request_type: str, send_request):
+        """
+        TPA/TPHERE 目标选择面板：在线列表只遍历一次，按 xuid 排除自己，按钮模板在循环外取一次
+        :param request_type: 'TPA' 或 'TPHERE'，对应语言键前缀
+        :param send_request: 选择目标后的回调 (sender, target)
+        """
+        online_players = self._online_players_except(player)
         if not online_players:
-            no_players_panel = ActionForm(
-                title=self.language_manager.GetText('SEND_TPHERE_REQUEST_TITLE'),
-                content=self.language_manager.GetText('NO_OTHER_PLAYERS_ONLINE'),
-                on_close=self.show_player_teleport_request_menu
-            )
+            # 无其他在线玩家的提示面板内容固定，复用静态表单缓存
+            menu_id = f'no_players_{request_type}'
+            no_players_panel = self._form_cache.get(menu_id)
+            if no_players_panel is None:
+                no_players_panel = self._form_cache[menu_id] = ActionForm(
+                    title=self.language_manager.GetText(f'SEND_{request_type}_REQUEST_TITLE'),
+                    content=self.language_manager.GetText('NO_OTHER_PLAYERS_ONLINE'),
+                    on_close=self.show_player_teleport_request_menu
+                )
             player.send_form(no_players_panel)
             return
 
-        tphere_menu = ActionForm(
-            title=self.language_manager.GetText('SEND_TPHERE_REQUEST_TITLE'),
-            content=self.language_manager.GetText('SEND_TPHERE_REQUEST_CONTENT'),
+        request_menu = ActionForm(
+            title=self.language_manager.GetText(f'SEND_{request_type}_REQUEST_TITLE'),
+            content=self.language_manager.GetText(f'SEND_{request_type}_REQUEST_CONTENT'),
             on_close=self.show_player_teleport_request_menu
         )
         
+        button_tmpl = self.language_manager.GetText(f'{request_type}_TARGET_BUTTON')
         for target_player in online_players:
-            tphere_menu.add_button(
-                self.language_manager.GetText('TPHERE_TARGET_BUTTON').format(target_player.name),
-                on_click=lambda p=player, t=target_player: self.send_tphere_request(p, t)
+            request_menu.add_button(
+                button_tmpl.format(target_player.name),
+                on_click=lambda p, t=target_player: send_request(p, t)
             )
         
-        player.send_form(tphere_menu)
+        player.send_form(request_menu)
 
     def send_tpa_request(self, sender: Player, target: Player):
         """发送TPA请求（请求传送到目标玩家处）"""
-        import time
-        
-        # 检查费用
-        if self.teleport_system.teleport_cost_player > 0:
-            player_money = self.get_player_money(sender)
-            if player_money < self.teleport_system.teleport_cost_player:
-                sender.send_message(self.language_manager.GetText('TELEPORT_COST_NOT_ENOUGH_MONEY').format(
-                    self._format_money_display(self.teleport_system.teleport_cost_player),
-                    self._format_money_display(player_money)
-                ))
-                return
-            
-            # 扣除费用
-            if self.decrease_player_money(sender, self.teleport_system.teleport_cost_player):
-                sender.send_message(self.language_manager.GetText('TELEPORT_COST_DEDUCTED').format(
-                    self._format_money_display(self.teleport_system.teleport_cost_player),
-                    self._format_money_display(self.get_player_money(sender))
-                ))
-            else:
-                self.report_arc_error(
-                    "TP5",
-                    f"send_tpa_request decrease failed target={target.name!r} cost={self.teleport_system.teleport_cost_player!r}",
-                    sender,
-                )
-                return
+        # 目标已有未过期请求时直接拒绝，避免先扣费再失败
+        if self.teleport_system.has_request(target.name):
+            sender.send_message(self.language_manager.GetText('TELEPORT_REQUEST_ALREADY_EXISTS').format(target.name))
+            return
+
+        # 检查并扣除费用
+        if not self._charge_teleport_cost(
+            sender, self.teleport_system.teleport_cost_player,
+            "TP5", f"send_tpa_request decrease failed target={target.name!r} cost={self.teleport_system.teleport_cost_player!r}",
+        ):
+            return
         
         if not self.teleport_system.add_request(target.name, 'tpa', sender.name):
             sender.send_message(self.language_manager.GetText('TELEPORT_REQUEST_ALREADY_EXISTS').format(target.name))
@@ -3527,31 +3636,17 @@ class ARCCorePlugin(Plugin):
 
     def send_tphere_request(self, sender: Player, target: Player):
         """发送TPHERE请求（请求目标玩家传送过来）"""
-        import time
-        
-        # 检查费用
-        if self.teleport_system.teleport_cost_player > 0:
-            player_money = self.get_player_money(sender)
-            if player_money < self.teleport_system.teleport_cost_player:
-                sender.send_message(self.language_manager.GetText('TELEPORT_COST_NOT_ENOUGH_MONEY').format(
-                    self._format_money_display(self.teleport_system.teleport_cost_player),
-                    self._format_money_display(player_money)
-                ))
-                return
-            
-            # 扣除费用
-            if self.decrease_player_money(sender, self.teleport_system.teleport_cost_player):
-                sender.send_message(self.language_manager.GetText('TELEPORT_COST_DEDUCTED').format(
-                    self._format_money_display(self.teleport_system.teleport_cost_player),
-                    self._format_money_display(self.get_player_money(sender))
-                ))
-            else:
-                self.report_arc_error(
-                    "TP6",
-                    f"send_tphere_request decrease failed target={target.name!r} cost={self.teleport_system.teleport_cost_player!r}",
-                    sender,
-                )
-                return
+        # 目标已有未过期请求时直接拒绝，避免先扣费再失败
+        if self.teleport_system.has_request(target.name):
+            sender.send_message(self.language_manager.GetText('TELEPORT_REQUEST_ALREADY_EXISTS').format(target.name))
+            return
+
+        # 检查并扣除费用
+        if not self._charge_teleport_cost(
+            sender, self.teleport_system.teleport_cost_player,
+            "TP6", f"send_tphere_request decrease failed target={target.name!r} cost={self.teleport_system.teleport_cost_player!r}",
+        ):
+            return
         
         if not self.teleport_system.add_request(target.name, 'tphere', sender.name):
             sender.send_message(self.language_manager.GetText('TELEPORT_REQUEST_ALREADY_EXISTS').format(target.name))
@@ -3565,13 +3660,12 @@ class ARCCorePlugin(Plugin):
 
     def show_pending_requests_menu(self, player: Player):
         """显示待处理请求菜单"""
-        pending_requests = self.get_pending_requests_for_player(player)
-        if not pending_requests:
+        request = self.teleport_system.peek_pending_request(player.name)
+        if request is None:
             player.send_message(self.language_manager.GetText('NO_PENDING_REQUESTS'))
             self.show_player_teleport_request_menu(player)
             return
 
-        request = pending_requests[0]  # 目前只处理一个请求
         request_menu = ActionForm(
             title=self.language_manager.GetText('PENDING_REQUEST_MENU_TITLE'),
             content=self.language_manager.GetText('PENDING_REQUEST_CONTENT').format(
@@ -3595,8 +3689,8 @@ class ARCCorePlugin(Plugin):
 
     def accept_teleport_request(self, player: Player):
         """接受传送请求"""
-        request = self.teleport_system.get_request(player.name)
-        if not request:
+        request = self.teleport_system.peek_pending_request(player.name)
+        if request is None:
             player.send_message(self.language_manager.GetText('NO_PENDING_REQUESTS'))
             return
         sender = self.server.get_player(request['sender'])
@@ -3616,8 +3710,8 @@ class ARCCorePlugin(Plugin):
 
     def deny_teleport_request(self, player: Player):
         """拒绝传送请求"""
-        request = self.teleport_system.get_request(player.name)
-        if not request:
+        request = self.teleport_system.peek_pending_request(player.name)
+        if request is None:
             player.send_message(self.language_manager.GetText('NO_PENDING_REQUESTS'))
             return
         sender = self.server.get_player(request['sender'])
@@ -3824,13 +3918,14 @@ class ARCCorePlugin(Plugin):
                 self.show_create_warp_panel(player)
                 return
             
-            # 创建公共传送点
+            # 创建公共传送点（位置只读取一次）
+            location = player.location
             success = self.create_public_warp(
                 warp_name,
-                player.location.dimension.name,
-                player.location.x,
-                player.location.y,
-                player.location.z,
+                location.dimension.name,
+                location.x,
+                location.y,
+                location.z,
                 str(player.xuid)
             )
             
@@ -3979,12 +4074,15 @@ class ARCCorePlugin(Plugin):
     def get_land_info(self, land_id: int) -> dict:
         return self.land_system.get_land_info(land_id)
 
+    def get_land_perm_info(self, land_id: int) -> Optional[LandInfo]:
+        return self.land_system.get_land_perm_info(land_id)
+
     PUBLIC_LAND_OWNER_XUID = LandSystem.PUBLIC_LAND_OWNER_XUID
 
     def is_public_land(self, land_id: int) -> bool:
         return self.land_system.is_public_land(land_id)
 
-    def _get_public_land_protected_entities(self) -> Set[str]:
+    def _get_public_land_protected_entities(self) -> FrozenSet[str]:
         return self.land_system.get_public_land_protected_entities()
 
     def get_land_display_owner_name(self, land_id: int) -> str:
@@ -4152,11 +4250,12 @@ class ARCCorePlugin(Plugin):
         player.send_form(rename_panel)
 
     def set_player_pos_as_land_tp_pos(self, player: Player, land_id: int):
-        on_land_id = self.get_land_at_pos(player.location.dimension.name, math.floor(player.location.x), math.floor(player.location.z))
+        location = player.location
+        new_pos = (math.floor(location.x), math.floor(location.y), math.floor(location.z))
+        on_land_id = self.get_land_at_pos(location.dimension.name, new_pos[0], new_pos[2])
         if on_land_id is None or on_land_id != land_id:
             result = self.language_manager.GetText('SET_LAND_TP_POS_FAIL_OUT_LAND')
         else:
-            new_pos = (math.floor(player.location.x), math.floor(player.location.y), math.floor(player.location.z))
             self.set_land_teleport_point(land_id, new_pos[0], new_pos[1], new_pos[2])
             result = self.language_manager.GetText('SET_LAND_TP_POS_SUCCESS').format(land_id, new_pos)
         result_panel = ActionForm(
@@ -4167,32 +4266,15 @@ class ARCCorePlugin(Plugin):
         player.send_form(result_panel)
 
     def teleport_to_land(self, player: Player, land_id: int):
-        # 检查费用
-        if self.teleport_system.teleport_cost_land > 0:
-            player_money = self.get_player_money(player)
-            if player_money < self.teleport_system.teleport_cost_land:
-                player.send_message(self.language_manager.GetText('TELEPORT_COST_NOT_ENOUGH_MONEY').format(
-                    self._format_money_display(self.teleport_system.teleport_cost_land),
-                    self._format_money_display(player_money)
-                ))
-                return
-            
-            # 扣除费用
-            if self.decrease_player_money(player, self.teleport_system.teleport_cost_land):
-                player.send_message(self.language_manager.GetText('TELEPORT_COST_DEDUCTED').format(
-                    self._format_money_display(self.teleport_system.teleport_cost_land),
-                    self._format_money_display(self.get_player_money(player))
-                ))
-            else:
-                self.report_arc_error(
-                    "TP7",
-                    f"teleport_to_land decrease failed land_id={land_id!r} cost={self.teleport_system.teleport_cost_land!r}",
-                    player,
-                )
-                return
+        # 检查并扣除费用
+        if not self._charge_teleport_cost(
+            player, self.teleport_system.teleport_cost_land,
+            "TP7", f"teleport_to_land decrease failed land_id={land_id!r} cost={self.teleport_system.teleport_cost_land!r}",
+        ):
+            return
         
         tp_target_pos = self.get_land_teleport_point(land_id)
-        self.server.scheduler.run_task(self, lambda p=player, l_id=land_id, pos=tp_target_pos: self.delay_teleport_to_land(p, l_id, pos), delay=45)
+        self.server.scheduler.run_task(self, partial(self.delay_teleport_to_land, player, land_id, tp_target_pos), delay=45)
         player.send_message(self.language_manager.GetText('READY_TELEPORT_TO_LAND').format(land_id))
 
     def delay_teleport_to_land(self, player: Player, land_id: int, position: tuple):
@@ -4240,7 +4322,7 @@ class ARCCorePlugin(Plugin):
 
     def show_transfer_land_panel(self, player: Player, land_id: int):
         """显示移交领地面板，让玩家选择要移交给谁"""
-        online_players = [p for p in self.server.online_players if p.name != player.name]
+        online_players = self._online_players_except(player)
         if not online_players:
             no_players_panel = ActionForm(
                 title=self.language_manager.GetText('TRANSFER_LAND_PANEL_TITLE'),
@@ -4304,15 +4386,15 @@ class ARCCorePlugin(Plugin):
             )
             return
 
+        target_xuid = str(target_player.xuid)
         # 检查目标玩家是否还在线
-        target_online = any(p.name == target_player.name for p in self.server.online_players)
-        if not target_online:
+        if not self._is_player_online(target_player, target_xuid):
             player.send_message(self.language_manager.GetText('REQUEST_SENDER_OFFLINE'))
             self.show_own_land_menu(player)
             return
 
         # 执行移交
-        success = self.transfer_land(land_id, str(target_player.xuid))
+        success = self.transfer_land(land_id, target_xuid)
         if success:
             # 通知当前玩家
             player.send_message(self.language_manager.GetText('TRANSFER_LAND_SUCCESS').format(land_id, target_player.name))
@@ -4359,7 +4441,7 @@ class ARCCorePlugin(Plugin):
 
     def show_add_land_auth_panel(self, player: Player, land_id: int):
         """显示添加领地授权面板"""
-        online_players = [p for p in self.server.online_players if p.name != player.name]
+        online_players = self._online_players_except(player)
         if not online_players:
             no_players_panel = ActionForm(
                 title=self.language_manager.GetText('LAND_AUTH_ADD_PANEL_TITLE'),
@@ -4716,7 +4798,7 @@ class ARCCorePlugin(Plugin):
 
     def show_create_new_land_guide(self, player: Player):
         """显示创建领地的坐标输入表单，可预填上次设定的值"""
-        cached = self.player_new_land_creation_info.get(player.name, {})
+        cached = self._get_player_state(player).new_land or {}
         default_min_x = str(cached.get('min_x', math.floor(player.location.x)))
         default_max_x = str(cached.get('max_x', math.floor(player.location.x)))
         default_min_y = str(cached.get('min_y', math.floor(player.location.y)))
@@ -4758,7 +4840,7 @@ class ARCCorePlugin(Plugin):
                 min_x, max_x = min(min_x, max_x), max(min_x, max_x)
                 min_y, max_y = min(min_y, max_y), max(min_y, max_y)
                 min_z, max_z = min(min_z, max_z), max(min_z, max_z)
-                self.player_new_land_creation_info[p.name] = {
+                self._get_player_state(p).new_land = {
                     'dimension': p.location.dimension.name,
                     'min_x': min_x, 'max_x': max_x,
                     'min_y': min_y, 'max_y': max_y,
@@ -4938,11 +5020,11 @@ class ARCCorePlugin(Plugin):
 
     def show_new_land_info(self, player: Player):
         """显示待购买领地的预览信息面板（含购买按钮和/landbuy提示）"""
-        info = self.player_new_land_creation_info.get(player.name)
+        info = self._get_player_state(player).new_land
         if not info:
             self.report_arc_error(
                 "LAND25",
-                f"show_new_land_info no player_new_land_creation_info player={player.name!r}",
+                f"show_new_land_info no pending new_land player={player.name!r}",
                 player,
             )
             return
@@ -5013,7 +5095,7 @@ class ARCCorePlugin(Plugin):
 
     def _execute_land_buy(self, player: Player):
         """供/landbuy命令调用，检查并购买缓存中的领地"""
-        info = self.player_new_land_creation_info.get(player.name)
+        info = self._get_player_state(player).new_land
         if not info:
             player.send_message(self.language_manager.GetText('LANDBUY_NO_PENDING_LAND'))
             return
@@ -5052,7 +5134,7 @@ class ARCCorePlugin(Plugin):
 
     def _visualize_pending_land(self, player: Player):
         """用粒子效果可视化玩家缓存中的待购买领地"""
-        info = self.player_new_land_creation_info.get(player.name)
+        info = self._get_player_state(player).new_land
         if not info:
             return
         self.display_land_particle_boundary(player, {
@@ -5062,7 +5144,7 @@ class ARCCorePlugin(Plugin):
         })
 
     def clear_new_land_creation_info_memory(self, player: Player):
-        self.player_new_land_creation_info.pop(player.name, None)
+        self._get_player_state(player).new_land = None
 
     def player_buy_new_land(self, player: Player, dimension: str,
                             min_x: int, max_x: int, min_y: int, max_y: int, min_z: int, max_z: int,
@@ -5079,10 +5161,11 @@ class ARCCorePlugin(Plugin):
             if land_id is not None:
                 if not player.is_op:
                     if money_cost > 0:
-                        if self.decrease_player_money(player, money_cost):
+                        new_balance = self._decrease_player_money_with_balance(player.name, money_cost)
+                        if new_balance is not None:
                             player.send_message(self.language_manager.GetText('PAY_SUCCESS_HINT').format(
                                 self._format_money_display(money_cost),
-                                self._format_money_display(self.get_player_money(player))))
+                                self._format_money_display(new_balance)))
                         else:
                             self.report_arc_error(
                                 "LAND_PAY1",
@@ -5400,7 +5483,14 @@ class ARCCorePlugin(Plugin):
                 player,
             )
             return
-        online_players = [p for p in self.server.online_players if str(p.xuid) != str(player.xuid) and str(p.xuid) != sl_info['owner_xuid'] and str(p.xuid) not in sl_info['shared_users']]
+        # 排除自己、子领地主人与已授权玩家（xuid 每人只取一次）
+        xuid_s = str(player.xuid)
+        excluded_xuids = {xuid_s, sl_info['owner_xuid'], *sl_info['shared_users']}
+        online_players = []
+        for p in self.server.online_players:
+            p_xuid = str(p.xuid)
+            if p_xuid not in excluded_xuids:
+                online_players.append((p, p_xuid))
         if not online_players:
             player.send_message(self.language_manager.GetText('LAND_AUTH_NO_SHARED_USERS'))
             self.show_sub_land_auth_manage_panel(player, sub_land_id)
@@ -5410,10 +5500,10 @@ class ARCCorePlugin(Plugin):
             content=self.language_manager.GetText('LAND_AUTH_SELECT_PLAYER_CONTENT'),
             on_close=lambda p=player, sl=sub_land_id: self.show_sub_land_auth_manage_panel(p, sl)
         )
-        for op in online_players:
+        for op, op_xuid in online_players:
             panel.add_button(
                 self.language_manager.GetText('LAND_AUTH_ADD_TARGET_BUTTON').format(op.name),
-                on_click=lambda p=player, sl=sub_land_id, target=op: self._do_add_sub_land_auth(p, sl, str(target.xuid), target.name)
+                on_click=lambda p=player, sl=sub_land_id, tx=op_xuid, tn=op.name: self._do_add_sub_land_auth(p, sl, tx, tn)
             )
         player.send_form(panel)
 
@@ -5491,7 +5581,7 @@ class ARCCorePlugin(Plugin):
         panel.add_button(self.language_manager.GetText('RECORD_COOR_2'), on_click=self.record_coordinate_2)
         debug_btn_text = (
             self.language_manager.GetText('OP_DEBUG_MODE_BUTTON_ON')
-            if player.name in self.op_debug_mode
+            if self._player_key(player) in self.op_debug_mode
             else self.language_manager.GetText('OP_DEBUG_MODE_BUTTON_OFF')
         )
         panel.add_button(debug_btn_text, on_click=self.toggle_op_debug_mode)
@@ -6226,6 +6316,7 @@ class ARCCorePlugin(Plugin):
             self._reapply_cached_settings()
             self._load_broadcast_messages()
             self.language_manager.ReloadCurrentLanguage()
+            self._form_cache.clear()
             self.entity_display_name_manager.reload()
             self.kill_reward_config.reload()
             player.send_message(self.language_manager.GetText('OP_RELOAD_CONFIG_SUCCESS'))
@@ -6237,6 +6328,7 @@ class ARCCorePlugin(Plugin):
 
     def _reapply_cached_settings(self):
         """重载配置后重新应用从 core_setting 读取的缓存项"""
+        self._invite_reward_cache = None
         try:
             self.broadcast_interval = self.setting_manager.GetSetting('BROADCAST_INTERVAL')
             try:
@@ -6259,6 +6351,7 @@ class ARCCorePlugin(Plugin):
                     self.if_protect_spawn = str(self.if_protect_spawn).lower() in ['true', '1', 'yes']
                 except (ValueError, AttributeError):
                     self.if_protect_spawn = False
+            self._rebuild_spawn_protect_aabb()
             land_price_raw = self.setting_manager.GetSetting('LAND_PRICE')
             try:
                 self.land_price = int(land_price_raw)
@@ -6286,6 +6379,7 @@ class ARCCorePlugin(Plugin):
                     self.hide_op_in_money_ranking = str(self.hide_op_in_money_ranking).lower() in ['true', '1', 'yes']
                 except (ValueError, AttributeError):
                     self.hide_op_in_money_ranking = True
+            self._invalidate_money_rank_cache()
             self.force_login = self.setting_manager.GetSetting('FORCE_LOGIN')
             if self.force_login is None:
                 self.force_login = False
@@ -6363,6 +6457,7 @@ class ARCCorePlugin(Plugin):
             self.setting_manager.SetSetting('INVITE_REWARD_ITEM_COUNT', item_count_value)
             self.setting_manager.SetSetting('INVITE_REWARD_MONEY', money_value)
             self.setting_manager.SetSetting('INVITE_REWARD_FREE_LAND_BLOCKS', free_blocks_value)
+            self._invite_reward_cache = None
 
             result_panel = ActionForm(
                 title=self.language_manager.GetText('INVITE_REWARD_CONFIG_TITLE'),
@@ -6394,7 +6489,7 @@ class ARCCorePlugin(Plugin):
 
     def _send_op_debug_message(self, player: Optional[Player], event_type: str, target_desc: str, dimension: str, x: float, y: float, z: float):
         """若该玩家开启了 OP 调试模式，则发送一条调试聊天消息"""
-        if player is None or player.name not in self.op_debug_mode:
+        if player is None or self._player_key(player) not in self.op_debug_mode:
             return
         try:
             msg = self.language_manager.GetText('OP_DEBUG_MSG').format(
@@ -6409,36 +6504,33 @@ class ARCCorePlugin(Plugin):
 
     def toggle_op_debug_mode(self, player: Player):
         """切换 OP 调试模式：开启后会在方块破坏/放置、方块交互、生物攻击、生物交互时向该玩家发送调试消息"""
-        if player.name in self.op_debug_mode:
-            self.op_debug_mode.discard(player.name)
+        player_key = self._player_key(player)
+        if player_key in self.op_debug_mode:
+            self.op_debug_mode.discard(player_key)
             player.send_message(self.language_manager.GetText('OP_DEBUG_MODE_TOGGLED_OFF'))
         else:
-            self.op_debug_mode.add(player.name)
+            self.op_debug_mode.add(player_key)
             player.send_message(self.language_manager.GetText('OP_DEBUG_MODE_TOGGLED_ON'))
         self.show_op_tools_panel(player)
 
     def record_coordinate_1(self, player: Player):
-        if not player.name in self.op_coordinate1_dict:
-            self.op_coordinate1_dict[player.name] = None
-        self.op_coordinate1_dict[player.name] = self.get_player_position_vector(player)
+        self._get_player_state(player).op_c1 = self.get_player_position_vector(player)
 
     def record_coordinate_2(self, player: Player):
-        if not player.name in self.op_coordinate2_dict:
-            self.op_coordinate2_dict[player.name] = None
-        self.op_coordinate2_dict[player.name] = self.get_player_position_vector(player)
+        self._get_player_state(player).op_c2 = self.get_player_position_vector(player)
         self.show_op_tools_panel(player)
 
     def get_op_record_coor1(self, player: Player):
-        if not player.name in self.op_coordinate1_dict or self.op_coordinate1_dict[player.name] is None:
+        coor = self._get_player_state(player).op_c1
+        if coor is None:
             return self.get_player_position_vector(player)
-        else:
-            return self.op_coordinate1_dict[player.name]
+        return coor
 
     def get_op_record_coor2(self, player: Player):
-        if not player.name in self.op_coordinate2_dict or self.op_coordinate2_dict[player.name] is None:
+        coor = self._get_player_state(player).op_c2
+        if coor is None:
             return self.get_player_position_vector(player)
-        else:
-            return self.op_coordinate2_dict[player.name]
+        return coor
 
     def run_command_as_self(self, player: Player):
         command_input = TextInput(
@@ -6451,11 +6543,11 @@ class ARCCorePlugin(Plugin):
             data = json.loads(json_str)
             command_str = (data[0].strip() if len(data) and data[0] is not None else '')
             if not command_str:
-                command_str = self.op_last_command_dict.get(player.name, '')
+                command_str = self._get_player_state(player).op_last_cmd
             if not command_str:
                 player.send_message(self.language_manager.GetText('RUN_COMMAND_PANEL_NO_LAST_COMMAND'))
                 return
-            self.op_last_command_dict[player.name] = command_str
+            self._get_player_state(player).op_last_cmd = command_str
             if '@p1' in command_str:
                 command_str = command_str.replace('@p1', ' '.join([str(_) for _ in self.get_op_record_coor1(player)]))
             if '@p2' in command_str:
@@ -6563,6 +6655,7 @@ class ARCCorePlugin(Plugin):
             self.setting_manager.SetSetting("RICHEST_TITLE_NAME", new_richest)
 
             self.hide_op_in_money_ranking = hide_op
+            self._invalidate_money_rank_cache()
             self._ensure_richest_title_definition()
             try:
                 self._update_richest_title_if_needed(force=True)
@@ -6663,11 +6756,12 @@ class ARCCorePlugin(Plugin):
                 else:
                     player.send_message(self.language_manager.GetText('MONEY_SYSTEM_ADD_MONEY_FAILED'))
             else:  # remove
-                if self.decrease_player_money(target_player, amount):
+                new_balance = self._decrease_player_money_with_balance(target_player.name, amount)
+                if new_balance is not None:
                     player.send_message(self.language_manager.GetText('MONEY_SYSTEM_REMOVE_MONEY_SUCCESS').format(
                         target_player.name,
                         self._format_money_display(amount),
-                        self._format_money_display(self.get_player_money(target_player))
+                        self._format_money_display(new_balance)
                     ))
                 else:
                     player.send_message(self.language_manager.GetText('MONEY_SYSTEM_REMOVE_MONEY_FAILED'))
@@ -6823,7 +6917,7 @@ class ARCCorePlugin(Plugin):
             return
         self.server.scheduler.run_task(
             self,
-            lambda: self.delay_teleport_to_land(player, land_id, tp_target_pos),
+            partial(self.delay_teleport_to_land, player, land_id, tp_target_pos),
             delay=45
         )
         player.send_message(self.language_manager.GetText('READY_TELEPORT_TO_LAND').format(land_id))
@@ -7194,7 +7288,8 @@ class ARCCorePlugin(Plugin):
         获取玩家所在方块的坐标
         使用 math.floor() 确保负坐标也能正确计算方块位置
         """
-        return (math.floor(player.location.x), math.floor(player.location.y), math.floor(player.location.z))
+        location = player.location
+        return (math.floor(location.x), math.floor(location.y), math.floor(location.z))
 
     # API methods for other plugins
     def api_get_all_money_data(self) -> dict: